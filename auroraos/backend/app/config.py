@@ -1,17 +1,125 @@
 # backend/app/config.py
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "AuroraOS"
     API_V1_PREFIX: str = "/v1"
     DATABASE_URL: str = "sqlite:///./auroraos.db"
+    ASYNC_DATABASE_URL: Optional[str] = None  # Unset: DATABASE_URL with aiosqlite / asyncpg
+    
+    # SQLite engine profile (ignored for other databases)
+    SQLITE_JOURNAL_MODE: str = "WAL"      # Readers don't block the writer (or each other)
+    SQLITE_SYNCHRONOUS: str = "NORMAL"    # fsync at checkpoints, not every commit (durable with WAL)
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000    # Wait for the write lock instead of "database is locked"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024  # Page cache per connection
+    DB_GROUP_COMMIT: bool = True          # Hot write paths share one writer thread (SQLite only)
+    DB_GROUP_COMMIT_MAX_BATCH: int = 64   # Writes coalesced into one commit
+    DB_GROUP_COMMIT_WINDOW_MS: float = 0.0  # Linger for more writes before committing (0 = take what is queued)
+    QUERY_PLAN_CHECK: str = "off"         # off | warn | raise — flag SELECTs that scan a whole table (SQLite, dev/CI)
+    QUERY_PLAN_ALLOW_SCAN: List[str] = ["performer_slots", "operators", "vibe_states"]  # Small tables, scans are fine
     
     # LLM API Keys
     OPENAI_API_KEY: Optional[str] = None  # GPT models
     XAI_API_KEY: Optional[str] = None     # Grok models (soft-ero content)
 
+    # LLM gateway (pooled clients)
+    OPENAI_TIMEOUT_SECONDS: float = 30.0
+    OPENAI_MAX_CONNECTIONS: int = 20
+    XAI_TIMEOUT_SECONDS: float = 30.0
+    XAI_MAX_CONNECTIONS: int = 20
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    LLM_MAX_RETRIES: int = 2
+
+    # LLM provider health + failover
+    LLM_HEALTH_WINDOW: int = 200          # Recent calls per provider/model for p50/p95 and error rate
+    LLM_BREAKER_FAILURES: int = 5         # Consecutive errors that open a circuit
+    LLM_BREAKER_ERROR_RATE: float = 0.5   # ...or this error rate over the window
+    LLM_BREAKER_MIN_CALLS: int = 20       # Calls in the window before the error rate counts
+    LLM_BREAKER_COOLDOWN_SECONDS: float = 30.0  # Open circuit → one probe call per cooldown
+    LLM_FALLBACKS: Dict[str, str] = {     # provider → "fallback_provider:model"
+        "grok": "openai:gpt-4o-mini",
+        "openai": "grok:grok-3-latest",
+    }
+    AGENT_LLM_TIMEOUT_SECONDS: float = 20.0  # Per-attempt timeout for customer-facing replies
+    AGENT_HEDGE_REQUESTS: bool = False    # Fire the fallback too once the primary passes its p95
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = 0.5
+    LLM_HEDGE_MIN_SAMPLES: int = 20       # Successful calls before p95 is trusted for hedging
+    LLM_HEDGE_WORKERS: int = 32
+
+    # LLM admission scheduler (per provider; unset limit = unlimited)
+    LLM_RPM_LIMITS: Dict[str, int] = {}   # provider → requests / minute, e.g. {"grok": 480}
+    LLM_TPM_LIMITS: Dict[str, int] = {}   # provider → tokens / minute, e.g. {"grok": 200000}
+    LLM_PRIORITY_WEIGHTS: Dict[str, int] = {"VIP": 8, "HIGH": 4, "NORMAL": 2, "LOW": 1}
+    LLM_PRIORITY_MAX_WAIT_SECONDS: Dict[str, float] = {"VIP": 30.0, "HIGH": 15.0, "NORMAL": 5.0, "LOW": 2.0}
+    LLM_SHED_QUEUE_DEPTH: int = 50        # Waiting callers before shed priorities are rejected outright
+    LLM_SHED_PRIORITIES: List[str] = ["NORMAL", "LOW"]
+
+    # LLM usage ledger (every gateway call → ai_operations, written behind)
+    LLM_LEDGER_ENABLED: bool = True
+    LLM_LEDGER_FLUSH_SECONDS: float = 2.0  # Longest a record waits in memory
+    LLM_LEDGER_BATCH_SIZE: int = 200      # Flush early once this many are buffered
+    LLM_LEDGER_MAX_BUFFER: int = 10_000   # Oldest records are dropped beyond this (DB down)
+    LLM_PRICES: Dict[str, List[float]] = {  # model prefix → [input, output] USD per 1M tokens
+        "gpt-3.5-turbo": [0.5, 1.5],
+        "gpt-4o-mini": [0.15, 0.6],
+        "gpt-4o": [2.5, 10.0],
+        "grok-3-mini": [0.3, 0.5],
+        "grok-3": [3.0, 15.0],
+    }
+
+    # State dashboard (materialized dashboard_stats row)
+    DASHBOARD_STATS_TTL_SECONDS: float = 10.0  # Longest the row is served without a refresh (treasury, AI ops, threats, day rollover)
+
+    # Treasury rollup job (transactions → hourly / daily TreasurySnapshot rows)
+    TREASURY_ROLLUP_ENABLED: bool = True
+    TREASURY_ROLLUP_INTERVAL_SECONDS: float = 60.0  # Pause between runs once caught up
+    TREASURY_ROLLUP_SETTLE_SECONDS: float = 3600.0  # A day's buckets are re-folded until this long after it ends
+    TREASURY_ROLLUP_BACKFILL_DAYS: int = 31  # Days of history folded per run while catching up
+    TREASURY_OPENING_RESERVE: float = 4_500_000.0  # Reserve before the first rolled-up transaction
+
+    # Outbound queue
+    OUTBOUND_LEASE_SECONDS: int = 30      # Visibility timeout after a poll
+    OUTBOUND_MAX_ATTEMPTS: int = 5        # Dead-letter after this many leases
+    OUTBOUND_RECHECK_SECONDS: float = 5.0  # Long-poll DB re-check (enqueues from other processes)
+    OUTBOUND_STREAM_KEEPALIVE_SECONDS: float = 15.0
+    OUTBOUND_ACK_BATCH_MAX_SIZE: int = 500  # Acks per /telegram/delivered:batch request
+
+    # Agent pipeline
+    AGENT_ASYNC_REPLIES: bool = False     # Ack inbound immediately, reply from the worker pool
+    AGENT_WORKERS: int = 4                # Concurrent agent turns
+    AGENT_QUEUE_SIZE: int = 1000          # Jobs waiting before falling back to sync replies
+    INBOUND_DEFER_REPLY: bool = True      # Commit the agent reply separately from the inbound message
+    INBOUND_BATCH_MAX_SIZE: int = 500     # Messages per /incoming-messages:batch (and /telegram/inbound:batch) request
+    AGENT_COALESCE_WINDOW_SECONDS: float = 1.5  # Merge a burst of messages into one agent turn (0 = off)
+    AGENT_COALESCE_WINDOWS: Dict[str, float] = {}  # Per-origin override, e.g. {"TELEGRAM": 2.0}
+    AGENT_COALESCE_MAX_WAIT_SECONDS: float = 4.0  # Longest a burst waits from its first message
+
+    # Agent prompt caches (in-process)
+    AGENT_HISTORY_LENGTH: int = 10        # Messages of history sent with each agent call
+    AGENT_HISTORY_CACHE_CONVERSATIONS: int = 20_000
+    AGENT_HISTORY_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    AGENT_SLOT_CACHE_TTL_SECONDS: float = 60.0
+
+    # Prompt token budgets + rolling conversation summaries
+    AGENT_CONTEXT_TOKEN_BUDGET: int = 1500   # Prompt tokens per agent call (PerformerSlot.context_token_budget overrides)
+    AI_REPLY_CONTEXT_TOKEN_BUDGET: int = 800  # DM history + summary in /ai/reply_suggestions
+    AI_REPLY_STYLE_TOKEN_BUDGET: int = 300    # "Bu çok ben" examples in /ai/reply_suggestions
+    CONTEXT_SUMMARY_PROVIDER: str = "openai"
+    CONTEXT_SUMMARY_MODEL: str = "gpt-3.5-turbo"
+    CONTEXT_SUMMARY_MAX_TOKENS: int = 200
+    CONTEXT_SUMMARY_MIN_NEW_MESSAGES: int = 6  # Folded-out messages needed before a refresh
+    CONTEXT_SUMMARY_CACHE_TTL_SECONDS: float = 300.0
+
+    # Operator assignment
+    OPERATOR_INDEX_RESYNC_SECONDS: float = 300.0  # Rebuild the in-memory load index from the DB
+
+    # User ID resolution cache
+    USER_ID_CACHE_SIZE: int = 100_000     # External → internal IDs kept in memory (LRU)
+    USER_ID_NEGATIVE_TTL_SECONDS: float = 30.0  # How long an "unknown user" lookup is cached
+
     class Config:
         env_file = ".env"
         extra = "ignore"  # Ignore unknown env variables
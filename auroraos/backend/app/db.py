@@ -1,21 +1,259 @@
 # backend/app/db.py
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Callable, Iterator, Optional, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session as _OrmSession
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from .config import settings
+from .metrics import COUNT_BUCKETS, metrics, track_queries
+from .query_plans import query_plan_audit
+
+T = TypeVar("T")
+
+IS_SQLITE = make_url(settings.DATABASE_URL).get_backend_name() == "sqlite"
 
 engine = create_engine(
     settings.DATABASE_URL,
     echo=False,
+    connect_args={"timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000} if IS_SQLITE else {},
+)
+track_queries(engine)  # Statement count / latency for /metrics
+
+
+# ─── Async engine ────────────────────────────────────────────────────
+
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def async_database_url(url: str) -> URL:
+    """DATABASE_URL with an async driver (psycopg 3 URLs are already async-capable)."""
+    parsed = make_url(url)
+    if parsed.get_driver_name() in ("aiosqlite", "asyncpg", "psycopg"):
+        return parsed
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"No async driver configured for {backend!r}; set ASYNC_DATABASE_URL")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL),
+    echo=False,
+    connect_args={"timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000} if IS_SQLITE else {},
 )
+track_queries(async_engine.sync_engine)
+
+# expire_on_commit=False: an AsyncSession can't lazy-load expired attributes after commit
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+# ─── SQLite engine profile ───────────────────────────────────────────
+
+if IS_SQLITE:
+    @event.listens_for(engine, "connect")
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def _apply_sqlite_profile(dbapi_connection, _record) -> None:
+        """Pragmas for every new pooled connection (see SQLITE_* settings)."""
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")  # Negative = KiB
+        cursor.close()
+    
+    if settings.QUERY_PLAN_CHECK != "off":
+        query_plan_audit.attach(engine)
+        query_plan_audit.attach(async_engine.sync_engine)
 
 
 def init_db() -> None:
     from . import models  # ensure models imported
     from .orchestrator import models as orchestrator_models  # orchestrator models
     from .state import models as state_models  # state/government models
-    SQLModel.metadata.create_all(bind=engine)
+    from .migrations import migrate
+    SQLModel.metadata.create_all(bind=engine)  # New tables
+    migrate(engine)  # New columns / indexes on existing tables
 
 
 def get_session():
     with Session(engine) as session:
         yield session
 
+
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+# ─── Unit of work ────────────────────────────────────────────────────
+
+@contextmanager
+def unit_of_work(session: Session) -> Iterator[Session]:
+    """One transaction: commit on success, roll back on error."""
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+
+@asynccontextmanager
+async def async_unit_of_work(session: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """unit_of_work for an AsyncSession."""
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+
+
+def after_commit(session: Session, callback: Callable[[], None]) -> None:
+    """Run callback once the session's current transaction commits (dropped on rollback)."""
+    session.info.setdefault("after_commit", []).append(callback)
+
+
+def after_rollback(session: Session, callback: Callable[[], None]) -> None:
+    """Run callback if the session's current transaction rolls back (dropped on commit)."""
+    session.info.setdefault("after_rollback", []).append(callback)
+
+
+def _run_callbacks(session: _OrmSession, run: str, drop: str) -> None:
+    session.info.pop(drop, None)
+    for callback in session.info.pop(run, []):
+        try:
+            callback()
+        except Exception as e:
+            print(f"[DB] {run} callback failed: {e}")
+
+
+@event.listens_for(_OrmSession, "after_commit")
+def _on_commit(session: _OrmSession) -> None:
+    _run_callbacks(session, "after_commit", "after_rollback")
+
+
+@event.listens_for(_OrmSession, "after_rollback")
+def _on_rollback(session: _OrmSession) -> None:
+    _run_callbacks(session, "after_rollback", "after_commit")
+
+
+# ─── Group commit writer ─────────────────────────────────────────────
+
+group_commits = metrics.counter(
+    "aurora_db_group_commits_total",
+    "Transactions committed by the group commit writer",
+)
+group_commit_size = metrics.histogram(
+    "aurora_db_group_commit_writes",
+    "Writes coalesced into one group commit",
+    buckets=COUNT_BUCKETS,
+)
+
+
+class GroupCommitWriter:
+    """
+    One writer thread for hot write paths.
+    
+    SQLite allows a single writer at a time; many request threads each
+    committing their own small transaction queue up on the write lock
+    and pay a commit apiece. Instead, write(work) hands `work(session)`
+    to this thread, which takes every write waiting (up to `max_batch`,
+    lingering `window` seconds for stragglers), runs them all in one
+    BEGIN IMMEDIATE transaction and commits once.
+    
+    - If any job raises, the group rolls back and each job is redone
+      in its own transaction, so only the failing caller gets the
+      exception. Jobs must therefore be safe to run twice (plain DB
+      work on the session, no side effects outside after_commit).
+    - Jobs must not commit, and should return plain values rather than
+      ORM objects (they expire on the group commit).
+    - Readers keep their own pooled connections (WAL), untouched.
+    
+    Disabled (or on a non-SQLite database), write() runs the job in
+    its own session and commits, so callers don't care which is on.
+    """
+    
+    def __init__(self, enabled: bool, max_batch: int, window: float):
+        self.enabled = enabled
+        self.max_batch = max(1, max_batch)
+        self.window = window
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+    
+    def write(self, work: Callable[[Session], T]) -> "Future[T]":
+        future: Future = Future()
+        if not self.enabled:
+            try:
+                with Session(engine) as session, unit_of_work(session):
+                    result = work(session)
+                future.set_result(result)
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+        self._queue.put((work, future))
+        return future
+    
+    def submit(self, work: Callable[[Session], T]) -> T:
+        """Run `work` in the next group commit and wait for it to be durable."""
+        return self.write(work).result()
+    
+    async def asubmit(self, work: Callable[[Session], T]) -> T:
+        return await asyncio.wrap_future(self.write(work))
+    
+    def _run(self) -> None:
+        while True:
+            jobs = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(jobs) < self.max_batch:
+                try:
+                    remaining = deadline - time.monotonic()
+                    jobs.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._commit(jobs)
+    
+    def _commit(self, jobs: list) -> None:
+        """All jobs in one transaction; if one fails, redo them one by one."""
+        try:
+            with Session(engine) as session:
+                session.connection().exec_driver_sql("BEGIN IMMEDIATE")  # Take the write lock up front
+                results = [work(session) for work, _ in jobs]
+                session.flush()
+                session.commit()
+        except Exception as e:
+            if len(jobs) > 1:
+                for job in jobs:
+                    self._commit([job])
+            else:
+                jobs[0][1].set_exception(e)
+            return
+        
+        group_commits.inc()
+        group_commit_size.observe(len(jobs))
+        for (_, future), result in zip(jobs, results):
+            future.set_result(result)
+
+
+# Singleton instance
+db_writer = GroupCommitWriter(
+    enabled=settings.DB_GROUP_COMMIT and IS_SQLITE,
+    max_batch=settings.DB_GROUP_COMMIT_MAX_BATCH,
+    window=settings.DB_GROUP_COMMIT_WINDOW_MS / 1000,
+)
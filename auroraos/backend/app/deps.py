@@ -1,8 +1,16 @@
 # backend/app/deps.py
-from .db import get_session
+from typing import AsyncIterator
+
+from .db import get_session, get_async_session
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 
 def get_db() -> Session:
     yield from get_session()
 
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """AsyncSession for `async def` routes (DB I/O doesn't hold a threadpool worker)."""
+    async for session in get_async_session():
+        yield session
@@ -0,0 +1,246 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║   AuroraOS LLM Context Builder                                   ║
+║   Token-budgeted prompts + rolling conversation summaries        ║
+║                                                                  ║
+║   Baron Baba © SiyahKare, 2025                                   ║
+╚══════════════════════════════════════════════════════════════════╝
+"""
+
+import queue
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from .gateway import llm_gateway
+from .tokens import estimate_message_tokens, estimate_tokens
+from ..config import settings
+from ..db import engine
+from ..models import ContextSummary
+
+
+Turn = Tuple[str, str]  # (speaker, text)
+FoldedTurn = Tuple[int, str, str]  # (message id, speaker, text)
+
+# (session, after_id, keep) → turns with id > after_id, minus the newest `keep`, oldest first
+TurnLoader = Callable[[Session, int, int], List[FoldedTurn]]
+
+
+# ═══════════════════════════════════════════════════════════════════
+# BUDGET FILL
+# ═══════════════════════════════════════════════════════════════════
+
+def fit_prefix(texts: Sequence[str], budget: int) -> int:
+    """How many leading texts fit in `budget` tokens (stops at the first that doesn't)."""
+    used = 0
+    for count, text in enumerate(texts):
+        used += estimate_message_tokens(text)
+        if used > budget:
+            return count
+    return len(texts)
+
+
+def fit_newest(texts: Sequence[str], budget: int) -> int:
+    """
+    How many of the newest texts (list is oldest first) fit in `budget`.
+    Filled newest-first, so the kept turns are always the contiguous tail.
+    """
+    return fit_prefix(list(reversed(texts)), budget)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# SUMMARIZER — previous summary + new turns → new summary
+# ═══════════════════════════════════════════════════════════════════
+
+SUMMARY_SYSTEM_PROMPT = """
+Bir sohbetin devam eden özetini tutuyorsun.
+Önceki özeti ve yeni mesajları birleştirip tek bir güncel özet yaz.
+
+Özette kalsın:
+- Kullanıcının adı, ilgi alanları, anlattığı önemli şeyler
+- Verilen sözler, istekler, açık kalan konular
+- Konuşmanın tonu ve ilişkinin geldiği nokta
+
+Kurallar:
+- Max 5 kısa cümle, Türkçe.
+- Sadece özeti yaz, açıklama ekleme.
+""".strip()
+
+SUMMARY_HEADER = "Önceki konuşmanın özeti:"  # Prefix when a summary goes into a prompt
+SUMMARY_LINE_CHARS = 200  # Per-turn cap in the extractive fallback
+SUMMARY_FOLD_BATCH = 50   # Most messages a loader should return per refresh
+
+
+def summarize_turns(
+    previous: Optional[str],
+    turns: List[Turn],
+    conversation_id: Optional[int] = None,
+) -> str:
+    """
+    Fold `turns` into `previous`. One short LLM call whose input is the
+    old summary plus only the new turns, so a refresh costs the same on
+    message 50 as on message 5000. Falls back to an extractive summary
+    (newest lines that fit CONTEXT_SUMMARY_MAX_TOKENS) without a provider.
+    
+    `conversation_id` attributes the call's cost in the usage ledger.
+    """
+    provider = settings.CONTEXT_SUMMARY_PROVIDER
+    transcript = "\n".join(f"{speaker}: {text}" for speaker, text in turns)
+    
+    if llm_gateway.is_available(provider):
+        try:
+            completion = llm_gateway.chat(
+                provider,
+                caller="context_summary",
+                conversation_id=conversation_id,
+                model=settings.CONTEXT_SUMMARY_MODEL,
+                messages=[
+                    {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+                    {"role": "user", "content": f"Önceki özet:\n{previous or '(yok)'}\n\nYeni mesajlar:\n{transcript}"},
+                ],
+                temperature=0.2,
+                max_tokens=settings.CONTEXT_SUMMARY_MAX_TOKENS,
+            )
+            summary = (completion.choices[0].message.content or "").strip()
+            if summary:
+                return summary
+        except Exception as e:
+            print(f"[Context] Summary LLM error, using extractive fallback: {e}")
+    
+    lines = ([previous] if previous else []) + [
+        f"{speaker}: {text[:SUMMARY_LINE_CHARS]}" for speaker, text in turns
+    ]
+    kept = fit_newest(lines, settings.CONTEXT_SUMMARY_MAX_TOKENS)
+    return "\n".join(lines[len(lines) - kept:])
+
+
+# ═══════════════════════════════════════════════════════════════════
+# ROLLING SUMMARIES — stored in context_summaries
+# ═══════════════════════════════════════════════════════════════════
+
+def _conversation_of(key: str) -> Optional[int]:
+    """Orchestrator conversation behind a summary key ("conversation:<id>"), if any."""
+    kind, _, ident = key.partition(":")
+    return int(ident) if kind == "conversation" and ident.isdigit() else None
+
+
+@dataclass
+class _CachedSummary:
+    summary: Optional[str]  # None → no summary yet
+    expires_at: float
+
+
+class ConversationSummaries:
+    """
+    Rolling summaries of the turns that no longer fit in a prompt.
+    
+    get() is served from an in-process TTL cache (one indexed read on a
+    miss). schedule() queues a refresh for a background thread with its
+    own session, so summarizing never adds latency to a reply; the same
+    key is queued at most once. A refresh only runs once
+    CONTEXT_SUMMARY_MIN_NEW_MESSAGES turns have been folded out since
+    the last one.
+    """
+    
+    def __init__(self, ttl: float, min_new: int, max_entries: int = 20_000, queue_size: int = 1000):
+        self.ttl = ttl
+        self.min_new = min_new
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, _CachedSummary] = OrderedDict()
+        self._queue: "queue.Queue[Tuple[str, TurnLoader, int]]" = queue.Queue(maxsize=queue_size)
+        self._queued: set = set()
+        self._thread: Optional[threading.Thread] = None
+    
+    def get(self, session: Session, key: str) -> Optional[str]:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached.expires_at > now:
+                self._entries.move_to_end(key)
+                return cached.summary
+        
+        row = session.exec(
+            select(ContextSummary.summary).where(ContextSummary.key == key)
+        ).first()
+        self._put(key, row)
+        return row
+    
+    def schedule(self, key: str, loader: TurnLoader, keep: int) -> None:
+        """Queue a refresh that folds everything but the newest `keep` messages."""
+        with self._lock:
+            if key in self._queued:
+                return
+            self._queued.add(key)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="context-summaries", daemon=True)
+                self._thread.start()
+        try:
+            self._queue.put_nowait((key, loader, keep))
+        except queue.Full:
+            with self._lock:
+                self._queued.discard(key)
+    
+    def refresh(self, key: str, loader: TurnLoader, keep: int) -> bool:
+        """Fold new turns into the stored summary now. Returns True if it changed."""
+        with Session(engine) as session:
+            row = session.exec(select(ContextSummary).where(ContextSummary.key == key)).first()
+            turns = loader(session, row.covered_until_id if row else 0, keep)
+            if len(turns) < self.min_new:
+                return False
+            
+            summary = summarize_turns(
+                row.summary if row else None,
+                [(s, t) for _, s, t in turns],
+                conversation_id=_conversation_of(key),
+            )
+            if row is None:
+                row = ContextSummary(key=key, summary=summary)
+            row.summary = summary
+            row.covered_until_id = turns[-1][0]
+            row.covered_messages += len(turns)
+            row.updated_at = datetime.utcnow()
+            session.add(row)
+            try:
+                session.commit()
+            except IntegrityError:
+                session.rollback()  # Another process created it first; its refresh wins
+                return False
+        
+        self._put(key, summary)
+        return True
+    
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def _put(self, key: str, summary: Optional[str]) -> None:
+        with self._lock:
+            self._entries[key] = _CachedSummary(summary, expires_at=time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def _run(self) -> None:
+        while True:
+            key, loader, keep = self._queue.get()
+            with self._lock:
+                self._queued.discard(key)
+            try:
+                if self.refresh(key, loader, keep):
+                    print(f"[Context] Summary refreshed: {key}")
+            except Exception as e:
+                print(f"[Context] Summary refresh failed for {key}: {e}")
+
+
+# Singleton instance
+conversation_summaries = ConversationSummaries(
+    ttl=settings.CONTEXT_SUMMARY_CACHE_TTL_SECONDS,
+    min_new=settings.CONTEXT_SUMMARY_MIN_NEW_MESSAGES,
+)
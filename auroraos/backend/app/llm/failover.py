@@ -0,0 +1,131 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║   AuroraOS LLM Failover                                          ║
+║   Grok ⇄ OpenAI: circuit-aware routing + hedged requests         ║
+║                                                                  ║
+║   Baron Baba © SiyahKare, 2025                                   ║
+╚══════════════════════════════════════════════════════════════════╝
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, List, Optional, Tuple
+
+from .gateway import llm_gateway
+from .health import provider_health
+from ..config import settings
+
+
+Target = Tuple[str, str]  # (provider, model)
+
+_hedge_executor = ThreadPoolExecutor(
+    max_workers=settings.LLM_HEDGE_WORKERS,
+    thread_name_prefix="llm-hedge",
+)
+
+
+def fallback_for(provider: str) -> Optional[Target]:
+    """LLM_FALLBACKS entry for a provider ("provider:model"), if any."""
+    spec = settings.LLM_FALLBACKS.get(provider)
+    if not spec or ":" not in spec:
+        return None
+    fallback_provider, fallback_model = spec.split(":", 1)
+    return fallback_provider, fallback_model
+
+
+def configured_targets(provider: str, model: str) -> List[Target]:
+    """The slot's model, then its fallback — those with a configured provider."""
+    return [
+        target for target in (
+            (provider, model),
+            fallback_for(provider),
+        )
+        if target and llm_gateway.is_available(target[0])
+    ]
+
+
+def route(provider: str, model: str) -> List[Target]:
+    """
+    Targets to try, in order: the slot's model, then its fallback.
+    
+    Only configured providers are listed, and open circuits are skipped
+    — unless every target is open, in which case the first configured
+    one is tried anyway (better than a canned reply). Only the target
+    that is called first may take a half-open circuit's probe; a backup
+    is listed only while its circuit is closed.
+    """
+    healthy: List[Target] = []
+    for target in configured_targets(provider, model):
+        if provider_health.closed(*target) or (not healthy and provider_health.allow(*target)):
+            healthy.append(target)
+    return healthy or configured_targets(provider, model)[:1]
+
+
+def hedge_delay(provider: str, model: str) -> Optional[float]:
+    """When to fire the backup: the primary's p95, once there are enough samples."""
+    p95 = provider_health.percentile(provider, model, 0.95, min_samples=settings.LLM_HEDGE_MIN_SAMPLES)
+    if p95 is None:
+        return None
+    return max(p95, settings.LLM_HEDGE_MIN_DELAY_SECONDS)
+
+
+def chat_with_failover(
+    provider: str,
+    model: str,
+    *,
+    caller: str,
+    hedge: bool = False,
+    **kwargs,
+) -> Tuple[Any, str, str]:
+    """
+    Chat completion with failover (and optional hedging).
+    
+    Returns (completion, provider, model) — whichever target answered.
+    
+    - Primary fails → the fallback is tried right away.
+    - hedge=True and the primary hasn't answered within its p95 → the
+      fallback is fired too and the first success wins. The slower
+      call is left to finish in the background (its latency still
+      feeds the health stats).
+    
+    Raises the primary's error if every target fails, or RuntimeError
+    if no provider is configured.
+    """
+    targets = route(provider, model)
+    if not targets:
+        raise RuntimeError(f"No LLM provider available for '{provider}'")
+    
+    def call(target: Target) -> Tuple[Any, str, str]:
+        completion = llm_gateway.chat(target[0], caller=caller, model=target[1], **kwargs)
+        return completion, target[0], target[1]
+    
+    primary = targets[0]
+    backup = targets[1] if len(targets) > 1 else None
+    if backup is None:
+        return call(primary)
+    
+    delay = hedge_delay(*primary) if hedge else None
+    if delay is None:
+        try:
+            return call(primary)
+        except Exception as e:
+            print(f"[LLM Failover] {primary[0]}/{primary[1]} failed ({e}); trying {backup[0]}/{backup[1]}")
+            return call(backup)
+    
+    first = _hedge_executor.submit(call, primary)
+    done, _ = wait([first], timeout=delay)
+    if not done:
+        print(f"[LLM Failover] {primary[0]}/{primary[1]} slower than {delay:.2f}s; hedging to {backup[0]}/{backup[1]}")
+        second = _hedge_executor.submit(call, backup)
+        pending = {first, second}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+        return first.result()  # Both failed: raise the primary's error
+    
+    try:
+        return first.result()
+    except Exception as e:
+        print(f"[LLM Failover] {primary[0]}/{primary[1]} failed ({e}); trying {backup[0]}/{backup[1]}")
+        return call(backup)
@@ -0,0 +1,360 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║   AuroraOS LLM Gateway                                           ║
+║   One pooled client per provider for every Grok/OpenAI call      ║
+║                                                                  ║
+║   Baron Baba © SiyahKare, 2025                                   ║
+╚══════════════════════════════════════════════════════════════════╝
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from ..config import settings
+from ..metrics import LLM_LATENCY_BUCKETS, metrics
+from .health import provider_health
+from .ledger import UsageRecord, usage_ledger
+from .scheduler import llm_scheduler
+from .tokens import estimate_request_tokens, estimate_tokens
+
+
+llm_request_seconds = metrics.histogram(
+    "aurora_llm_request_duration_seconds",
+    "Successful LLM call latency (streams: until the last token)",
+    ["provider", "model", "caller"],
+    buckets=LLM_LATENCY_BUCKETS,
+)
+llm_tokens = metrics.counter(
+    "aurora_llm_tokens_total",
+    "Tokens reported by the provider",
+    ["provider", "model", "caller", "kind"],
+)
+llm_errors = metrics.counter(
+    "aurora_llm_errors_total",
+    "LLM calls that raised (timeouts, HTTP errors, bad responses)",
+    ["provider", "model", "caller"],
+)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# PROVIDERS
+# ═══════════════════════════════════════════════════════════════════
+
+@dataclass(frozen=True)
+class ProviderConfig:
+    """Connection settings for one OpenAI-compatible provider."""
+    name: str
+    api_key: Optional[str]
+    base_url: Optional[str]
+    timeout: float
+    max_connections: int
+    max_keepalive: int
+
+
+def _provider_configs() -> dict[str, ProviderConfig]:
+    return {
+        "openai": ProviderConfig(
+            name="openai",
+            api_key=settings.OPENAI_API_KEY,
+            base_url=None,
+            timeout=settings.OPENAI_TIMEOUT_SECONDS,
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+        ),
+        "grok": ProviderConfig(
+            name="grok",
+            api_key=settings.XAI_API_KEY,
+            base_url="https://api.x.ai/v1",
+            timeout=settings.XAI_TIMEOUT_SECONDS,
+            max_connections=settings.XAI_MAX_CONNECTIONS,
+            max_keepalive=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+        ),
+    }
+
+
+# ═══════════════════════════════════════════════════════════════════
+# GATEWAY
+# ═══════════════════════════════════════════════════════════════════
+
+class LLMGateway:
+    """
+    Long-lived sync + async OpenAI clients, one pair per provider.
+    
+    Each client owns an httpx pool with keep-alive, so TLS handshakes
+    and client construction happen once per process instead of once per
+    generation. All chat completions go through chat() / achat(), which
+    is the hook point for caching, rate limiting and metrics.
+    """
+    
+    def __init__(self):
+        self._providers = _provider_configs()
+        self._clients: dict = {}
+        self._async_clients: dict = {}
+        self._lock = threading.Lock()
+    
+    def is_available(self, provider: str) -> bool:
+        """True if the provider is known and has an API key configured."""
+        cfg = self._providers.get(provider)
+        return bool(cfg and cfg.api_key)
+    
+    def _limits(self, cfg: ProviderConfig) -> dict:
+        return {
+            "limits": httpx.Limits(
+                max_connections=cfg.max_connections,
+                max_keepalive_connections=cfg.max_keepalive,
+            ),
+            "timeout": httpx.Timeout(cfg.timeout, connect=5.0),
+        }
+    
+    def client(self, provider: str):
+        """Shared sync client for a provider, or None if it has no API key."""
+        if not self.is_available(provider):
+            return None
+        client = self._clients.get(provider)
+        if client is not None:
+            return client
+        
+        with self._lock:
+            if provider not in self._clients:
+                from openai import OpenAI
+                cfg = self._providers[provider]
+                self._clients[provider] = OpenAI(
+                    api_key=cfg.api_key,
+                    base_url=cfg.base_url,
+                    max_retries=settings.LLM_MAX_RETRIES,
+                    http_client=httpx.Client(**self._limits(cfg)),
+                )
+                print(f"[LLM Gateway] {provider} client ready (pool={cfg.max_connections}, timeout={cfg.timeout}s)")
+            return self._clients[provider]
+    
+    def async_client(self, provider: str):
+        """Shared async client for a provider, or None if it has no API key."""
+        if not self.is_available(provider):
+            return None
+        client = self._async_clients.get(provider)
+        if client is not None:
+            return client
+        
+        with self._lock:
+            if provider not in self._async_clients:
+                from openai import AsyncOpenAI
+                cfg = self._providers[provider]
+                self._async_clients[provider] = AsyncOpenAI(
+                    api_key=cfg.api_key,
+                    base_url=cfg.base_url,
+                    max_retries=settings.LLM_MAX_RETRIES,
+                    http_client=httpx.AsyncClient(**self._limits(cfg)),
+                )
+            return self._async_clients[provider]
+    
+    def chat(
+        self,
+        provider: str,
+        *,
+        caller: str,
+        priority: Optional[str] = None,
+        conversation_id: Optional[int] = None,
+        **kwargs,
+    ):
+        """
+        Run a chat completion on the provider's pooled client.
+        
+        `caller` names the feature making the call (e.g. "orchestrator_agent").
+        Raises RuntimeError if the provider is not configured; callers
+        check is_available() first to pick their mock fallback.
+        
+        The call is admitted by llm_scheduler at `priority` (a
+        ConversationPriority; default NORMAL) and may raise
+        AdmissionRejected. Latency and outcome feed provider_health
+        (see llm/failover.py) and /metrics, and every call is written
+        to the usage ledger (ai_operations) with its cost, attributed
+        to `conversation_id` when given.
+        """
+        client = self.client(provider)
+        if client is None:
+            raise RuntimeError(f"LLM provider '{provider}' is not configured")
+        estimate = estimate_request_tokens(kwargs.get("messages", []), kwargs.get("max_tokens") or 0)
+        llm_scheduler.admit(provider, priority, estimate)
+        start = time.perf_counter()
+        try:
+            completion = client.chat.completions.create(**kwargs)
+        except Exception as e:
+            self._record(provider, caller, kwargs.get("model", ""), start, estimate, None, conversation_id, e)
+            raise
+        self._record(provider, caller, kwargs.get("model", ""), start, estimate, completion, conversation_id)
+        return completion
+    
+    async def achat(
+        self,
+        provider: str,
+        *,
+        caller: str,
+        priority: Optional[str] = None,
+        conversation_id: Optional[int] = None,
+        **kwargs,
+    ):
+        """Async variant of chat()."""
+        client = self.async_client(provider)
+        if client is None:
+            raise RuntimeError(f"LLM provider '{provider}' is not configured")
+        estimate = estimate_request_tokens(kwargs.get("messages", []), kwargs.get("max_tokens") or 0)
+        await llm_scheduler.aadmit(provider, priority, estimate)
+        start = time.perf_counter()
+        try:
+            completion = await client.chat.completions.create(**kwargs)
+        except Exception as e:
+            self._record(provider, caller, kwargs.get("model", ""), start, estimate, None, conversation_id, e)
+            raise
+        self._record(provider, caller, kwargs.get("model", ""), start, estimate, completion, conversation_id)
+        return completion
+    
+    async def astream(
+        self,
+        provider: str,
+        *,
+        caller: str,
+        priority: Optional[str] = None,
+        conversation_id: Optional[int] = None,
+        **kwargs,
+    ) -> AsyncIterator[str]:
+        """
+        Streaming chat completion: yields content deltas as they arrive.
+        
+        Streams carry no usage, so the scheduler and the ledger get
+        estimated tokens. The outcome feeds provider_health like chat();
+        a consumer that stops early (client gone) settles what was
+        streamed without counting against the provider.
+        """
+        client = self.async_client(provider)
+        if client is None:
+            raise RuntimeError(f"LLM provider '{provider}' is not configured")
+        estimate = estimate_request_tokens(kwargs.get("messages", []), kwargs.get("max_tokens") or 0)
+        await llm_scheduler.aadmit(provider, priority, estimate)
+        model = kwargs.get("model", "")
+        prompt_tokens = estimate - (kwargs.get("max_tokens") or 0)
+        completion_tokens = 0
+        ok: Optional[bool] = None  # None → abandoned by the consumer
+        error: Optional[Exception] = None
+        start = time.perf_counter()
+        try:
+            stream = await client.chat.completions.create(stream=True, **kwargs)
+            try:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        completion_tokens += estimate_tokens(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+            finally:
+                await stream.close()
+            ok = True
+        except Exception as e:
+            ok, error = False, e
+            raise
+        finally:
+            used = prompt_tokens + completion_tokens if ok or completion_tokens else 0
+            self._finish(
+                provider, caller, model, start, estimate, ok,
+                used, prompt_tokens, completion_tokens, conversation_id, error,
+            )
+    
+    def _record(
+        self,
+        provider: str,
+        caller: str,
+        model: str,
+        start: float,
+        estimate: int,
+        completion,
+        conversation_id: Optional[int] = None,
+        error: Optional[Exception] = None,
+    ) -> None:
+        """One completion's outcome (completion=None → failed), see _finish()."""
+        if completion is None:
+            self._finish(provider, caller, model, start, estimate, False, 0, 0, 0, conversation_id, error)
+            return
+        
+        usage = completion.usage
+        prompt_tokens = (usage.prompt_tokens or 0) if usage else 0
+        completion_tokens = (usage.completion_tokens or 0) if usage else 0
+        if usage:
+            llm_tokens.inc(prompt_tokens, provider=provider, model=model, caller=caller, kind="prompt")
+            llm_tokens.inc(completion_tokens, provider=provider, model=model, caller=caller, kind="completion")
+        self._finish(
+            provider, caller, model, start, estimate, True,
+            usage.total_tokens if usage else estimate, prompt_tokens, completion_tokens, conversation_id,
+        )
+    
+    def _finish(
+        self,
+        provider: str,
+        caller: str,
+        model: str,
+        start: float,
+        estimate: int,
+        ok: Optional[bool],
+        used_tokens: int,
+        prompt_tokens: int,
+        completion_tokens: int,
+        conversation_id: Optional[int] = None,
+        error: Optional[Exception] = None,
+    ) -> None:
+        """
+        Feed one call's outcome to provider_health, the scheduler,
+        /metrics and the usage ledger. ok=None (abandoned stream) only
+        settles and ledgers: the provider did nothing wrong.
+        """
+        latency = time.perf_counter() - start
+        llm_scheduler.settle(provider, estimate, used_tokens)
+        if ok is not None:
+            provider_health.record(provider, model, latency, ok=ok)
+        if ok:
+            llm_request_seconds.observe(latency, provider=provider, model=model, caller=caller)
+        elif ok is False:
+            llm_errors.inc(provider=provider, model=model, caller=caller)
+        self._ledger(provider, caller, model, start, ok is not False, prompt_tokens, completion_tokens, conversation_id, error)
+    
+    def _ledger(
+        self,
+        provider: str,
+        caller: str,
+        model: str,
+        start: float,
+        ok: bool,
+        prompt_tokens: int,
+        completion_tokens: int,
+        conversation_id: Optional[int] = None,
+        error: Optional[Exception] = None,
+    ) -> None:
+        duration = time.perf_counter() - start
+        usage_ledger.record(UsageRecord(
+            provider=provider,
+            model=model,
+            caller=caller,
+            started_at=datetime.utcnow() - timedelta(seconds=duration),
+            duration=duration,
+            ok=ok,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            conversation_id=conversation_id,
+            error=f"{type(error).__name__}: {error}" if error else None,
+        ))
+    
+    async def aclose(self) -> None:
+        """Close every pooled connection (app shutdown)."""
+        with self._lock:
+            clients = list(self._clients.values())
+            async_clients = list(self._async_clients.values())
+            self._clients.clear()
+            self._async_clients.clear()
+        for client in clients:
+            client.close()
+        for client in async_clients:
+            await client.close()
+
+
+# Singleton instance
+llm_gateway = LLMGateway()
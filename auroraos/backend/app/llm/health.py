@@ -0,0 +1,149 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║   AuroraOS LLM Provider Health                                   ║
+║   Rolling latency / error rate + circuit breaker per model       ║
+║                                                                  ║
+║   Baron Baba © SiyahKare, 2025                                   ║
+╚══════════════════════════════════════════════════════════════════╝
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+
+from ..config import settings
+
+
+@dataclass
+class _Stats:
+    latencies: Deque[float]  # Seconds, successful calls only
+    outcomes: Deque[bool]    # True = success
+    consecutive_failures: int = 0
+    opened_at: Optional[float] = None  # Circuit open since (monotonic)
+    calls: int = 0
+    failures: int = 0
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class ProviderHealth:
+    """
+    Rolling health per (provider, model), fed by every gateway call.
+    
+    - p50 / p95 over the last `window` successful calls
+    - error rate over the last `window` calls
+    - circuit breaker: opens after `failures` consecutive errors, or
+      when the error rate reaches `error_rate` over at least `min_calls`.
+      After `cooldown` one call is let through as a probe (half-open):
+      a success closes the circuit, a failure keeps it open for another
+      cooldown, and everyone else keeps skipping the model meanwhile.
+    """
+    
+    def __init__(self, window: int, failures: int, error_rate: float, min_calls: int, cooldown: float):
+        self.window = window
+        self.failures = failures
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], _Stats] = {}
+    
+    def _get(self, provider: str, model: str) -> _Stats:
+        key = (provider, model)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = _Stats(
+                latencies=deque(maxlen=self.window),
+                outcomes=deque(maxlen=self.window),
+            )
+        return stats
+    
+    def record(self, provider: str, model: str, latency: float, ok: bool) -> None:
+        with self._lock:
+            stats = self._get(provider, model)
+            stats.calls += 1
+            stats.outcomes.append(ok)
+            
+            if ok:
+                stats.latencies.append(latency)
+                stats.consecutive_failures = 0
+                if stats.opened_at is not None:
+                    stats.opened_at = None
+                    stats.outcomes.clear()  # Start the error rate over
+                    print(f"[LLM Health] {provider}/{model} circuit closed")
+                return
+            
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            if stats.opened_at is not None:
+                stats.opened_at = time.monotonic()  # Failed probe: another cooldown
+                return
+            errors = stats.outcomes.count(False)
+            if stats.consecutive_failures >= self.failures or (
+                len(stats.outcomes) >= self.min_calls
+                and errors / len(stats.outcomes) >= self.error_rate
+            ):
+                stats.opened_at = time.monotonic()
+                print(f"[LLM Health] {provider}/{model} circuit OPEN ({errors}/{len(stats.outcomes)} errors)")
+    
+    def closed(self, provider: str, model: str) -> bool:
+        """True unless the circuit is open (never takes the probe)."""
+        with self._lock:
+            stats = self._stats.get((provider, model))
+            return stats is None or stats.opened_at is None
+    
+    def allow(self, provider: str, model: str) -> bool:
+        """
+        False while the circuit is open. Once per cooldown the caller
+        that asks gets True and is the probe: admitting it restarts the
+        cooldown, so a probe that never reports back is retried later.
+        """
+        with self._lock:
+            stats = self._stats.get((provider, model))
+            if stats is None or stats.opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - stats.opened_at < self.cooldown:
+                return False
+            stats.opened_at = now
+            return True
+    
+    def percentile(self, provider: str, model: str, q: float, min_samples: int = 1) -> Optional[float]:
+        with self._lock:
+            stats = self._stats.get((provider, model))
+            if stats is None or len(stats.latencies) < min_samples:
+                return None
+            return _percentile(list(stats.latencies), q)
+    
+    def snapshot(self) -> List[dict]:
+        with self._lock:
+            out = []
+            for (provider, model), stats in self._stats.items():
+                latencies = list(stats.latencies)
+                outcomes = list(stats.outcomes)
+                out.append({
+                    "provider": provider,
+                    "model": model,
+                    "calls": stats.calls,
+                    "failures": stats.failures,
+                    "error_rate": round(outcomes.count(False) / len(outcomes), 3) if outcomes else 0.0,
+                    "p50_ms": round(_percentile(latencies, 0.5) * 1000) if latencies else None,
+                    "p95_ms": round(_percentile(latencies, 0.95) * 1000) if latencies else None,
+                    "circuit": "open" if stats.opened_at is not None else "closed",
+                })
+            return out
+
+
+# Singleton instance
+provider_health = ProviderHealth(
+    window=settings.LLM_HEALTH_WINDOW,
+    failures=settings.LLM_BREAKER_FAILURES,
+    error_rate=settings.LLM_BREAKER_ERROR_RATE,
+    min_calls=settings.LLM_BREAKER_MIN_CALLS,
+    cooldown=settings.LLM_BREAKER_COOLDOWN_SECONDS,
+)
@@ -0,0 +1,191 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║   AuroraOS LLM Usage Ledger                                      ║
+║   Every gateway call → ai_operations, written behind in batches  ║
+║                                                                  ║
+║   Baron Baba © SiyahKare, 2025                                   ║
+╚══════════════════════════════════════════════════════════════════╝
+"""
+
+import threading
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Deque, Optional, Tuple
+
+from ..config import settings
+from ..db import db_writer
+from ..state.models import AIOperation, AIOperationStatus, AIOperationType
+
+
+# caller → operation type on the State dashboard (unknown callers: GENERATE)
+CALLER_TYPES = {
+    "orchestrator_agent": AIOperationType.REPLY,
+    "orchestrator_agent_stream": AIOperationType.REPLY,
+    "aurora_reply": AIOperationType.REPLY,
+    "aurora_engine": AIOperationType.GENERATE,
+    "aurora_sugoda": AIOperationType.GENERATE,
+    "grok_soft_ero": AIOperationType.GENERATE,
+    "aurora_day": AIOperationType.ANALYZE,
+    "context_summary": AIOperationType.ANALYZE,
+}
+
+
+def price_for(model: str) -> Optional[Tuple[float, float]]:
+    """[input, output] USD per 1M tokens from LLM_PRICES (longest model prefix wins)."""
+    matches = [prefix for prefix in settings.LLM_PRICES if model.startswith(prefix)]
+    if not matches:
+        return None
+    input_price, output_price = settings.LLM_PRICES[max(matches, key=len)]
+    return input_price, output_price
+
+
+def compute_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """USD cost of one call, or None for a model without a price."""
+    price = price_for(model)
+    if price is None:
+        return None
+    return round((prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000, 6)
+
+
+@dataclass
+class UsageRecord:
+    """One gateway call, as handed to the ledger."""
+    provider: str
+    model: str
+    caller: str
+    started_at: datetime
+    duration: float  # Seconds
+    ok: bool
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    conversation_id: Optional[int] = None
+    error: Optional[str] = None
+    
+    def to_operation(self) -> AIOperation:
+        conversation = self.conversation_id is not None
+        return AIOperation(
+            operation_id=f"OP-{self.started_at:%Y%m%d}-{uuid.uuid4().hex[:12].upper()}",
+            type=CALLER_TYPES.get(self.caller, AIOperationType.GENERATE),
+            status=AIOperationStatus.COMPLETED if self.ok else AIOperationStatus.FAILED,
+            target=str(self.conversation_id) if conversation else self.caller,
+            target_type="conversation" if conversation else "caller",
+            started_at=self.started_at,
+            completed_at=self.started_at + timedelta(seconds=self.duration),
+            duration_seconds=int(self.duration),
+            duration_ms=round(self.duration * 1000),
+            result=self.error[:500] if self.error else None,
+            provider=self.provider,
+            caller=self.caller,
+            conversation_id=self.conversation_id,
+            model_used=self.model,
+            prompt_tokens=self.prompt_tokens,
+            completion_tokens=self.completion_tokens,
+            tokens_used=self.prompt_tokens + self.completion_tokens,
+            cost=compute_cost(self.model, self.prompt_tokens, self.completion_tokens),
+            created_at=self.started_at,
+            created_by="llm_gateway",
+        )
+
+
+class UsageLedger:
+    """
+    Write-behind buffer for UsageRecords.
+    
+    record() only appends to an in-memory deque, so the request path
+    never touches the DB. A background thread flushes every
+    `flush_interval` seconds, or as soon as `batch_size` records are
+    waiting, one group commit per batch. If the DB is unavailable the
+    batch is put back; past `max_buffer` the oldest records are
+    dropped (and counted) rather than growing without bound.
+    
+    Records still buffered when the process dies are lost — this is a
+    usage ledger, not billing of record. stop() flushes on shutdown.
+    """
+    
+    def __init__(self, enabled: bool, flush_interval: float, batch_size: int, max_buffer: int):
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_buffer = max_buffer
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # One flush at a time (thread vs stop())
+        self._wake = threading.Event()
+        self._buffer: Deque[UsageRecord] = deque()
+        self._thread: Optional[threading.Thread] = None
+        self.written = 0
+        self.dropped = 0
+    
+    def record(self, record: UsageRecord) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer:
+                self._buffer.popleft()
+                self.dropped += 1
+            self._buffer.append(record)
+            full = len(self._buffer) >= self.batch_size
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="llm-ledger", daemon=True)
+                self._thread.start()
+        if full:
+            self._wake.set()
+    
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+    
+    def flush(self) -> int:
+        """Write everything buffered; returns the number of rows written."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                if not batch:
+                    return written
+                
+                operations = [r.to_operation() for r in batch]
+                try:
+                    db_writer.submit(lambda session: session.add_all(operations))
+                except Exception as e:
+                    print(f"[LLM Ledger] Flush of {len(batch)} record(s) failed: {e}")
+                    self._requeue(batch)
+                    return written
+                
+                written += len(batch)
+                with self._lock:
+                    self.written += len(batch)
+    
+    def _requeue(self, batch: list) -> None:
+        with self._lock:
+            room = max(0, self.max_buffer - len(self._buffer))
+            keep = batch[len(batch) - room:] if room < len(batch) else batch
+            self.dropped += len(batch) - len(keep)
+            self._buffer.extendleft(reversed(keep))
+    
+    def stop(self) -> None:
+        """Flush what is left (app shutdown)."""
+        if self.enabled:
+            self.flush()
+    
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "buffered": len(self._buffer),
+                "written": self.written,
+                "dropped": self.dropped,
+            }
+
+
+# Singleton instance
+usage_ledger = UsageLedger(
+    enabled=settings.LLM_LEDGER_ENABLED,
+    flush_interval=settings.LLM_LEDGER_FLUSH_SECONDS,
+    batch_size=settings.LLM_LEDGER_BATCH_SIZE,
+    max_buffer=settings.LLM_LEDGER_MAX_BUFFER,
+)
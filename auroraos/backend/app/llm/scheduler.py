@@ -0,0 +1,255 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║   AuroraOS LLM Admission Scheduler                               ║
+║   RPM / TPM token buckets + weighted priority queues             ║
+║                                                                  ║
+║   Baron Baba © SiyahKare, 2025                                   ║
+╚══════════════════════════════════════════════════════════════════╝
+"""
+
+import asyncio
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterable, List, Optional
+
+from ..config import settings
+
+
+PRIORITIES = ("VIP", "HIGH", "NORMAL", "LOW")  # ConversationPriority values
+DEFAULT_PRIORITY = "NORMAL"
+
+
+class AdmissionRejected(RuntimeError):
+    """The scheduler shed this request (provider saturated, or waited too long)."""
+
+
+# ═══════════════════════════════════════════════════════════════════
+# TOKEN BUCKET
+# ═══════════════════════════════════════════════════════════════════
+
+class TokenBucket:
+    """Refills `per_minute` units per minute, holds at most one minute's worth."""
+    
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+    
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def wait_for(self, amount: float) -> float:
+        """Seconds until `amount` is available (0 if it is now)."""
+        amount = min(amount, self.capacity)  # A huge request waits for a full bucket, not forever
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+    
+    def take(self, amount: float) -> None:
+        self.level -= amount  # May go negative when usage is settled
+
+
+# ═══════════════════════════════════════════════════════════════════
+# SCHEDULER
+# ═══════════════════════════════════════════════════════════════════
+
+@dataclass
+class _Waiter:
+    priority: str
+    tokens: int
+    granted: bool = False
+
+
+class _Lane:
+    """One provider: its buckets and a wait queue per priority."""
+    
+    def __init__(self, rpm: int, tpm: int):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.queues: Dict[str, Deque[_Waiter]] = {p: deque() for p in PRIORITIES}
+        self.credit: Dict[str, int] = {p: 0 for p in PRIORITIES}  # Smooth weighted round robin
+        self.admitted: Counter = Counter()
+        self.shed: Counter = Counter()
+    
+    @property
+    def limited(self) -> bool:
+        return self.requests is not None or self.tokens is not None
+    
+    @property
+    def waiting(self) -> int:
+        return sum(len(q) for q in self.queues.values())
+    
+    def wait_for(self, tokens: int, now: float) -> float:
+        wait = 0.0
+        for bucket, amount in ((self.requests, 1), (self.tokens, tokens)):
+            if bucket is not None:
+                bucket.refill(now)
+                wait = max(wait, bucket.wait_for(amount))
+        return wait
+    
+    def take(self, tokens: int) -> None:
+        if self.requests is not None:
+            self.requests.take(1)
+        if self.tokens is not None:
+            self.tokens.take(tokens)
+
+
+class AdmissionScheduler:
+    """
+    Admission control in front of every gateway call.
+    
+    Each provider gets token buckets for requests and tokens per minute
+    (LLM_RPM_LIMITS / LLM_TPM_LIMITS; unset = unlimited, no queueing).
+    When a bucket runs dry, callers wait in a queue per
+    ConversationPriority, served by smooth weighted round robin
+    (LLM_PRIORITY_WEIGHTS) so VIP moves first without starving the rest.
+    
+    Under saturation the shed priorities (NORMAL / LOW by default) are
+    rejected up front once LLM_SHED_QUEUE_DEPTH callers are waiting,
+    and any caller that waits past its priority's max wait is rejected
+    with AdmissionRejected — failover then tries the other provider
+    (a separate budget) before the canned reply.
+    """
+    
+    def __init__(
+        self,
+        rpm_limits: Dict[str, int],
+        tpm_limits: Dict[str, int],
+        weights: Dict[str, int],
+        max_wait: Dict[str, float],
+        shed_depth: int,
+        shed_priorities: Iterable[str],
+    ):
+        self.rpm_limits = rpm_limits
+        self.tpm_limits = tpm_limits
+        self.weights = {p: max(1, weights.get(p, 1)) for p in PRIORITIES}
+        self.max_wait = max_wait
+        self.shed_depth = shed_depth
+        self.shed_priorities = set(shed_priorities)
+        self._cond = threading.Condition()
+        self._lanes: Dict[str, _Lane] = {}
+    
+    def _lane(self, provider: str) -> _Lane:
+        lane = self._lanes.get(provider)
+        if lane is None:
+            lane = self._lanes[provider] = _Lane(
+                self.rpm_limits.get(provider, 0),
+                self.tpm_limits.get(provider, 0),
+            )
+        return lane
+    
+    def admit(self, provider: str, priority: Optional[str], tokens: int) -> None:
+        """Block until the call may go out. Raises AdmissionRejected when shed."""
+        priority = getattr(priority, "value", priority)  # ConversationPriority or str
+        priority = priority if priority in self.weights else DEFAULT_PRIORITY
+        with self._cond:
+            lane = self._lane(provider)
+            if not lane.limited:
+                lane.admitted[priority] += 1
+                return
+            
+            # Fast path: nobody queued and the buckets have room
+            if not lane.waiting and lane.wait_for(tokens, time.monotonic()) == 0:
+                lane.take(tokens)
+                lane.admitted[priority] += 1
+                return
+            
+            if priority in self.shed_priorities and lane.waiting >= self.shed_depth:
+                lane.shed[priority] += 1
+                raise AdmissionRejected(f"{provider} saturated ({lane.waiting} waiting), {priority} shed")
+            
+            waiter = _Waiter(priority, tokens)
+            lane.queues[priority].append(waiter)
+            deadline = time.monotonic() + self.max_wait.get(priority, 5.0)
+            while True:
+                delay = self._dispatch(lane)
+                if waiter.granted:
+                    return
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    lane.queues[priority].remove(waiter)
+                    lane.shed[priority] += 1
+                    self._cond.notify_all()
+                    raise AdmissionRejected(f"{provider} rate limited, {priority} waited too long")
+                self._cond.wait(timeout=min(delay, remaining) if delay else remaining)
+    
+    async def aadmit(self, provider: str, priority: Optional[str], tokens: int) -> None:
+        """admit() for async callers (waits in a thread only if the provider is limited)."""
+        with self._cond:
+            limited = self._lane(provider).limited
+        if not limited:
+            self.admit(provider, priority, tokens)
+            return
+        await asyncio.to_thread(self.admit, provider, priority, tokens)
+    
+    def settle(self, provider: str, estimated: int, actual: int) -> None:
+        """Correct the token bucket once the real usage is known."""
+        if actual == estimated:
+            return
+        with self._cond:
+            lane = self._lane(provider)
+            if lane.tokens is not None:
+                lane.tokens.take(actual - estimated)
+                self._cond.notify_all()
+    
+    def _dispatch(self, lane: _Lane) -> Optional[float]:
+        """
+        Grant queued callers while the buckets allow. Returns seconds
+        until the next grant is possible, or None if nobody is waiting.
+        """
+        granted = False
+        try:
+            while True:
+                ready = [p for p in PRIORITIES if lane.queues[p]]
+                if not ready:
+                    return None
+                for p in ready:
+                    lane.credit[p] += self.weights[p]
+                pick = max(ready, key=lambda p: lane.credit[p])
+                head = lane.queues[pick][0]
+                wait = lane.wait_for(head.tokens, time.monotonic())
+                if wait > 0:
+                    for p in ready:
+                        lane.credit[p] -= self.weights[p]  # No grant this round
+                    return wait
+                lane.credit[pick] -= sum(self.weights[p] for p in ready)
+                lane.queues[pick].popleft()
+                lane.take(head.tokens)
+                lane.admitted[pick] += 1
+                head.granted = granted = True
+        finally:
+            if granted:
+                self._cond.notify_all()
+    
+    def snapshot(self) -> List[dict]:
+        with self._cond:
+            now = time.monotonic()
+            out = []
+            for provider, lane in self._lanes.items():
+                for bucket in (lane.requests, lane.tokens):
+                    if bucket is not None:
+                        bucket.refill(now)
+                out.append({
+                    "provider": provider,
+                    "rpm_available": round(lane.requests.level) if lane.requests else None,
+                    "tpm_available": round(lane.tokens.level) if lane.tokens else None,
+                    "waiting": {p: len(q) for p, q in lane.queues.items() if q},
+                    "admitted": dict(lane.admitted),
+                    "shed": dict(lane.shed),
+                })
+            return out
+
+
+# Singleton instance
+llm_scheduler = AdmissionScheduler(
+    rpm_limits=settings.LLM_RPM_LIMITS,
+    tpm_limits=settings.LLM_TPM_LIMITS,
+    weights=settings.LLM_PRIORITY_WEIGHTS,
+    max_wait=settings.LLM_PRIORITY_MAX_WAIT_SECONDS,
+    shed_depth=settings.LLM_SHED_QUEUE_DEPTH,
+    shed_priorities=settings.LLM_SHED_PRIORITIES,
+)
@@ -0,0 +1,33 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║   AuroraOS LLM Token Estimate                                    ║
+║   Local, no tokenizer dependency                                 ║
+║                                                                  ║
+║   Baron Baba © SiyahKare, 2025                                   ║
+╚══════════════════════════════════════════════════════════════════╝
+"""
+
+import math
+from typing import Iterable, Optional
+
+
+MESSAGE_OVERHEAD_TOKENS = 4  # Role + separators per chat message
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """
+    ~4 UTF-8 bytes per token. Close for English BPE vocabularies; for
+    Turkish (2-byte ç/ğ/ı/ö/ş/ü) it errs high, the safe side for a budget.
+    """
+    if not text:
+        return 0
+    return math.ceil(len(text.encode("utf-8")) / 4)
+
+
+def estimate_message_tokens(text: Optional[str]) -> int:
+    return estimate_tokens(text) + MESSAGE_OVERHEAD_TOKENS
+
+
+def estimate_request_tokens(messages: Iterable[dict], max_tokens: int = 0) -> int:
+    """Prompt estimate plus the completion allowance of a chat request."""
+    return sum(estimate_message_tokens(m.get("content")) for m in messages) + max_tokens
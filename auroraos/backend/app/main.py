@@ -9,13 +9,33 @@
 ╚══════════════════════════════════════════════════════════════════╝
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from .config import settings
 from .db import init_db
+from .metrics import MetricsMiddleware, metrics
 from .routers import content, ai, analytics, dm, day
 from .orchestrator.router import router as orchestrator_router
+from .orchestrator.services.agent_pool import agent_pool
+from .llm.gateway import llm_gateway
+from .llm.ledger import usage_ledger
 from .state.router import router as state_router
+from .state.rollup import treasury_rollup
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background workers live on the server's event loop
+    await agent_pool.start()
+    await treasury_rollup.start()
+    yield
+    await treasury_rollup.stop()
+    await agent_pool.stop()
+    await llm_gateway.aclose()
+    usage_ledger.stop()  # Flush buffered ai_operations rows
 
 
 def create_app() -> FastAPI:
@@ -23,6 +43,7 @@ def create_app() -> FastAPI:
         title=settings.PROJECT_NAME,
         description="AuroraOS — Betül'e ithaf edilen yapay zekâ sistemi",
         version="0.1.0",
+        lifespan=lifespan,
     )
 
     # CORS for frontend
@@ -40,6 +61,9 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    
+    # 📈 Request latency + DB statements per endpoint (see GET /metrics)
+    app.add_middleware(MetricsMiddleware)
 
     init_db()
 
@@ -63,6 +87,14 @@ def create_app() -> FastAPI:
             "message": "Aurora senin enerjinden öğreniyor. ✨",
         }
 
+    @app.get("/metrics", include_in_schema=False)
+    def prometheus_metrics():
+        """📈 Prometheus scrape endpoint (text exposition format)."""
+        return PlainTextResponse(
+            metrics.render(),
+            media_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
     return app
 
 
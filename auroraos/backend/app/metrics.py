@@ -0,0 +1,399 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║   AuroraOS Metrics                                               ║
+║   Prometheus text exposition — counters, gauges, histograms      ║
+║                                                                  ║
+║   Baron Baba © SiyahKare, 2025                                   ║
+╚══════════════════════════════════════════════════════════════════╝
+"""
+
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+LabelValues = Tuple[str, ...]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+DB_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+# ═══════════════════════════════════════════════════════════════════
+# METRIC TYPES
+# ═══════════════════════════════════════════════════════════════════
+
+class _Metric:
+    kind = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: Dict[str, object]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(getattr(labels[n], "value", labels[n])) for n in self.labelnames)
+    
+    def header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+    
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic total, per label set."""
+    kind = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+    
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class Gauge(_Metric):
+    """Current value, per label set."""
+    kind = "gauge"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+    
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+    
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+@dataclass
+class _HistogramSeries:
+    counts: List[int]  # Per bucket, not cumulative
+    total: float = 0.0
+    count: int = 0
+
+
+class Histogram(_Metric):
+    """Bucketed observations (cumulative `le` buckets, _sum and _count)."""
+    kind = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series: Dict[LabelValues, _HistogramSeries] = {}
+    
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(counts=[0] * len(self.buckets))
+            series.counts[index] += 1
+            series.total += value
+            series.count += 1
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            series = [(key, list(s.counts), s.total, s.count) for key, s in self._series.items()]
+        names = self.labelnames + ("le",)
+        lines = []
+        for key, counts, total, count in series:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_format_labels(names, key + (_format_value(bound),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+# ═══════════════════════════════════════════════════════════════════
+# REGISTRY
+# ═══════════════════════════════════════════════════════════════════
+
+class MetricsRegistry:
+    """
+    In-process metrics, rendered in the Prometheus text format at
+    GET /metrics (no client library needed).
+    
+    Metrics are module-level objects created once at import; values
+    are per process, so with several uvicorn workers each one is
+    scraped (or aggregated) separately. Collectors registered with
+    on_collect() run just before rendering, for gauges that are
+    cheaper to read at scrape time than to keep up to date (e.g. the
+    outbound queue depth).
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+    
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+    
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+    
+    def on_collect(self, collector: Callable[[], None]) -> Callable[[], None]:
+        """Register a scrape-time callback (usable as a decorator)."""
+        with self._lock:
+            self._collectors.append(collector)
+        return collector
+    
+    def render(self) -> str:
+        with self._lock:
+            collectors = list(self._collectors)
+            metrics = list(self._metrics.values())
+        for collector in collectors:
+            try:
+                collector()
+            except Exception as e:
+                print(f"[Metrics] Collector {collector.__name__} failed: {e}")
+        
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+# Singleton instance
+metrics = MetricsRegistry()
+
+
+# ═══════════════════════════════════════════════════════════════════
+# HTTP — request latency per endpoint
+# ═══════════════════════════════════════════════════════════════════
+
+http_request_seconds = metrics.histogram(
+    "aurora_http_request_duration_seconds",
+    "Time until the response starts, by route template",
+    ["method", "route", "status"],
+)
+http_requests_in_flight = metrics.gauge(
+    "aurora_http_requests_in_flight",
+    "Requests currently being handled",
+)
+db_queries_per_request = metrics.histogram(
+    "aurora_http_request_db_queries",
+    "DB statements executed while handling one request",
+    ["method", "route"],
+    buckets=COUNT_BUCKETS,
+)
+db_seconds_per_request = metrics.histogram(
+    "aurora_http_request_db_seconds",
+    "Total DB statement time while handling one request",
+    ["method", "route"],
+    buckets=DB_LATENCY_BUCKETS,
+)
+
+
+@dataclass
+class _QueryTally:
+    count: int = 0
+    seconds: float = 0.0
+
+
+# The tally object (not a counter value) lives in the context var, so
+# queries made in FastAPI's threadpool — which runs with a copy of the
+# request context — still add to the request's tally.
+_request_queries: ContextVar[Optional[_QueryTally]] = ContextVar("aurora_request_queries", default=None)
+
+
+def _route_template(scope: dict) -> str:
+    """
+    Matched route as a template (/v1/orchestrator/conversations/{conversation_id}),
+    so path params don't explode the label set. Routes of included
+    routers may only know their own path; the prefix is recovered from
+    the request path.
+    """
+    template = getattr(scope.get("route"), "path_format", None)
+    if not template:
+        return "unmatched"
+    try:
+        concrete = template.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = scope["path"]
+    return path[: len(path) - len(concrete)] + template if path.endswith(concrete) else template
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request.
+    
+    Latency is measured to the start of the response, so SSE streams
+    and long-polls count their time-to-first-byte rather than their
+    whole lifetime. DB statements are tallied per request and observed
+    once the response body has been sent.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        start = time.perf_counter()
+        tally = _QueryTally()
+        token = _request_queries.set(tally)
+        status = {"code": 500, "observed": False}
+        
+        def observe() -> None:
+            if not status["observed"]:
+                status["observed"] = True
+                http_request_seconds.observe(
+                    time.perf_counter() - start,
+                    method=method,
+                    route=_route_template(scope),
+                    status=str(status["code"]),
+                )
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                observe()
+            await send(message)
+        
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            observe()  # Errors before the response started count as 500
+            http_requests_in_flight.dec()
+            _request_queries.reset(token)
+            route = _route_template(scope)
+            db_queries_per_request.observe(tally.count, method=method, route=route)
+            db_seconds_per_request.observe(tally.seconds, method=method, route=route)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# DB — statement count / latency
+# ═══════════════════════════════════════════════════════════════════
+
+db_query_seconds = metrics.histogram(
+    "aurora_db_query_duration_seconds",
+    "DB statement latency by statement kind",
+    ["operation"],
+    buckets=DB_LATENCY_BUCKETS,
+)
+db_query_errors = metrics.counter(
+    "aurora_db_query_errors_total",
+    "DB statements that raised",
+    ["operation"],
+)
+
+_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "PRAGMA", "CREATE"}
+
+
+def _operation(statement: str) -> str:
+    word = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return word if word in _OPERATIONS else "OTHER"
+
+
+def track_queries(engine: Engine) -> None:
+    """Time every statement on `engine` (globally and per HTTP request)."""
+    
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._aurora_query_start = time.perf_counter()
+    
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_aurora_query_start", None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        db_query_seconds.observe(elapsed, operation=_operation(statement))
+        tally = _request_queries.get()
+        if tally is not None:
+            tally.count += 1
+            tally.seconds += elapsed
+    
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        db_query_errors.inc(operation=_operation(exception_context.statement or ""))
@@ -0,0 +1,271 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║   AuroraOS Schema Migrations                                     ║
+║   Versioned, forward-only, applied at startup after create_all   ║
+║                                                                  ║
+║   Baron Baba © SiyahKare, 2025                                   ║
+╚══════════════════════════════════════════════════════════════════╝
+
+create_all() only creates missing tables, so a column or index added
+to a model never reaches an existing database. Each such change gets a
+numbered migration here; schema_migrations records which ones a
+database has seen, and migrate() applies the rest in order, one
+transaction each.
+
+Models stay the source of truth: a fresh database gets everything from
+create_all(), so every step must be idempotent (add what is missing,
+skip what is there). Indexes are created from their model definitions,
+never spelled out twice.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import SQLModel
+
+
+# Own MetaData: not a model, and create_all() of the models must not touch it
+_meta = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _meta,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, name: str):
+    """Register `upgrade(conn)` as migration `version`."""
+    def register(upgrade: Callable[[Connection], None]):
+        assert not MIGRATIONS or MIGRATIONS[-1].version < version, "migrations must be declared in order"
+        MIGRATIONS.append(Migration(version, name, upgrade))
+        return upgrade
+    return register
+
+
+# ═══════════════════════════════════════════════════════════════════
+# Helpers
+# ═══════════════════════════════════════════════════════════════════
+
+def add_columns(conn: Connection, table_name: str, *column_names: str) -> None:
+    """ALTER TABLE ADD COLUMN for model columns the table doesn't have yet."""
+    table = SQLModel.metadata.tables[table_name]
+    existing = {c["name"] for c in inspect(conn).get_columns(table_name)}
+    for name in column_names:
+        if name in existing:
+            continue
+        column = table.c[name]
+        assert column.nullable, f"{table_name}.{name}: only nullable columns can be added in place"
+        ddl = column.type.compile(dialect=conn.dialect)
+        conn.exec_driver_sql(f'ALTER TABLE {table_name} ADD COLUMN "{name}" {ddl}')
+        print(f"[Migrations] Added column {table_name}.{name}")
+
+
+def create_indexes(conn: Connection, table_name: str, *index_names: str) -> None:
+    """CREATE INDEX for the named model indexes that don't exist yet."""
+    table = SQLModel.metadata.tables[table_name]
+    indexes = {index.name: index for index in table.indexes}
+    existing = {i["name"] for i in inspect(conn).get_indexes(table_name)}
+    for name in index_names:
+        if name not in existing:
+            indexes[name].create(conn)
+            print(f"[Migrations] Created index {name}")
+
+
+# ═══════════════════════════════════════════════════════════════════
+# Migrations
+# ═══════════════════════════════════════════════════════════════════
+
+@migration(1, "baseline")
+def _baseline(conn: Connection) -> None:
+    """The schema as create_all() built it before migrations existed."""
+
+
+@migration(2, "conversation list columns")
+def _conversation_list_columns(conn: Connection) -> None:
+    # Denormalized operator list columns, backfilled from the latest message / slot
+    add_columns(conn, "conversations", "last_message_preview", "performer_slot_label")
+    create_indexes(conn, "conversations", "ix_conversations_recent")
+    conn.exec_driver_sql(
+        """
+        UPDATE conversations SET last_message_preview = (
+            SELECT substr(m.text, 1, 100) FROM conversation_messages m  -- PREVIEW_LENGTH
+            WHERE m.conversation_id = conversations.id
+            ORDER BY m.id DESC LIMIT 1
+        )
+        WHERE last_message_preview IS NULL
+        """
+    )
+    conn.exec_driver_sql(
+        """
+        UPDATE conversations SET performer_slot_label = (
+            SELECT s.label FROM performer_slots s WHERE s.id = conversations.performer_slot_id
+        )
+        WHERE performer_slot_label IS NULL
+        """
+    )
+
+
+@migration(3, "unique user mappings")
+def _unique_user_mappings(conn: Connection) -> None:
+    # One mapping per (origin, external_user_id): keep the oldest, as lookups did
+    unique = {u["name"] for u in inspect(conn).get_unique_constraints("user_mappings")}
+    if "uq_user_mappings_origin_external" not in unique:
+        # Conversations created under a duplicate's ID move to the surviving one first
+        moved = conn.exec_driver_sql(
+            """
+            UPDATE conversations SET user_id = (
+                SELECT keep.internal_user_id FROM user_mappings keep
+                WHERE keep.id = (
+                    SELECT MIN(m.id) FROM user_mappings m
+                    WHERE m.origin = conversations.origin
+                    AND m.external_user_id = conversations.external_user_id
+                )
+            )
+            WHERE user_id IN (
+                SELECT dup.internal_user_id FROM user_mappings dup
+                WHERE dup.origin = conversations.origin
+                AND dup.external_user_id = conversations.external_user_id
+                AND dup.id > (
+                    SELECT MIN(m.id) FROM user_mappings m
+                    WHERE m.origin = dup.origin AND m.external_user_id = dup.external_user_id
+                )
+            )
+            """
+        ).rowcount
+        if moved:
+            print(f"[Migrations] Moved {moved} conversation(s) to their user's surviving mapping")
+        removed = conn.exec_driver_sql(
+            """
+            DELETE FROM user_mappings WHERE id NOT IN (
+                SELECT MIN(id) FROM user_mappings GROUP BY origin, external_user_id
+            )
+            """
+        ).rowcount
+        if removed:
+            print(f"[Migrations] Removed {removed} duplicate user mapping(s)")
+        # SQLite can't add a table constraint in place; a unique index enforces the same
+        conn.exec_driver_sql(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_user_mappings_origin_external "
+            "ON user_mappings (origin, external_user_id)"
+        )
+    
+    # Start the internal ID sequence after the IDs the old max+1 scheme handed out
+    max_id = conn.exec_driver_sql("SELECT MAX(internal_user_id) FROM user_mappings").scalar()
+    seeded = conn.exec_driver_sql("SELECT MAX(id) FROM internal_user_ids").scalar()
+    if max_id and seeded is None:
+        conn.execute(
+            text("INSERT INTO internal_user_ids (id, created_at) VALUES (:id, CURRENT_TIMESTAMP)"),
+            {"id": max_id},
+        )
+        if conn.dialect.name == "postgresql":  # An explicit id doesn't advance the serial
+            conn.exec_driver_sql(
+                "SELECT setval(pg_get_serial_sequence('internal_user_ids', 'id'), "
+                "(SELECT MAX(id) FROM internal_user_ids))"
+            )
+        print(f"[Migrations] Seeded internal_user_ids at {max_id}")
+
+
+@migration(4, "performer slot token budget")
+def _performer_slot_token_budget(conn: Connection) -> None:
+    # NULL → AGENT_CONTEXT_TOKEN_BUDGET, so existing slots keep the default
+    add_columns(conn, "performer_slots", "context_token_budget")
+
+
+@migration(5, "llm ledger columns")
+def _llm_ledger_columns(conn: Connection) -> None:
+    # Gateway calls recorded in ai_operations; older rows keep NULLs
+    add_columns(
+        conn, "ai_operations",
+        "provider", "caller", "conversation_id", "prompt_tokens", "completion_tokens", "duration_ms",
+    )
+    create_indexes(
+        conn, "ai_operations",
+        "ix_ai_operations_caller", "ix_ai_operations_conversation_id", "ix_ai_operations_created_at",
+    )
+
+
+@migration(6, "hot query indexes")
+def _hot_query_indexes(conn: Connection) -> None:
+    create_indexes(conn, "conversations", "ix_conversations_user_slot_active")
+    create_indexes(conn, "conversation_messages", "ix_conversation_messages_thread")
+    create_indexes(conn, "dm_messages", "ix_dm_messages_thread")
+    create_indexes(conn, "content_items", "ix_content_items_status_created")
+    create_indexes(conn, "decisions", "ix_decisions_feedback_created")
+    create_indexes(
+        conn, "citizens",
+        "ix_citizens_status_joined", "ix_citizens_joined", "ix_citizens_tier", "ix_citizens_online",
+    )
+    create_indexes(
+        conn, "treasury_transactions",
+        "ix_treasury_transactions_created", "ix_treasury_transactions_citizen_created",
+    )
+    create_indexes(conn, "content_flags", "ix_content_flags_status_created")
+    create_indexes(conn, "threat_logs", "ix_threat_logs_status_created", "ix_threat_logs_created")
+    create_indexes(conn, "outbound_queue", "ix_outbound_queue_lease")
+    conn.exec_driver_sql("ANALYZE")  # Fresh planner statistics for the new indexes
+
+
+@migration(7, "dashboard stats row")
+def _dashboard_stats_row(conn: Connection) -> None:
+    # Seed the single materialized row, stale until the first dashboard read
+    exists = conn.exec_driver_sql("SELECT 1 FROM dashboard_stats WHERE id = 1").first()
+    if not exists:
+        conn.exec_driver_sql("INSERT INTO dashboard_stats (id, version, computed_version) VALUES (1, 0, -1)")
+
+
+@migration(8, "treasury rollups")
+def _treasury_rollups(conn: Connection) -> None:
+    # Snapshots written before the rollup job were daily
+    add_columns(conn, "treasury_snapshots", "period", "reserve_delta")
+    conn.exec_driver_sql("UPDATE treasury_snapshots SET period = 'DAY' WHERE period IS NULL")
+    conn.exec_driver_sql("UPDATE treasury_snapshots SET reserve_delta = 0 WHERE reserve_delta IS NULL")
+    create_indexes(conn, "treasury_snapshots", "ix_treasury_snapshots_period_date")
+    # closed_through NULL: the first runs fold in the existing history once
+    exists = conn.exec_driver_sql("SELECT 1 FROM treasury_rollup_state WHERE id = 1").first()
+    if not exists:
+        conn.exec_driver_sql("INSERT INTO treasury_rollup_state (id, updated_at) VALUES (1, CURRENT_TIMESTAMP)")
+
+
+# ═══════════════════════════════════════════════════════════════════
+# Runner
+# ═══════════════════════════════════════════════════════════════════
+
+def migrate(engine: Engine) -> int:
+    """Apply pending migrations; returns how many ran."""
+    _meta.create_all(bind=engine)
+    applied = 0
+    for step in MIGRATIONS:
+        with engine.begin() as conn:
+            if conn.dialect.name == "sqlite":
+                # Take the write lock before checking, so two starting workers don't both apply it
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
+            done = conn.execute(
+                select(schema_migrations.c.version).where(schema_migrations.c.version == step.version)
+            ).first()
+            if done:
+                continue
+            step.upgrade(conn)
+            conn.execute(
+                schema_migrations.insert().values(
+                    version=step.version, name=step.name, applied_at=datetime.utcnow(),
+                )
+            )
+        applied += 1
+        print(f"[Migrations] Applied {step.version}: {step.name}")
+    return applied
+
@@ -1,6 +1,7 @@
 # backend/app/models.py
 from datetime import datetime, date
 from typing import Optional, List, TYPE_CHECKING
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 
 if TYPE_CHECKING:
@@ -24,6 +25,10 @@ class ContentVariant(SQLModel, table=True):
 
 class ContentItem(SQLModel, table=True):
     __tablename__ = "content_items"
+    __table_args__ = (
+        # Pending queue / approved wall, newest first
+        Index("ix_content_items_status_created", "status", "created_at"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     type: str = Field(index=True)  # post, story, dm_reply, sugoda_script
@@ -44,6 +49,10 @@ class ContentItem(SQLModel, table=True):
 
 class Decision(SQLModel, table=True):
     __tablename__ = "decisions"
+    __table_args__ = (
+        # Style-learning examples, newest first
+        Index("ix_decisions_feedback_created", "feedback_type", "created_at"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     content_item_id: int = Field(foreign_key="content_items.id", index=True)
@@ -81,6 +90,10 @@ class DMMessage(SQLModel, table=True):
     Stores both incoming and outgoing messages.
     """
     __tablename__ = "dm_messages"
+    __table_args__ = (
+        # One DM thread, in order
+        Index("ix_dm_messages_thread", "channel", "external_user_id", "created_at"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     channel: str = Field(index=True)  # telegram / sugoda / instagram
@@ -128,3 +141,24 @@ class DayEvent(SQLModel, table=True):
 
     day: Optional[DayLog] = Relationship(back_populates="events")
 
+
+
+# ═══════════════════════════════════════════════════════════════════
+# LLM context: rolling conversation summaries
+# ═══════════════════════════════════════════════════════════════════
+
+class ContextSummary(SQLModel, table=True):
+    """
+    Rolling summary of the turns that no longer fit in a prompt.
+    key: "conversation:<id>" (orchestrator) or "dm:<channel>:<external_user_id>".
+    Refreshed incrementally — each refresh folds the messages after
+    covered_until_id into the previous summary.
+    """
+    __tablename__ = "context_summaries"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    key: str = Field(index=True, unique=True)
+    summary: str
+    covered_until_id: int = 0  # Last message ID folded into the summary
+    covered_messages: int = 0
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -13,6 +13,7 @@ from enum import Enum
 from datetime import datetime
 from typing import Optional, List
 
+from sqlalchemy import Index, UniqueConstraint
 from sqlmodel import SQLModel, Field, Relationship
 
 
@@ -43,6 +44,13 @@ class ConversationOrigin(str, Enum):
     ONLYVIPS = "ONLYVIPS"
 
 
+class OutboundStatus(str, Enum):
+    """Delivery state of a queued outbound message."""
+    PENDING = "PENDING"       # Waiting for (re)delivery, may be leased
+    DELIVERED = "DELIVERED"   # Acked by the platform
+    DEAD = "DEAD"             # Gave up after too many attempts
+
+
 # ═══════════════════════════════════════════════════════════════════
 # OPERATOR — Human operator (Betül, etc.)
 # ═══════════════════════════════════════════════════════════════════
@@ -84,6 +92,8 @@ class PerformerSlot(SQLModel, table=True):
     system_prompt: Optional[str] = None
     temperature: float = Field(default=0.8)
     max_tokens: int = Field(default=200)
+    # Prompt tokens per call; None → AGENT_CONTEXT_TOKEN_BUDGET (older DBs: migration 4)
+    context_token_budget: Optional[int] = None
     
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -99,6 +109,12 @@ class PerformerSlot(SQLModel, table=True):
 class Conversation(SQLModel, table=True):
     """An active conversation between a user and performer."""
     __tablename__ = "conversations"
+    __table_args__ = (
+        # Operator console list: keyset on (last_message_at, id); migration 2 on older DBs
+        Index("ix_conversations_recent", "is_active", "last_message_at", "id"),
+        # Inbound: the active conversation of (user, slot)
+        Index("ix_conversations_user_slot_active", "user_id", "performer_slot_id", "is_active"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     
@@ -122,6 +138,11 @@ class Conversation(SQLModel, table=True):
     is_active: bool = Field(default=True)
     last_message_at: Optional[datetime] = None
     
+    # Denormalized for the operator list (updated on every message write);
+    # databases older than these columns get them from migration 2
+    last_message_preview: Optional[str] = None
+    performer_slot_label: Optional[str] = None
+    
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
@@ -138,6 +159,10 @@ class Conversation(SQLModel, table=True):
 class ConversationMessage(SQLModel, table=True):
     """A single message in a conversation."""
     __tablename__ = "conversation_messages"
+    __table_args__ = (
+        # One conversation's history, in order
+        Index("ix_conversation_messages_thread", "conversation_id", "created_at"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     conversation_id: int = Field(foreign_key="conversations.id", index=True)
@@ -169,6 +194,9 @@ class ConversationMessage(SQLModel, table=True):
 class UserMapping(SQLModel, table=True):
     """Maps external user IDs (fm_123, tg_456) to internal Aurora user IDs."""
     __tablename__ = "user_mappings"
+    __table_args__ = (
+        UniqueConstraint("origin", "external_user_id", name="uq_user_mappings_origin_external"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     origin: ConversationOrigin = Field(index=True)
@@ -183,3 +211,51 @@ class UserMapping(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+
+class InternalUserId(SQLModel, table=True):
+    """
+    Sequence for internal Aurora user IDs.
+    
+    One row per allocated ID; the autoincrement key is the ID, so
+    concurrent allocations never collide.
+    """
+    __tablename__ = "internal_user_ids"
+    __table_args__ = {"sqlite_autoincrement": True}
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# OUTBOUND QUEUE — Durable replies waiting for platform delivery
+# ═══════════════════════════════════════════════════════════════════
+
+class OutboundQueueItem(SQLModel, table=True):
+    """
+    A reply waiting to be picked up by FlirtMarket / Telegram.
+    
+    Polling leases a row by pushing `visible_at` into the future;
+    if the platform never acks, the row becomes visible again.
+    """
+    __tablename__ = "outbound_queue"
+    __table_args__ = (
+        Index("ix_outbound_queue_claim", "origin", "status", "visible_at"),
+        Index("ix_outbound_queue_ack", "origin", "message_id"),
+        Index("ix_outbound_queue_lease", "lease_token"),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    origin: ConversationOrigin
+    external_user_id: str
+    text: str
+    conversation_id: Optional[int] = None
+    message_id: Optional[int] = None  # ConversationMessage.id
+    
+    # Delivery state
+    status: OutboundStatus = Field(default=OutboundStatus.PENDING)
+    attempts: int = Field(default=0)
+    visible_at: datetime = Field(default_factory=datetime.utcnow)
+    lease_token: Optional[str] = None
+    
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    delivered_at: Optional[datetime] = None
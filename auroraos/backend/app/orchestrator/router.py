@@ -5,22 +5,32 @@
 ║                                                                  ║
 ║   Endpoints:                                                     ║
 ║   - POST /incoming-message  (FlirtMarket/Telegram → Aurora)      ║
+║   - POST /incoming-messages:batch (bulk ingest)                  ║
 ║   - GET  /conversations     (Operator Console - list)            ║
 ║   - GET  /conversations/:id (Operator Console - detail)          ║
 ║   - POST /conversations/:id/reply (Operator sends reply)         ║
+║   - GET  /conversations/:id/draft/stream (SSE agent draft)       ║
 ║   - GET  /outbound/poll     (Platform polls for replies)         ║
+║   - GET  /outbound/stream   (SSE feed of replies)                ║
+║   - POST /outbound/confirm  (Platform acks a delivered reply)    ║
 ║                                                                  ║
 ║   Baron Baba © SiyahKare, 2025                                   ║
 ╚══════════════════════════════════════════════════════════════════╝
 """
 
+import asyncio
 from datetime import datetime
 from typing import Optional, List
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlmodel import Session, select, func
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session, select, or_, and_
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..deps import get_db
+from ..deps import get_db, get_async_db
+from ..config import settings
+from ..db import after_commit
+from ..metrics import metrics
 from .models import (
     Conversation,
     ConversationMessage,
@@ -33,6 +43,8 @@ from .models import (
 from .schemas import (
     IncomingMessageDTO,
     IncomingMessageResponse,
+    IncomingMessageBatch,
+    IncomingMessageBatchResponse,
     ConversationListItem,
     ConversationDetail,
     MessageOut,
@@ -43,20 +55,41 @@ from .schemas import (
     OperatorCreate,
     OperatorOut,
     OperatorStatusUpdate,
+    AgentJobStatus,
+)
+from .services.assignment import operator_index
+from .services.agent_cache import history_cache, slot_cache
+from .services.conversations import append_message, set_preview, encode_cursor, decode_cursor
+from .services.agent_pool import agent_pool
+from .services.draft_stream import prepare_draft, stream_draft_events
+from .services.inbound import process_incoming_message, process_incoming_batch
+from .services.outbound import (
+    enqueue_outbound_message,
+    confirm_outbound_delivered,
+    confirm_outbound_delivered_batch,
+    get_dead_letters,
+    wait_for_outbound,
+    stream_outbound_events,
 )
-from .services.routing import decide_routing
-from .services.agent import call_aurora_agent, generate_agent_draft
-from .services.user_mapping import map_external_user_to_internal, update_user_stats
-from .services.outbound import enqueue_outbound_message, get_outbound_for_polling, confirm_outbound_delivered
 
 
 router = APIRouter()
 
+inbound_messages = metrics.counter(
+    "aurora_inbound_messages_total",
+    "Accepted inbound messages by origin and routing mode",
+    ["origin", "mode"],
+)
+
 
 # ═══════════════════════════════════════════════════════════════════
 # INCOMING MESSAGE — Main orchestrator entry point
 # ═══════════════════════════════════════════════════════════════════
 
+# Inbound routes stay sync (threadpool): a sync reply calls the LLM
+# inline and takes conversation locks, neither of which may run on the
+# event loop. The read/console routes below are async (AsyncSession).
+
 @router.post("/incoming-message", response_model=IncomingMessageResponse)
 def incoming_message(
     payload: IncomingMessageDTO,
@@ -75,157 +108,58 @@ def incoming_message(
     5. If AI_ONLY: call agent, save reply, queue outbound
     6. If HYBRID: create draft for operator
     7. If HUMAN: just queue for operator
-    """
-    origin = payload.origin
-    ext_user = payload.external_user_id
-    slot_id = payload.performer_slot_id
-    text = payload.text
-    meta = payload.meta
-    
-    # 1) External → Internal user mapping
-    user_id = map_external_user_to_internal(db, origin, ext_user)
-    
-    # Update user stats if provided
-    if meta:
-        update_user_stats(
-            db, origin, ext_user,
-            coins_spent=meta.coins_spent_total,
-            vip_tier=meta.vip_tier,
-        )
     
-    # 2) Find or create conversation
-    stmt = select(Conversation).where(
-        Conversation.user_id == user_id,
-        Conversation.performer_slot_id == slot_id,
-        Conversation.is_active == True,
-    )
-    convo = db.exec(stmt).first()
+    With async replies (AGENT_ASYNC_REPLIES or `async_reply: true`),
+    steps 5/6 run in the agent worker pool and the response carries a
+    `tracking_id` to look up via GET /jobs/{tracking_id}.
     
-    if not convo:
-        # Get performer slot
-        slot = db.get(PerformerSlot, slot_id)
-        if not slot:
-            raise HTTPException(status_code=404, detail="PerformerSlot not found")
-        
-        convo = Conversation(
-            user_id=user_id,
-            external_user_id=ext_user,
-            performer_slot_id=slot_id,
-            agent_id=slot.agent_id,
-            origin=origin,
-        )
-        db.add(convo)
-        db.commit()
-        db.refresh(convo)
-    
-    # 3) Save incoming message
-    msg = ConversationMessage(
-        conversation_id=convo.id,
-        sender="user",
-        text=text,
-        source=origin.value.lower(),
-    )
-    db.add(msg)
+    Steps 1-4 commit once, the reply once more (see services/inbound.py).
+    """
+    try:
+        response = process_incoming_message(db, payload)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     
-    # Update conversation stats
-    convo.message_count += 1
-    convo.last_message_at = datetime.utcnow()
-    if meta and meta.coins_spent_total:
-        convo.coins_spent = meta.coins_spent_total
+    inbound_messages.inc(origin=payload.origin, mode=response.mode)
+    return response
+
+
+@router.post("/incoming-messages:batch", response_model=IncomingMessageBatchResponse)
+def incoming_messages_batch(
+    payload: IncomingMessageBatch,
+    db: Session = Depends(get_db),
+):
+    """
+    📦 Batch version of /incoming-message for high-volume platforms.
     
-    db.add(convo)
-    db.commit()
-    
-    # 4) Routing decision
-    routing = decide_routing(
-        coins_spent_total=meta.coins_spent_total if meta else 0,
-        vip_tier=meta.vip_tier if meta else "none",
-        operator_online=convo.operator_id is not None,
-        current_mode=convo.mode,
-        message_count=convo.message_count,
-    )
+    Up to INBOUND_BATCH_MAX_SIZE messages per request, ingested with
+    bulk queries and a single commit. Agent replies are generated by
+    the worker pool; each result carries a `tracking_id` for
+    GET /jobs/{tracking_id} and replies arrive via the outbound queue.
     
-    # Update conversation if routing changed
-    if routing.mode != convo.mode or routing.priority != convo.priority:
-        convo.mode = routing.mode
-        convo.priority = routing.priority
-        if routing.operator_id:
-            convo.operator_id = routing.operator_id
-        db.add(convo)
-        db.commit()
-        db.refresh(convo)
-    
-    # 5) Handle based on mode
-    reply_text = None
-    queued = False
-    
-    if convo.mode == ConversationMode.AI_ONLY:
-        # Full AI response
-        result = call_aurora_agent(
-            session=db,
-            agent_id=convo.agent_id,
-            conversation_id=convo.id,
-            message=text,
-        )
-        reply_text = result.reply
-        
-        # Save reply
-        reply_msg = ConversationMessage(
-            conversation_id=convo.id,
-            sender="agent",
-            text=reply_text,
-            source=origin.value.lower(),
-            tokens_used=result.tokens_used,
-            model_used=result.model_used,
-        )
-        db.add(reply_msg)
-        convo.message_count += 1
-        db.add(convo)
-        db.commit()
-        db.refresh(reply_msg)
-        
-        # Queue for outbound delivery
-        enqueue_outbound_message(
-            origin=origin,
-            external_user_id=ext_user,
-            text=reply_text,
-            conversation_id=convo.id,
-            message_id=reply_msg.id,
-        )
-        
-    elif convo.mode == ConversationMode.HYBRID_GHOST:
-        # Generate draft for operator
-        result = generate_agent_draft(
-            session=db,
-            agent_id=convo.agent_id,
-            conversation_id=convo.id,
-            message=text,
-        )
-        
-        # Save as draft
-        draft_msg = ConversationMessage(
-            conversation_id=convo.id,
-            sender="agent",
-            text=result.reply,
-            source=origin.value.lower(),
-            is_draft=True,
-            tokens_used=result.tokens_used,
-            model_used=result.model_used,
+    Results are in request order. A bad item (unknown performer slot)
+    fails alone with `success: false`. When the pool has no room
+    (stopped or full) an item is not stored but comes back `deferred`,
+    along with the same user's later items: send them again later.
+    """
+    if not payload.messages:
+        raise HTTPException(status_code=400, detail="Empty batch")
+    if len(payload.messages) > settings.INBOUND_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large (max {settings.INBOUND_BATCH_MAX_SIZE})",
         )
-        db.add(draft_msg)
-        db.commit()
-        
-        queued = True
-        
-    else:  # HUMAN_ONLY
-        queued = True
     
-    return IncomingMessageResponse(
-        conversation_id=convo.id,
-        mode=convo.mode,
-        reply=reply_text,
-        queued_for_operator=queued,
-        priority=convo.priority,
+    results = process_incoming_batch(db, payload.messages)
+    accepted = sum(1 for r in results if r.success)
+    for dto, result in zip(payload.messages, results):
+        if result.success:
+            inbound_messages.inc(origin=dto.origin, mode=result.mode)
+    
+    return IncomingMessageBatchResponse(
+        accepted=accepted,
+        failed=len(results) - accepted,
+        results=results,
     )
 
 
@@ -234,7 +168,8 @@ def incoming_message(
 # ═══════════════════════════════════════════════════════════════════
 
 @router.get("/conversations", response_model=List[ConversationListItem])
-def list_conversations(
+async def list_conversations(
+    response: Response,
     operator_id: Optional[int] = None,
     mode: Optional[ConversationMode] = None,
     priority: Optional[ConversationPriority] = None,
@@ -242,7 +177,8 @@ def list_conversations(
     active_only: bool = True,
     limit: int = Query(default=50, le=100),
     offset: int = 0,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     📋 List conversations for operator console.
@@ -252,8 +188,18 @@ def list_conversations(
     - mode: HYBRID_GHOST, HUMAN_ONLY, etc.
     - priority: VIP, HIGH, etc.
     - origin: FLIRTMARKET, TELEGRAM, etc.
+    
+    Pagination:
+    - cursor: keyset cursor from the previous page's `X-Next-Cursor`
+      header (preferred; `offset` still works without a cursor)
+    
+    Preview and slot label are denormalized on the conversation row,
+    so a page is a single query.
     """
-    stmt = select(Conversation)
+    stmt = (
+        select(Conversation, PerformerSlot.label)
+        .outerjoin(PerformerSlot, PerformerSlot.id == Conversation.performer_slot_id)
+    )
     
     if operator_id:
         stmt = stmt.where(Conversation.operator_id == operator_id)
@@ -266,28 +212,38 @@ def list_conversations(
     if active_only:
         stmt = stmt.where(Conversation.is_active == True)
     
-    stmt = stmt.order_by(Conversation.last_message_at.desc()).offset(offset).limit(limit)
-    
-    conversations = db.exec(stmt).all()
-    
-    result = []
-    for convo in conversations:
-        # Get last message preview
-        last_msg_stmt = (
-            select(ConversationMessage)
-            .where(ConversationMessage.conversation_id == convo.id)
-            .order_by(ConversationMessage.created_at.desc())
-            .limit(1)
-        )
-        last_msg = db.exec(last_msg_stmt).first()
-        
-        # Get performer slot label
-        slot = db.get(PerformerSlot, convo.performer_slot_id)
+    if cursor:
+        try:
+            cursor_at, cursor_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
         
-        result.append(ConversationListItem(
+        if cursor_at is not None:
+            stmt = stmt.where(or_(
+                Conversation.last_message_at < cursor_at,
+                and_(Conversation.last_message_at == cursor_at, Conversation.id < cursor_id),
+                Conversation.last_message_at.is_(None),
+            ))
+        else:
+            stmt = stmt.where(Conversation.last_message_at.is_(None), Conversation.id < cursor_id)
+    elif offset:
+        stmt = stmt.offset(offset)
+    
+    stmt = stmt.order_by(
+        Conversation.last_message_at.desc().nulls_last(),
+        Conversation.id.desc(),
+    ).limit(limit)
+    
+    rows = (await db.exec(stmt)).all()
+    
+    if len(rows) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1][0])
+    
+    return [
+        ConversationListItem(
             id=convo.id,
             external_user_id=convo.external_user_id,
-            performer_slot_label=slot.label if slot else "Unknown",
+            performer_slot_label=convo.performer_slot_label or slot_label or "Unknown",
             agent_id=convo.agent_id,
             mode=convo.mode,
             priority=convo.priority,
@@ -295,11 +251,11 @@ def list_conversations(
             message_count=convo.message_count,
             coins_spent=convo.coins_spent,
             last_message_at=convo.last_message_at,
-            last_message_preview=last_msg.text[:100] if last_msg else None,
+            last_message_preview=convo.last_message_preview,
             is_active=convo.is_active,
-        ))
-    
-    return result
+        )
+        for convo, slot_label in rows
+    ]
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -307,14 +263,14 @@ def list_conversations(
 # ═══════════════════════════════════════════════════════════════════
 
 @router.get("/conversations/{conversation_id}", response_model=ConversationDetail)
-def get_conversation(
+async def get_conversation(
     conversation_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     💬 Get full conversation with messages.
     """
-    convo = db.get(Conversation, conversation_id)
+    convo = await db.get(Conversation, conversation_id)
     if not convo:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
@@ -324,10 +280,10 @@ def get_conversation(
         .where(ConversationMessage.conversation_id == conversation_id)
         .order_by(ConversationMessage.created_at.asc())
     )
-    messages = db.exec(stmt).all()
+    messages = (await db.exec(stmt)).all()
     
     # Get performer slot
-    slot = db.get(PerformerSlot, convo.performer_slot_id)
+    slot = await db.get(PerformerSlot, convo.performer_slot_id)
     
     return ConversationDetail(
         id=convo.id,
@@ -357,26 +313,48 @@ def get_conversation(
     )
 
 
+@router.get("/conversations/{conversation_id}/draft/stream")
+async def stream_draft(conversation_id: int):
+    """
+    ✍️ Stream an agent draft for the newest user message (SSE).
+    
+    Tokens are relayed as `event: token` frames as the model produces
+    them; when the completion ends the draft is saved as an is_draft
+    message and a `done` frame carries its message_id. Approve / edit
+    it via POST /conversations/{id}/reply with `edit_draft_id`.
+    """
+    try:
+        draft = await asyncio.to_thread(prepare_draft, conversation_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    return StreamingResponse(
+        stream_draft_events(draft),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ═══════════════════════════════════════════════════════════════════
 # OPERATOR CONSOLE — Send Reply
 # ═══════════════════════════════════════════════════════════════════
 
 @router.post("/conversations/{conversation_id}/reply", response_model=OperatorReplyResponse)
-def operator_reply(
+async def operator_reply(
     conversation_id: int,
     payload: OperatorReplyRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     ✍️ Operator sends a reply or approves/edits a draft.
     """
-    convo = db.get(Conversation, conversation_id)
+    convo = await db.get(Conversation, conversation_id)
     if not convo:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
     # If editing a draft, update it
     if payload.edit_draft_id:
-        draft = db.get(ConversationMessage, payload.edit_draft_id)
+        draft = await db.get(ConversationMessage, payload.edit_draft_id)
         if draft and draft.is_draft:
             draft.original_text = draft.text
             draft.text = payload.text
@@ -384,17 +362,20 @@ def operator_reply(
             draft.is_draft = False
             draft.sender = "operator" if payload.send_as == "operator" else "agent"
             db.add(draft)
-            db.commit()
-            db.refresh(draft)
+            after_commit(db, lambda: history_cache.invalidate(conversation_id))
+            set_preview(convo, payload.text)
+            db.add(convo)
             
-            # Queue for outbound
+            # Queue for outbound (same transaction)
             enqueue_outbound_message(
+                db,
                 origin=convo.origin,
                 external_user_id=convo.external_user_id,
                 text=payload.text,
                 conversation_id=convo.id,
                 message_id=draft.id,
             )
+            await db.commit()
             
             return OperatorReplyResponse(
                 message_id=draft.id,
@@ -405,31 +386,25 @@ def operator_reply(
     # Create new message
     sender = "operator" if payload.send_as == "operator" else "agent"
     
-    msg = ConversationMessage(
-        conversation_id=conversation_id,
+    msg = append_message(
+        db, convo,
         sender=sender,
         text=payload.text,
         source="operator_console",
-        edited_by_operator=True if sender == "agent" else False,
     )
-    db.add(msg)
+    msg.edited_by_operator = sender == "agent"
+    await db.flush()
     
-    # Update conversation
-    convo.message_count += 1
-    convo.last_message_at = datetime.utcnow()
-    db.add(convo)
-    
-    db.commit()
-    db.refresh(msg)
-    
-    # Queue for outbound
+    # Queue for outbound (same transaction)
     enqueue_outbound_message(
+        db,
         origin=convo.origin,
         external_user_id=convo.external_user_id,
         text=payload.text,
         conversation_id=convo.id,
         message_id=msg.id,
     )
+    await db.commit()
     
     return OperatorReplyResponse(
         message_id=msg.id,
@@ -443,19 +418,43 @@ def operator_reply(
 # ═══════════════════════════════════════════════════════════════════
 
 @router.get("/outbound/poll")
-def poll_outbound(
+async def poll_outbound(
     origin: ConversationOrigin,
     limit: int = Query(default=10, le=50),
+    wait: float = Query(default=0, ge=0, le=60),
 ):
     """
     📤 Platform polls for pending outbound messages.
     
     FlirtMarket/Telegram calls this to get AI/operator replies.
+    Returned messages are leased; ack them via /outbound/confirm
+    or they are redelivered after the lease expires.
+    
+    With `wait` > 0 this is a long-poll: the request blocks until a
+    reply is enqueued for this origin or `wait` seconds pass.
     """
-    messages = get_outbound_for_polling(origin, limit)
+    messages = await wait_for_outbound(origin, limit, wait)
     return {"messages": messages, "count": len(messages)}
 
 
+@router.get("/outbound/stream")
+async def stream_outbound(
+    request: Request,
+    origin: ConversationOrigin,
+    limit: int = Query(default=10, le=50),
+):
+    """
+    📡 Server-Sent Events stream of outbound messages for a platform.
+    
+    Same leasing/ack semantics as /outbound/poll, without the polling.
+    """
+    return StreamingResponse(
+        stream_outbound_events(origin, limit, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/outbound/confirm")
 def confirm_delivery(
     origin: ConversationOrigin,
@@ -469,33 +468,75 @@ def confirm_delivery(
     return {"confirmed": success}
 
 
+@router.get("/outbound/dead-letters")
+async def outbound_dead_letters(
+    origin: ConversationOrigin,
+    limit: int = Query(default=50, le=200),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    ☠️ Messages that were never acked after OUTBOUND_MAX_ATTEMPTS leases.
+    """
+    items = await db.run_sync(get_dead_letters, origin, limit)
+    return {
+        "messages": [
+            {
+                "external_user_id": m.external_user_id,
+                "text": m.text,
+                "conversation_id": m.conversation_id,
+                "message_id": m.message_id,
+                "attempts": m.attempts,
+                "created_at": m.created_at,
+            }
+            for m in items
+        ],
+        "count": len(items),
+    }
+
+
+# ═══════════════════════════════════════════════════════════════════
+# AGENT JOBS — Async reply tracking
+# ═══════════════════════════════════════════════════════════════════
+
+@router.get("/jobs/{tracking_id}", response_model=AgentJobStatus)
+def get_agent_job(tracking_id: int):
+    """
+    🔎 Status of an async agent reply (queued / running / done / failed).
+    """
+    status = agent_pool.status(tracking_id)
+    if not status:
+        raise HTTPException(status_code=404, detail="Unknown tracking_id")
+    return status
+
+
 # ═══════════════════════════════════════════════════════════════════
 # PERFORMER SLOTS — CRUD
 # ═══════════════════════════════════════════════════════════════════
 
 @router.post("/performer-slots", response_model=PerformerSlotOut)
-def create_performer_slot(
+async def create_performer_slot(
     payload: PerformerSlotCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Create a new performer slot."""
     slot = PerformerSlot(**payload.model_dump())
     db.add(slot)
-    db.commit()
-    db.refresh(slot)
+    await db.commit()
+    slot_cache.invalidate(slot.agent_id)
+    await db.refresh(slot)
     return slot
 
 
 @router.get("/performer-slots", response_model=List[PerformerSlotOut])
-def list_performer_slots(
+async def list_performer_slots(
     active_only: bool = True,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """List all performer slots."""
     stmt = select(PerformerSlot)
     if active_only:
         stmt = stmt.where(PerformerSlot.is_active == True)
-    return db.exec(stmt).all()
+    return (await db.exec(stmt)).all()
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -503,15 +544,16 @@ def list_performer_slots(
 # ═══════════════════════════════════════════════════════════════════
 
 @router.post("/operators", response_model=OperatorOut)
-def create_operator(
+async def create_operator(
     payload: OperatorCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Create a new operator."""
     op = Operator(**payload.model_dump())
     db.add(op)
-    db.commit()
-    db.refresh(op)
+    await db.commit()
+    await db.refresh(op)
+    operator_index.upsert_operator(op)
     return OperatorOut(
         id=op.id,
         name=op.name,
@@ -523,45 +565,41 @@ def create_operator(
 
 
 @router.get("/operators", response_model=List[OperatorOut])
-def list_operators(db: Session = Depends(get_db)):
-    """List all operators."""
-    ops = db.exec(select(Operator)).all()
-    
-    result = []
-    for op in ops:
-        # Count active conversations
-        count_stmt = select(func.count(Conversation.id)).where(
-            Conversation.operator_id == op.id,
-            Conversation.is_active == True,
-        )
-        active_count = db.exec(count_stmt).one()
-        
-        result.append(OperatorOut(
+async def list_operators(db: AsyncSession = Depends(get_async_db)):
+    """List all operators (active chat counts come from the load index)."""
+    ops = (await db.exec(select(Operator))).all()
+    await db.run_sync(operator_index.sync)
+    loads = operator_index.loads()
+    
+    return [
+        OperatorOut(
             id=op.id,
             name=op.name,
             external_id=op.external_id,
             is_online=op.is_online,
             max_concurrent_chats=op.max_concurrent_chats,
-            active_chat_count=active_count,
-        ))
-    
-    return result
+            active_chat_count=loads.get(op.id, 0),
+        )
+        for op in ops
+    ]
 
 
 @router.patch("/operators/{operator_id}/status")
-def update_operator_status(
+async def update_operator_status(
     operator_id: int,
     payload: OperatorStatusUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Update operator online status."""
-    op = db.get(Operator, operator_id)
+    op = await db.get(Operator, operator_id)
     if not op:
         raise HTTPException(status_code=404, detail="Operator not found")
     
     op.is_online = payload.is_online
+    op.updated_at = datetime.utcnow()
     db.add(op)
-    db.commit()
+    await db.commit()
+    operator_index.upsert_operator(op)
     
     return {"id": operator_id, "is_online": op.is_online}
 
@@ -578,15 +616,15 @@ class ConversationModeUpdate(PydanticBaseModel):
 
 
 @router.patch("/conversations/{conversation_id}/mode")
-def update_conversation_mode(
+async def update_conversation_mode(
     conversation_id: int,
     payload: ConversationModeUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     🔄 Change conversation mode (AI_ONLY / HYBRID_GHOST / HUMAN_ONLY).
     """
-    convo = db.get(Conversation, conversation_id)
+    convo = await db.get(Conversation, conversation_id)
     if not convo:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
@@ -594,14 +632,33 @@ def update_conversation_mode(
     convo.mode = payload.mode
     convo.updated_at = datetime.utcnow()
     
+    # AI_ONLY frees the operator; human modes need one
+    await db.run_sync(operator_index.sync)
+    previous_operator_id = convo.operator_id
+    operator_id = previous_operator_id
+    if payload.mode == ConversationMode.AI_ONLY:
+        operator_id = None
+    elif operator_id is None:
+        operator_id = operator_index.acquire()
+    convo.operator_id = operator_id
+    
     db.add(convo)
-    db.commit()
+    try:
+        await db.commit()
+    except Exception:
+        if operator_id != previous_operator_id:
+            operator_index.cancel(operator_id)
+        raise
+    if operator_id != previous_operator_id:
+        operator_index.confirm(operator_id)
+        operator_index.release(previous_operator_id)
     
     return {
         "success": True,
         "conversation_id": conversation_id,
         "old_mode": old_mode.value,
         "new_mode": payload.mode.value,
+        "operator_id": operator_id,
     }
 
 
@@ -609,7 +666,17 @@ def update_conversation_mode(
 # FLIRTMARKET INTEGRATION — Routing Decision
 # ═══════════════════════════════════════════════════════════════════
 
-from .schemas import RouteRequest, RouteDecision, TelegramInboundMessage, TelegramInboundResponse
+from .schemas import (
+    RouteRequest,
+    RouteDecision,
+    TelegramInboundMessage,
+    TelegramInboundResponse,
+    TelegramInboundBatch,
+    TelegramInboundBatchItem,
+    TelegramInboundBatchResponse,
+    TelegramDeliveredBatch,
+    DeliveredBatchResponse,
+)
 from .services.routing_decision import orchestrator_decision
 from .services.telegram_bridge import telegram_bridge
 
@@ -676,24 +743,110 @@ def telegram_inbound(
     ```
     """
     response = telegram_bridge.process_inbound(db=db, message=payload)
+    if response.success:
+        inbound_messages.inc(origin=ConversationOrigin.TELEGRAM, mode=response.routing_mode)
     return response
 
 
+@router.post("/telegram/inbound:batch", response_model=TelegramInboundBatchResponse)
+def telegram_inbound_batch(
+    payload: TelegramInboundBatch,
+    db: Session = Depends(get_db),
+):
+    """
+    📦 Spooled Telegram DMs, many per request.
+    
+    The worker spools DMs locally and drains them here in batches.
+    Replies go to the agent worker pool (forced async), so the request
+    returns once the messages are stored, not after an LLM turn.
+    Each result carries a `tracking_id`; replies arrive via outbound.
+    A message the pool has no room for (stopped or full) is not stored:
+    it comes back `deferred` and is never answered inline.
+    
+    Results are in request order. A failing or deferred item gets
+    `success: false` and so do the user's later items in the batch (not
+    processed), so the worker's retry keeps that user's messages in order.
+    """
+    if not payload.messages:
+        raise HTTPException(status_code=400, detail="Empty batch")
+    if len(payload.messages) > settings.INBOUND_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large (max {settings.INBOUND_BATCH_MAX_SIZE})",
+        )
+    
+    results = []
+    held = set()  # Users with a failed message earlier in this batch
+    for index, message in enumerate(payload.messages):
+        if message.telegram_user_id in held:
+            results.append(TelegramInboundBatchItem(index=index, success=False, error="Held: earlier message failed"))
+            continue
+        
+        if not agent_pool.reserve():
+            held.add(message.telegram_user_id)
+            results.append(TelegramInboundBatchItem(
+                index=index, success=False, deferred=True, error="Deferred: agent pool busy",
+            ))
+            continue
+        
+        message.async_reply = True
+        try:
+            response = telegram_bridge.process_inbound(db=db, message=message, reserved=True)
+        except Exception as e:
+            print(f"[Telegram] Batch item {index} from tg_{message.telegram_user_id} failed: {e}")
+            held.add(message.telegram_user_id)
+            results.append(TelegramInboundBatchItem(index=index, success=False, error=str(e)[:200]))
+            continue
+        
+        inbound_messages.inc(origin=ConversationOrigin.TELEGRAM, mode=response.routing_mode)
+        results.append(TelegramInboundBatchItem(
+            index=index,
+            success=True,
+            conversation_id=response.conversation_id,
+            routing_mode=response.routing_mode,
+            queued_for_operator=response.queued_for_operator,
+            tracking_id=response.tracking_id,
+            reply_pending=response.reply_pending,
+        ))
+    
+    accepted = sum(1 for r in results if r.success)
+    return TelegramInboundBatchResponse(
+        accepted=accepted,
+        failed=len(results) - accepted,
+        results=results,
+    )
+
+
 @router.get("/telegram/outbound")
-def telegram_outbound(
+async def telegram_outbound(
     limit: int = Query(default=10, le=50),
+    wait: float = Query(default=0, ge=0, le=60),
 ):
     """
     📤 Poll for outbound Telegram messages.
     
     Telegram worker calls this to get AI replies to send.
+    Pass `wait` (seconds) to long-poll instead of busy polling.
     """
-    from .services.outbound import get_outbound_for_polling
-    
-    messages = get_outbound_for_polling(ConversationOrigin.TELEGRAM, limit)
+    messages = await wait_for_outbound(ConversationOrigin.TELEGRAM, limit, wait)
     return {"messages": messages, "count": len(messages)}
 
 
+@router.get("/telegram/outbound/stream")
+async def telegram_outbound_stream(
+    request: Request,
+    limit: int = Query(default=10, le=50),
+):
+    """
+    📡 Server-Sent Events stream of outbound Telegram messages.
+    """
+    return StreamingResponse(
+        stream_outbound_events(ConversationOrigin.TELEGRAM, limit, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/telegram/delivered")
 def telegram_delivered(
     external_user_id: str,
@@ -702,8 +855,6 @@ def telegram_delivered(
     """
     ✅ Confirm Telegram message was delivered.
     """
-    from .services.outbound import confirm_outbound_delivered
-    
     success = confirm_outbound_delivered(
         ConversationOrigin.TELEGRAM,
         external_user_id,
@@ -711,3 +862,28 @@ def telegram_delivered(
     )
     return {"confirmed": success}
 
+
+@router.post("/telegram/delivered:batch", response_model=DeliveredBatchResponse)
+def telegram_delivered_batch(
+    payload: TelegramDeliveredBatch,
+):
+    """
+    ✅ Confirm a whole batch of delivered Telegram messages at once.
+    
+    The worker acks everything it sent from one poll in a single
+    request (one UPDATE, one commit) instead of one call per message.
+    """
+    if len(payload.acks) > settings.OUTBOUND_ACK_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large (max {settings.OUTBOUND_ACK_BATCH_MAX_SIZE})",
+        )
+    
+    confirmed = confirm_outbound_delivered_batch(
+        ConversationOrigin.TELEGRAM,
+        [(ack.external_user_id, ack.message_id) for ack in payload.acks],
+    )
+    return DeliveredBatchResponse(
+        confirmed=len(confirmed),
+        unknown=sorted({ack.message_id for ack in payload.acks} - confirmed),
+    )
@@ -33,6 +33,7 @@ class IncomingMessageDTO(BaseModel):
     performer_slot_id: int
     text: str
     meta: Optional[IncomingMeta] = None
+    async_reply: Optional[bool] = None  # None → AGENT_ASYNC_REPLIES
     
     class Config:
         json_schema_extra = {
@@ -56,6 +57,36 @@ class IncomingMessageResponse(BaseModel):
     reply: Optional[str] = None  # If AI_ONLY, contains the reply
     queued_for_operator: bool = False
     priority: ConversationPriority
+    tracking_id: Optional[int] = None  # Inbound message ID when the reply is generated async
+    reply_pending: bool = False
+    coalesced: bool = False  # Answered by the turn for a newer message in the same burst
+
+
+class IncomingMessageBatch(BaseModel):
+    """Many incoming messages in one request (platform-side batching)."""
+    messages: List[IncomingMessageDTO]
+
+
+class IncomingMessageBatchItem(BaseModel):
+    """Result for one message of a batch, in request order."""
+    index: int
+    success: bool
+    conversation_id: Optional[int] = None
+    message_id: Optional[int] = None
+    mode: Optional[ConversationMode] = None
+    priority: Optional[ConversationPriority] = None
+    queued_for_operator: bool = False
+    tracking_id: Optional[int] = None  # Look up via GET /jobs/{tracking_id}
+    reply_pending: bool = False
+    deferred: bool = False  # Not stored (agent pool busy): send it again later
+    error: Optional[str] = None
+
+
+class IncomingMessageBatchResponse(BaseModel):
+    """Response after ingesting a batch."""
+    accepted: int
+    failed: int
+    results: List[IncomingMessageBatchItem]
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -150,6 +181,7 @@ class PerformerSlotCreate(BaseModel):
     system_prompt: Optional[str] = None
     temperature: float = 0.8
     max_tokens: int = 200
+    context_token_budget: Optional[int] = None  # None → AGENT_CONTEXT_TOKEN_BUDGET
 
 
 class PerformerSlotOut(BaseModel):
@@ -270,6 +302,7 @@ class TelegramInboundMessage(BaseModel):
     chat_id: Optional[int] = None
     is_reply: bool = False
     reply_to_message_id: Optional[int] = None
+    async_reply: Optional[bool] = None  # None → AGENT_ASYNC_REPLIES
     
     class Config:
         json_schema_extra = {
@@ -291,4 +324,63 @@ class TelegramInboundResponse(BaseModel):
     ai_reply: Optional[str] = None
     queued_for_operator: bool = False
     matched_flirtmarket_conversation: Optional[str] = None
+    tracking_id: Optional[int] = None
+    reply_pending: bool = False
+    coalesced: bool = False  # A newer DM's reply answers this one too
+
+
+class TelegramInboundBatch(BaseModel):
+    """Spooled DMs forwarded by the Telegram worker in one request."""
+    messages: List[TelegramInboundMessage]
+
+
+class TelegramInboundBatchItem(BaseModel):
+    """Result for one message of a batch, in request order."""
+    index: int
+    success: bool
+    conversation_id: Optional[int] = None
+    routing_mode: Optional[RoutingMode] = None
+    queued_for_operator: bool = False
+    tracking_id: Optional[int] = None
+    reply_pending: bool = False
+    deferred: bool = False  # Not stored (agent pool busy): the worker retries it
+    error: Optional[str] = None
 
+
+class TelegramInboundBatchResponse(BaseModel):
+    """Response after ingesting a Telegram batch."""
+    accepted: int
+    failed: int
+    results: List[TelegramInboundBatchItem]
+
+
+class DeliveredAck(BaseModel):
+    """One delivered outbound message (acked by message_id)."""
+    external_user_id: str
+    message_id: int
+
+
+class TelegramDeliveredBatch(BaseModel):
+    """Acks for a whole poll batch in one request."""
+    acks: List[DeliveredAck]
+
+
+class DeliveredBatchResponse(BaseModel):
+    """Result of a batched ack."""
+    confirmed: int
+    unknown: List[int] = []  # message_ids not pending (already acked, dead, or never queued)
+
+
+
+# ═══════════════════════════════════════════════════════════════════
+# AGENT JOBS — Async reply tracking
+# ═══════════════════════════════════════════════════════════════════
+
+class AgentJobStatus(BaseModel):
+    """Status of an async agent reply."""
+    tracking_id: int
+    status: str  # queued | running | done | failed
+    conversation_id: Optional[int] = None
+    reply_message_id: Optional[int] = None
+    error: Optional[str] = None
+    updated_at: datetime
@@ -8,13 +8,28 @@
 """
 
 import json
+import time
 from dataclasses import dataclass
-from typing import Optional, List
+from functools import partial
+from typing import AsyncIterator, Optional, List
 
 from sqlmodel import Session, select
 
-from ..models import ConversationMessage, PerformerSlot
+from ..models import ConversationMessage, ConversationPriority, PerformerSlot
+from .agent_cache import HistoryEntry, SlotConfig, history_cache, slot_cache
 from ...config import settings
+from ...db import after_commit
+from ...llm.context import (
+    FoldedTurn,
+    SUMMARY_FOLD_BATCH,
+    SUMMARY_HEADER,
+    conversation_summaries,
+    fit_newest,
+)
+from ...llm.failover import chat_with_failover, configured_targets, route
+from ...llm.gateway import llm_gateway
+from ...llm.tokens import estimate_message_tokens
+from ...metrics import LLM_LATENCY_BUCKETS, metrics
 
 
 @dataclass
@@ -26,6 +41,24 @@ class AgentReply:
     raw_response: Optional[dict] = None
 
 
+agent_replies = metrics.counter(
+    "aurora_agent_replies_total",
+    "Agent replies by performer slot, answering model and outcome (ok / mock / error_fallback)",
+    ["slot", "provider", "model", "outcome"],
+)
+agent_reply_seconds = metrics.histogram(
+    "aurora_agent_reply_duration_seconds",
+    "LLM time per agent reply, failover and hedging included",
+    ["slot", "provider", "model"],
+    buckets=LLM_LATENCY_BUCKETS,
+)
+agent_tokens = metrics.counter(
+    "aurora_agent_tokens_total",
+    "Tokens used by agent replies",
+    ["slot", "provider", "model"],
+)
+
+
 # ═══════════════════════════════════════════════════════════════════
 # DEFAULT PROMPTS
 # ═══════════════════════════════════════════════════════════════════
@@ -54,59 +87,44 @@ Yasak:
 
 
 # ═══════════════════════════════════════════════════════════════════
-# LLM CLIENTS
+# AGENT CALL
 # ═══════════════════════════════════════════════════════════════════
 
-def get_grok_client():
-    """Get Grok (xAI) client."""
-    if not settings.XAI_API_KEY:
-        return None
-    from openai import OpenAI
-    return OpenAI(api_key=settings.XAI_API_KEY, base_url="https://api.x.ai/v1")
-
-
-def get_openai_client():
-    """Get OpenAI client."""
-    if not settings.OPENAI_API_KEY:
-        return None
-    from openai import OpenAI
-    return OpenAI(api_key=settings.OPENAI_API_KEY)
-
+@dataclass
+class AgentCall:
+    """A prepared LLM request for one agent turn."""
+    provider: str
+    model: str
+    messages: List[dict]
+    temperature: float
+    max_tokens: int
+    slot: str = "default"  # agent_id of the performer slot (metrics label)
+    conversation_id: Optional[int] = None  # Usage ledger attribution
+    priority: Optional[str] = None  # ConversationPriority for the admission scheduler
+    mock_reply: Optional[AgentReply] = None  # No provider configured → answer without the LLM
 
-def get_llm_client(provider: str):
-    """Get LLM client by provider name."""
-    if provider == "grok":
-        return get_grok_client()
-    elif provider == "openai":
-        return get_openai_client()
-    return None
 
+ERROR_FALLBACK_REPLY = "Bir saniye, hemen döneceğim... 💫"
 
-# ═══════════════════════════════════════════════════════════════════
-# AGENT CALL
-# ═══════════════════════════════════════════════════════════════════
 
-def call_aurora_agent(
+def prepare_agent_call(
     session: Session,
     agent_id: str,
     conversation_id: int,
     message: str,
     performer_slot: Optional[PerformerSlot] = None,
-) -> AgentReply:
+    priority: Optional[ConversationPriority] = None,
+) -> AgentCall:
     """
-    Call Aurora Agent (Grok/OpenAI) for a conversation reply.
+    Everything before the LLM round-trip (sync, needs a session).
     
     1. Get performer slot config (or use defaults)
-    2. Fetch conversation history
-    3. Build prompt
-    4. Call LLM
-    5. Return reply
+    2. Fetch conversation history (in-process cache, DB on a miss)
+    3. Build prompt within the slot's token budget
     """
     
-    # Get performer slot config
-    if performer_slot is None:
-        stmt = select(PerformerSlot).where(PerformerSlot.agent_id == agent_id)
-        performer_slot = session.exec(stmt).first()
+    # Get performer slot config (cached by agent_id)
+    slot_config = SlotConfig.from_slot(performer_slot) if performer_slot else slot_cache.get(session, agent_id)
     
     # Defaults if no slot found
     provider = "grok"
@@ -115,75 +133,207 @@ def call_aurora_agent(
     temperature = 0.8
     max_tokens = 200
     label = "Performer"
+    budget = settings.AGENT_CONTEXT_TOKEN_BUDGET
     
-    if performer_slot:
-        provider = performer_slot.provider
-        model = performer_slot.model
-        system_prompt = performer_slot.system_prompt or DEFAULT_PERFORMER_PROMPT.format(label=performer_slot.label)
-        temperature = performer_slot.temperature
-        max_tokens = performer_slot.max_tokens
-        label = performer_slot.label
+    if slot_config:
+        provider = slot_config.provider
+        model = slot_config.model
+        system_prompt = slot_config.system_prompt or DEFAULT_PERFORMER_PROMPT.format(label=slot_config.label)
+        temperature = slot_config.temperature
+        max_tokens = slot_config.max_tokens
+        label = slot_config.label
+        budget = slot_config.context_token_budget or budget
     
-    # Get LLM client
-    client = get_llm_client(provider)
+    call = AgentCall(
+        provider, model, [], temperature, max_tokens,
+        slot=agent_id if slot_config else "default",
+        conversation_id=conversation_id,
+        priority=priority,
+    )
     
-    if not client:
+    if not configured_targets(provider, model):
         # Fallback mock response
-        return AgentReply(
+        call.mock_reply = AgentReply(
             reply=f"Merhaba! Ben {label}. Şu an meşgulüm ama birazdan döneceğim 💋",
             tokens_used=0,
             model_used="mock",
         )
+        return call
     
-    # Fetch conversation history (last 10 messages)
-    stmt = (
-        select(ConversationMessage)
-        .where(ConversationMessage.conversation_id == conversation_id)
-        .order_by(ConversationMessage.created_at.desc())
-        .limit(10)
-    )
-    history_messages = list(reversed(session.exec(stmt).all()))
+    # Conversation history (last AGENT_HISTORY_LENGTH messages, cached)
+    history = history_cache.get(session, conversation_id)
     
     # Build messages for LLM
-    messages = [
-        {"role": "system", "content": system_prompt}
-    ]
-    
-    for msg in history_messages:
-        role = "user" if msg.sender == "user" else "assistant"
-        messages.append({"role": role, "content": msg.text})
+    call.messages = build_agent_messages(session, conversation_id, system_prompt, history, message, budget)
+    return call
+
+
+def call_aurora_agent(
+    session: Session,
+    agent_id: str,
+    conversation_id: int,
+    message: str,
+    performer_slot: Optional[PerformerSlot] = None,
+    priority: Optional[ConversationPriority] = None,
+) -> AgentReply:
+    """
+    Call Aurora Agent (Grok/OpenAI) for a conversation reply.
     
-    # Add current message
-    messages.append({"role": "user", "content": message})
+    Prepares the prompt (see prepare_agent_call), calls the LLM and
+    returns the full reply. `priority` orders the call in the LLM
+    admission scheduler when providers are rate limited.
+    """
+    call = prepare_agent_call(session, agent_id, conversation_id, message, performer_slot, priority)
+    if call.mock_reply:
+        agent_replies.inc(slot=call.slot, provider="mock", model="mock", outcome="mock")
+        return call.mock_reply
     
     # Call LLM
+    start = time.perf_counter()
     try:
-        completion = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
+        completion, provider_used, model_used = chat_with_failover(
+            call.provider,
+            call.model,
+            caller="orchestrator_agent",
+            priority=call.priority,
+            conversation_id=call.conversation_id,
+            hedge=settings.AGENT_HEDGE_REQUESTS,
+            timeout=settings.AGENT_LLM_TIMEOUT_SECONDS,
+            messages=call.messages,
+            temperature=call.temperature,
+            max_tokens=call.max_tokens,
         )
         
         reply = completion.choices[0].message.content or ""
         tokens_used = completion.usage.total_tokens if completion.usage else 0
         
+        labels = dict(slot=call.slot, provider=provider_used, model=model_used)
+        agent_reply_seconds.observe(time.perf_counter() - start, **labels)
+        agent_tokens.inc(tokens_used, **labels)
+        agent_replies.inc(outcome="ok", **labels)
+        
         return AgentReply(
             reply=reply.strip(),
             tokens_used=tokens_used,
-            model_used=model,
+            model_used=model_used,
             raw_response=completion.model_dump() if hasattr(completion, 'model_dump') else None,
         )
         
     except Exception as e:
         print(f"[Agent] LLM error: {e}")
+        agent_replies.inc(slot=call.slot, provider=call.provider, model=call.model, outcome="error_fallback")
         return AgentReply(
-            reply=f"Bir saniye, hemen döneceğim... 💫",
+            reply=ERROR_FALLBACK_REPLY,
             tokens_used=0,
             model_used="error_fallback",
         )
 
 
+async def stream_aurora_agent(call: AgentCall) -> AsyncIterator[str]:
+    """
+    Streaming variant of the LLM step: yields reply text as it arrives.
+    
+    Raises on LLM errors (the caller decides what the operator sees).
+    """
+    if call.mock_reply:
+        yield call.mock_reply.reply
+        return
+    
+    provider, model = route(call.provider, call.model)[0]
+    async for delta in llm_gateway.astream(
+        provider,
+        caller="orchestrator_agent_stream",
+        priority=call.priority,
+        conversation_id=call.conversation_id,
+        model=model,
+        messages=call.messages,
+        temperature=call.temperature,
+        max_tokens=call.max_tokens,
+    ):
+        yield delta
+
+
+# ═══════════════════════════════════════════════════════════════════
+# PROMPT CONTEXT — token budget + rolling summary
+# ═══════════════════════════════════════════════════════════════════
+
+def summary_key(conversation_id: int) -> str:
+    return f"conversation:{conversation_id}"
+
+
+def build_agent_messages(
+    session: Session,
+    conversation_id: int,
+    system_prompt: str,
+    history: List[HistoryEntry],
+    message: str,
+    budget: int,
+) -> List[dict]:
+    """
+    System prompt + rolling summary + recent turns + current message.
+    
+    The system prompt, summary and current message always go in; the
+    history fills what is left of `budget`, newest first. When turns
+    fall out (over budget, or older than the history window) a summary
+    refresh is queued once this transaction commits.
+    """
+    key = summary_key(conversation_id)
+    summary = conversation_summaries.get(session, key)
+    window_full = len(history) >= settings.AGENT_HISTORY_LENGTH
+    
+    # The current message is normally already the newest history entry
+    current_saved = bool(history) and history[-1] == ("user", message)
+    if current_saved:
+        history = history[:-1]
+    
+    fixed = estimate_message_tokens(system_prompt) + estimate_message_tokens(message)
+    if summary:
+        fixed += estimate_message_tokens(f"{SUMMARY_HEADER}\n{summary}")
+    kept = fit_newest([text for _, text in history], budget - fixed)
+    
+    messages = [{"role": "system", "content": system_prompt}]
+    if summary:
+        messages.append({"role": "system", "content": f"{SUMMARY_HEADER}\n{summary}"})
+    for sender, text in history[len(history) - kept:]:
+        role = "user" if sender == "user" else "assistant"
+        messages.append({"role": role, "content": text})
+    messages.append({"role": "user", "content": message})
+    
+    if window_full or kept < len(history):
+        keep = kept + 1 if current_saved else kept
+        loader = partial(_load_folded_turns, conversation_id)
+        after_commit(session, lambda: conversation_summaries.schedule(key, loader, keep))
+    
+    return messages
+
+
+def _load_folded_turns(conversation_id: int, session: Session, after_id: int, keep: int) -> List[FoldedTurn]:
+    """Messages after `after_id`, minus the newest `keep`, oldest first."""
+    conditions = [ConversationMessage.conversation_id == conversation_id, ConversationMessage.id > after_id]
+    if keep:
+        boundary = session.exec(
+            select(ConversationMessage.id)
+            .where(ConversationMessage.conversation_id == conversation_id)
+            .order_by(ConversationMessage.id.desc())
+            .offset(keep - 1)
+            .limit(1)
+        ).first()
+        if boundary is None:
+            return []
+        conditions.append(ConversationMessage.id < boundary)
+    
+    rows = session.exec(
+        select(ConversationMessage.id, ConversationMessage.sender, ConversationMessage.text)
+        .where(*conditions)
+        .order_by(ConversationMessage.id)
+        .limit(SUMMARY_FOLD_BATCH)
+    ).all()
+    return [
+        (message_id, "Kullanıcı" if sender == "user" else "Performer", text)
+        for message_id, sender, text in rows
+    ]
+
+
 def generate_agent_draft(
     session: Session,
     agent_id: str,
@@ -0,0 +1,252 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║   AuroraOS Orchestrator — Agent Caches                           ║
+║   Conversation history ring buffers + performer slot configs     ║
+║                                                                  ║
+║   Baron Baba © SiyahKare, 2025                                   ║
+╚══════════════════════════════════════════════════════════════════╝
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from ..models import ConversationMessage, PerformerSlot
+from ...config import settings
+from ...db import after_commit, after_rollback
+
+
+HistoryEntry = Tuple[str, str]  # (sender, text)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# HISTORY — last K messages per conversation
+# ═══════════════════════════════════════════════════════════════════
+
+@dataclass
+class _History:
+    messages: Deque[HistoryEntry]
+    loaded: bool = False
+    loader: Optional[object] = None  # Token of the reader filling this entry
+    dirty: bool = False  # A write landed while it was being filled
+    size: int = 0
+
+
+class ConversationHistoryCache:
+    """
+    Ring buffer of the last K messages per conversation.
+    
+    Misses read through to conversation_messages; saves append
+    write-through once their transaction commits (see append_message),
+    so prompt assembly for a hot conversation needs no DB reads.
+    Conversations are evicted LRU, bounded by count and by an
+    approximate byte budget.
+    
+    A write that lands while a miss is being filled marks the entry
+    dirty and the fill is discarded, so a slow reader can't cache a
+    history that is missing a committed message.
+    """
+    
+    MESSAGE_OVERHEAD = 100  # Approximate bytes per cached message besides its text
+    PENDING_KEY = "history_pending"  # session.info: {conversation_id: uncommitted messages}
+    
+    def __init__(self, length: int, max_conversations: int, max_bytes: int):
+        self.length = length
+        self.max_conversations = max_conversations
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[int, _History] = OrderedDict()
+        self._bytes = 0
+    
+    def get(self, session: Session, conversation_id: int) -> List[HistoryEntry]:
+        """Last K (sender, text) pairs, oldest first."""
+        pending = session.info.get(self.PENDING_KEY, {}).get(conversation_id) or []
+        
+        token = object()
+        with self._lock:
+            entry = self._entries.get(conversation_id)
+            if entry is not None and entry.loaded:
+                self._entries.move_to_end(conversation_id)
+                # Overlay this session's uncommitted messages
+                return (list(entry.messages) + pending)[-self.length:]
+            if entry is None:
+                entry = _History(messages=deque(maxlen=self.length))
+                self._entries[conversation_id] = entry
+            entry.loader = token
+            entry.dirty = False
+        
+        # Autoflush puts this session's uncommitted messages at the end
+        # of the read; only the committed part goes into the cache.
+        rows = self._load(session, conversation_id, self.length + len(pending))
+        committed = rows[:len(rows) - len(pending)]
+        
+        with self._lock:
+            if self._entries.get(conversation_id) is entry and entry.loader is token:
+                if entry.dirty:
+                    del self._entries[conversation_id]
+                else:
+                    entry.messages.extend(committed)
+                    entry.size = sum(self._cost(text) for _, text in entry.messages)
+                    entry.loaded = True
+                    entry.loader = None
+                    self._bytes += entry.size
+                    self._evict()
+        return rows[-self.length:]
+    
+    def record_write(self, session: Session, conversation_id: int, sender: str, text: str) -> None:
+        """
+        A message was added in this session: append it once the
+        transaction commits, and keep uncommitted rows out of the cache
+        until then.
+        """
+        pending = session.info.setdefault(self.PENDING_KEY, {})
+        pending.setdefault(conversation_id, []).append((sender, text))
+        
+        def committed():
+            pending.pop(conversation_id, None)
+            self.append(conversation_id, sender, text)
+        
+        after_commit(session, committed)
+        after_rollback(session, lambda: pending.pop(conversation_id, None))
+    
+    def append(self, conversation_id: int, sender: str, text: str) -> None:
+        """Write-through for a committed message."""
+        with self._lock:
+            entry = self._entries.get(conversation_id)
+            if entry is None:
+                return
+            if not entry.loaded:
+                entry.dirty = True
+                return
+            if len(entry.messages) == entry.messages.maxlen:
+                dropped = self._cost(entry.messages[0][1])
+                entry.size -= dropped
+                self._bytes -= dropped
+            entry.messages.append((sender, text))
+            entry.size += self._cost(text)
+            self._bytes += self._cost(text)
+            self._entries.move_to_end(conversation_id)
+            self._evict()
+    
+    def invalidate(self, conversation_id: int) -> None:
+        """Drop a conversation (e.g. a cached message was edited)."""
+        with self._lock:
+            entry = self._entries.pop(conversation_id, None)
+            if entry is not None:
+                self._bytes -= entry.size
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {"conversations": len(self._entries), "bytes": self._bytes}
+    
+    def _load(self, session: Session, conversation_id: int, limit: int) -> List[HistoryEntry]:
+        rows = session.exec(
+            select(ConversationMessage.sender, ConversationMessage.text)
+            .where(ConversationMessage.conversation_id == conversation_id)
+            .order_by(ConversationMessage.created_at.desc())
+            .limit(limit)
+        ).all()
+        return [(sender, text) for sender, text in reversed(rows)]
+    
+    def _cost(self, text: str) -> int:
+        return len(text) + self.MESSAGE_OVERHEAD
+    
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_conversations or self._bytes > self.max_bytes
+        ):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+
+
+# ═══════════════════════════════════════════════════════════════════
+# SLOT CONFIG — agent_id → performer slot settings
+# ═══════════════════════════════════════════════════════════════════
+
+@dataclass(frozen=True)
+class SlotConfig:
+    """Detached snapshot of the PerformerSlot fields the agent needs."""
+    label: str
+    provider: str
+    model: str
+    system_prompt: Optional[str]
+    temperature: float
+    max_tokens: int
+    context_token_budget: Optional[int]
+    
+    @classmethod
+    def from_slot(cls, slot: PerformerSlot) -> "SlotConfig":
+        return cls(
+            label=slot.label,
+            provider=slot.provider,
+            model=slot.model,
+            system_prompt=slot.system_prompt,
+            temperature=slot.temperature,
+            max_tokens=slot.max_tokens,
+            context_token_budget=slot.context_token_budget,
+        )
+
+
+@dataclass
+class _CachedSlot:
+    config: Optional[SlotConfig]  # None → no slot for this agent_id
+    expires_at: float = field(default=0.0)
+
+
+class SlotConfigCache:
+    """
+    Performer slot config by agent_id.
+    
+    agent_id isn't unique on performer_slots; like the query it
+    replaces, the first matching slot wins. Entries (including "no
+    slot") expire after a TTL so edits made by other processes show up,
+    and are invalidated write-through when a slot is saved here.
+    """
+    
+    def __init__(self, ttl: float, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, _CachedSlot] = OrderedDict()
+    
+    def get(self, session: Session, agent_id: str) -> Optional[SlotConfig]:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(agent_id)
+            if cached is not None and cached.expires_at > now:
+                self._entries.move_to_end(agent_id)
+                return cached.config
+        
+        slot = session.exec(
+            select(PerformerSlot).where(PerformerSlot.agent_id == agent_id)
+        ).first()
+        config = SlotConfig.from_slot(slot) if slot else None
+        
+        with self._lock:
+            self._entries[agent_id] = _CachedSlot(config, expires_at=now + self.ttl)
+            self._entries.move_to_end(agent_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return config
+    
+    def invalidate(self, agent_id: str) -> None:
+        with self._lock:
+            self._entries.pop(agent_id, None)
+
+
+# Singleton instances
+history_cache = ConversationHistoryCache(
+    length=settings.AGENT_HISTORY_LENGTH,
+    max_conversations=settings.AGENT_HISTORY_CACHE_CONVERSATIONS,
+    max_bytes=settings.AGENT_HISTORY_CACHE_MAX_BYTES,
+)
+slot_cache = SlotConfigCache(ttl=settings.AGENT_SLOT_CACHE_TTL_SECONDS)
@@ -0,0 +1,393 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║   AuroraOS Orchestrator — Agent Worker Pool                      ║
+║   Generates replies off the request path                         ║
+║                                                                  ║
+║   Baron Baba © SiyahKare, 2025                                   ║
+╚══════════════════════════════════════════════════════════════════╝
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from sqlmodel import Session
+
+from ..models import Conversation, ConversationMessage, ConversationOrigin
+from .agent import call_aurora_agent
+from .outbound import enqueue_outbound_message
+from .conversations import append_message
+from ...config import settings
+from ...db import engine, unit_of_work
+
+
+# ═══════════════════════════════════════════════════════════════════
+# AGENT TURN — Shared by the sync path and the workers
+# ═══════════════════════════════════════════════════════════════════
+
+def respond_to_message(
+    session: Session,
+    convo: Conversation,
+    text: str,
+    *,
+    draft: bool = False,
+    source: Optional[str] = None,
+    count_reply: bool = True,
+) -> ConversationMessage:
+    """
+    Run one agent turn for a conversation.
+    
+    - draft=False (AI_ONLY): save the reply and queue it for outbound
+    - draft=True (HYBRID_GHOST): save it as a draft for the operator
+    
+    Joins the caller's transaction; the caller commits.
+    """
+    result = call_aurora_agent(
+        session=session,
+        agent_id=convo.agent_id,
+        conversation_id=convo.id,
+        message=text,
+        priority=convo.priority,
+    )
+    
+    reply_msg = append_message(
+        session, convo,
+        sender="agent",
+        text=result.reply,
+        source=source or convo.origin.value.lower(),
+        is_draft=draft,
+        tokens_used=result.tokens_used,
+        model_used=result.model_used,
+        count=not draft and count_reply,
+    )
+    session.flush()  # reply_msg.id for the outbound ack
+    
+    if not draft:
+        enqueue_outbound_message(
+            session,
+            origin=convo.origin,
+            external_user_id=convo.external_user_id,
+            text=reply_msg.text,
+            conversation_id=convo.id,
+            message_id=reply_msg.id,
+        )
+    
+    return reply_msg
+
+
+class ConversationLocks:
+    """
+    One agent turn per conversation at a time, across the sync path and
+    the worker pool. Hold it around the turn *and* its commit, so the
+    next turn's history already has this reply in it.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._locks: Dict[int, list] = {}  # conversation_id → [lock, holders + waiters]
+    
+    @contextmanager
+    def hold(self, conversation_id: int) -> Iterator[None]:
+        with self._lock:
+            entry = self._locks.setdefault(conversation_id, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[conversation_id]
+
+
+def coalesce_window(origin: Optional[ConversationOrigin]) -> float:
+    """Seconds to wait for more messages before replying (per origin)."""
+    if origin is not None and origin.value in settings.AGENT_COALESCE_WINDOWS:
+        return settings.AGENT_COALESCE_WINDOWS[origin.value]
+    return settings.AGENT_COALESCE_WINDOW_SECONDS
+
+
+class BurstGate:
+    """
+    Coalescing for the synchronous reply path (the pool does its own).
+    
+    A request thread that is about to run an agent turn waits out the
+    origin's window first. If another message for the same conversation
+    arrives meanwhile, the waiting request returns at once without a
+    turn and the newest one waits on; when the window (debounced, capped
+    at AGENT_COALESCE_MAX_WAIT_SECONDS from the first message) closes,
+    the newest runs one turn for the whole burst. The earlier messages
+    are committed by then, so they reach the model as history. Bursts
+    are tracked per process.
+    """
+    
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._bursts: Dict[int, list] = {}  # conversation_id → [first_at, last_at, newest seq]
+        self._seq = 0
+    
+    def wait(self, conversation_id: int, origin: Optional[ConversationOrigin]) -> bool:
+        """Block until the burst settles; True if this caller runs the turn."""
+        window = coalesce_window(origin)
+        if window <= 0:
+            return True
+        
+        with self._cond:
+            now = time.monotonic()
+            self._seq += 1
+            seq = self._seq
+            burst = self._bursts.get(conversation_id)
+            if burst is None:
+                burst = self._bursts[conversation_id] = [now, now, seq]
+            else:
+                burst[1:] = [now, seq]
+                self._cond.notify_all()  # Release the request this one supersedes
+            
+            while True:
+                if burst[2] != seq:
+                    return False  # A newer message answers for this one
+                first_at, last_at, _ = burst
+                deadline = min(
+                    last_at + window,
+                    first_at + max(window, settings.AGENT_COALESCE_MAX_WAIT_SECONDS),
+                )
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    del self._bursts[conversation_id]
+                    return True
+                self._cond.wait(remaining)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# WORKER POOL
+# ═══════════════════════════════════════════════════════════════════
+
+@dataclass
+class AgentJob:
+    """One inbound message waiting for an agent reply."""
+    tracking_id: int  # Inbound ConversationMessage.id
+    conversation_id: int
+    text: str
+    draft: bool = False
+    source: Optional[str] = None
+    count_reply: bool = True
+    origin: Optional[ConversationOrigin] = None  # Picks the coalescing window
+
+
+@dataclass
+class _Burst:
+    """Jobs for one conversation waiting out the coalescing window."""
+    jobs: List[AgentJob] = field(default_factory=list)
+    first_at: float = 0.0
+    last_at: float = 0.0
+    timer: Optional[asyncio.TimerHandle] = None
+    running: bool = False  # A turn for this conversation is in flight
+
+
+class AgentWorkerPool:
+    """
+    Bounded pool of asyncio workers that run agent turns.
+    
+    Inbound endpoints persist the user message, submit() a job and
+    return immediately with the tracking ID. Each worker runs the
+    (blocking) LLM round-trip in a thread, saves the reply and pushes
+    it into the outbound queue, so request throughput is bounded by the
+    DB rather than by LLM latency.
+    
+    Jobs are coalesced per conversation: a burst of messages arriving
+    within the origin's window (debounced, capped at
+    AGENT_COALESCE_MAX_WAIT_SECONDS from the first) becomes one agent
+    turn. The earlier messages are already saved, so they reach the
+    model as history and the turn answers the newest one. Only one turn
+    per conversation runs at a time; messages that arrive meanwhile
+    form the next burst.
+    """
+    
+    STATUS_HISTORY = 10_000  # Tracking IDs remembered for /jobs lookups
+    
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._status: OrderedDict[int, dict] = OrderedDict()
+        self._bursts: Dict[int, _Burst] = {}  # Only touched on the loop thread
+    
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+    
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._bursts = {}
+        self._tasks = [
+            asyncio.create_task(self._worker(n), name=f"agent-worker-{n}")
+            for n in range(self.workers)
+        ]
+        print(f"[AgentPool] Started {self.workers} worker(s)")
+    
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for burst in self._bursts.values():
+            if burst.timer:
+                burst.timer.cancel()
+        self._bursts = {}
+    
+    def submit(self, job: AgentJob, reserved: bool = False) -> bool:
+        """
+        Queue a job from any thread.
+        
+        Returns False when the pool is not running or is full, so the
+        caller can fall back to a synchronous reply (backpressure).
+        `reserved` uses a slot taken earlier with reserve().
+        """
+        if not self.running:
+            if reserved:
+                self.release()
+            return False
+        if not reserved and not self.reserve():
+            return False
+        self._set_status(job.tracking_id, "queued", conversation_id=job.conversation_id)
+        self._loop.call_soon_threadsafe(self._accept, job)
+        return True
+    
+    def reserve(self, count: int = 1) -> bool:
+        """
+        Take queue slots now for jobs submitted later, so batch ingest
+        can defer a message before storing it instead of answering it
+        inline. False when the pool is not running or is full.
+        """
+        if not self.running:
+            return False
+        with self._lock:
+            if self._pending + count > self.max_queue:
+                return False
+            self._pending += count
+        return True
+    
+    def release(self, count: int = 1) -> None:
+        """Give back reserved slots that won't be submitted."""
+        with self._lock:
+            self._pending -= count
+    
+    def status(self, tracking_id: int) -> Optional[dict]:
+        with self._lock:
+            entry = self._status.get(tracking_id)
+            return dict(entry) if entry else None
+    
+    def _set_status(self, tracking_id: int, status: str, **extra) -> None:
+        with self._lock:
+            entry = self._status.pop(tracking_id, {"tracking_id": tracking_id})
+            entry.update(status=status, updated_at=datetime.utcnow(), **extra)
+            self._status[tracking_id] = entry
+            while len(self._status) > self.STATUS_HISTORY:
+                self._status.popitem(last=False)
+    
+    # ─── Coalescing (loop thread) ────────────────────────────────────
+    
+    def _accept(self, job: AgentJob) -> None:
+        now = self._loop.time()
+        burst = self._bursts.get(job.conversation_id)
+        if burst is None:
+            burst = self._bursts[job.conversation_id] = _Burst()
+        if not burst.jobs:
+            burst.first_at = now
+        burst.jobs.append(job)
+        burst.last_at = now
+        if not burst.running:
+            self._arm(job.conversation_id, burst)
+    
+    def _arm(self, conversation_id: int, burst: _Burst) -> None:
+        """(Re)start the debounce timer for a waiting burst."""
+        if burst.timer:
+            burst.timer.cancel()
+        window = coalesce_window(burst.jobs[-1].origin)
+        deadline = min(
+            burst.last_at + window,
+            burst.first_at + max(window, settings.AGENT_COALESCE_MAX_WAIT_SECONDS),
+        )
+        burst.timer = self._loop.call_at(deadline, self._dispatch, conversation_id)
+    
+    def _dispatch(self, conversation_id: int) -> None:
+        burst = self._bursts[conversation_id]
+        burst.timer = None
+        burst.running = True
+        jobs, burst.jobs = burst.jobs, []
+        self._queue.put_nowait(jobs)
+    
+    def _finish(self, conversation_id: int) -> None:
+        burst = self._bursts[conversation_id]
+        burst.running = False
+        if burst.jobs:
+            self._arm(conversation_id, burst)
+        else:
+            del self._bursts[conversation_id]
+    
+    # ─── Workers ─────────────────────────────────────────────────────
+    
+    async def _worker(self, n: int) -> None:
+        while True:
+            jobs = await self._queue.get()
+            job = jobs[-1]  # The turn answers the newest message
+            with self._lock:
+                self._pending -= len(jobs)
+            for j in jobs:
+                self._set_status(j.tracking_id, "running")
+            try:
+                reply_id = await asyncio.to_thread(self._run_job, job)
+                for j in jobs:
+                    self._set_status(j.tracking_id, "done", reply_message_id=reply_id)
+                if len(jobs) > 1:
+                    print(f"[AgentPool] Coalesced {len(jobs)} messages in conversation {job.conversation_id}")
+            except Exception as e:
+                print(f"[AgentPool] Job {job.tracking_id} failed: {e}")
+                for j in jobs:
+                    self._set_status(j.tracking_id, "failed", error=str(e))
+            finally:
+                self._finish(job.conversation_id)
+                self._queue.task_done()
+    
+    def _run_job(self, job: AgentJob) -> Optional[int]:
+        with Session(engine) as session:
+            convo = session.get(Conversation, job.conversation_id)
+            if not convo:
+                return None
+            with conversation_locks.hold(convo.id), unit_of_work(session):
+                reply_msg = respond_to_message(
+                    session,
+                    convo,
+                    job.text,
+                    draft=job.draft,
+                    source=job.source,
+                    count_reply=job.count_reply,
+                )
+            return reply_msg.id
+
+
+# Singleton instances
+conversation_locks = ConversationLocks()
+burst_gate = BurstGate()
+agent_pool = AgentWorkerPool(
+    workers=settings.AGENT_WORKERS,
+    max_queue=settings.AGENT_QUEUE_SIZE,
+)
+
+
+def use_async_replies(requested: Optional[bool]) -> bool:
+    """Per-request override, else the AGENT_ASYNC_REPLIES default."""
+    return settings.AGENT_ASYNC_REPLIES if requested is None else requested
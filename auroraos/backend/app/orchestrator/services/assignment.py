@@ -0,0 +1,206 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║   AuroraOS Orchestrator — Operator Assignment                    ║
+║   Live operator load index, least-loaded selection               ║
+║                                                                  ║
+║   Baron Baba © SiyahKare, 2025                                   ║
+╚══════════════════════════════════════════════════════════════════╝
+"""
+
+import heapq
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sqlmodel import Session, select, func
+
+from ..models import Conversation, Operator
+from ...config import settings
+
+
+@dataclass
+class OperatorLoad:
+    """In-memory view of one operator."""
+    operator_id: int
+    max_chats: int
+    is_online: bool
+    load: int = 0  # Active conversations assigned, reservations included
+    pending: List[float] = field(default_factory=list)  # acquire() times of slots not yet committed / rolled back
+    version: int = 0  # Bumped on every change; stale heap entries are skipped
+    
+    @property
+    def has_capacity(self) -> bool:
+        return self.is_online and self.load < self.max_chats
+    
+    @property
+    def ratio(self) -> float:
+        return self.load / self.max_chats if self.max_chats > 0 else 1.0
+
+
+class OperatorLoadIndex:
+    """
+    Online operators keyed by load, for O(log n) assignment.
+    
+    A min-heap ordered by (load / max_concurrent_chats, load, id) holds
+    one live entry per operator with free capacity. Updates push a new
+    entry and bump the operator's version; outdated entries are dropped
+    lazily when they reach the top.
+    
+    The index is built from the DB with a single GROUP BY and kept in
+    step by write-through calls (acquire / release / upsert) next to
+    the DB writes that change assignment. It is rebuilt every
+    OPERATOR_INDEX_RESYNC_SECONDS so that writes from other processes
+    are picked up.
+    
+    A slot taken by acquire() stays pending until the transaction that
+    stores it settles: confirm() on commit, cancel() on rollback.
+    Pending slots are not in the DB yet, so a rebuild carries them over
+    (unless older than the resync interval: their session never
+    settled), and cancel() only gives back a slot that is still pending.
+    """
+    
+    def __init__(self, resync_seconds: float):
+        self.resync_seconds = resync_seconds
+        self._lock = threading.Lock()
+        self._ops: Dict[int, OperatorLoad] = {}
+        self._heap: List[Tuple[float, int, int, int]] = []
+        self._loaded_at: Optional[float] = None
+    
+    # ─── DB sync ──────────────────────────────────────────────────────
+    
+    def sync(self, session: Session, force: bool = False) -> None:
+        """Rebuild from the DB if never loaded or older than the resync interval."""
+        if not force and self._loaded_at is not None:
+            if time.monotonic() - self._loaded_at < self.resync_seconds:
+                return
+        
+        operators = session.exec(select(Operator)).all()
+        counts = dict(session.exec(
+            select(Conversation.operator_id, func.count(Conversation.id))
+            .where(
+                Conversation.operator_id.is_not(None),
+                Conversation.is_active == True,
+            )
+            .group_by(Conversation.operator_id)
+        ).all())
+        
+        with self._lock:
+            cutoff = time.monotonic() - self.resync_seconds
+            pending = {
+                op_id: [at for at in state.pending if at > cutoff]
+                for op_id, state in self._ops.items()
+            }
+            self._ops = {
+                op.id: OperatorLoad(
+                    operator_id=op.id,
+                    max_chats=op.max_concurrent_chats,
+                    is_online=op.is_online,
+                    load=counts.get(op.id, 0) + len(pending.get(op.id, [])),
+                    pending=pending.get(op.id, []),
+                )
+                for op in operators
+            }
+            self._heap = []
+            for state in self._ops.values():
+                self._push(state)
+            self._loaded_at = time.monotonic()
+    
+    # ─── Write-through updates ────────────────────────────────────────
+    
+    def upsert_operator(self, op: Operator) -> None:
+        """Operator created, or its status / capacity changed."""
+        with self._lock:
+            state = self._ops.get(op.id)
+            if state is None:
+                state = self._ops[op.id] = OperatorLoad(
+                    operator_id=op.id,
+                    max_chats=op.max_concurrent_chats,
+                    is_online=op.is_online,
+                )
+            else:
+                state.max_chats = op.max_concurrent_chats
+                state.is_online = op.is_online
+            self._touch(state)
+    
+    def acquire(self) -> Optional[int]:
+        """
+        Reserve a chat slot on the least-loaded online operator and
+        return its ID, or None if everyone is at max_concurrent_chats.
+        The slot is pending until confirm() / cancel().
+        """
+        with self._lock:
+            while self._heap:
+                _, _, op_id, version = heapq.heappop(self._heap)
+                state = self._ops.get(op_id)
+                if not state or state.version != version or not state.has_capacity:
+                    continue  # Stale entry
+                state.load += 1
+                state.pending.append(time.monotonic())
+                self._touch(state)
+                return op_id
+            return None
+    
+    def confirm(self, operator_id: Optional[int]) -> None:
+        """The transaction that stored an acquired slot committed."""
+        if operator_id is None:
+            return
+        with self._lock:
+            state = self._ops.get(operator_id)
+            if state and state.pending:
+                state.pending.pop(0)
+    
+    def cancel(self, operator_id: Optional[int]) -> None:
+        """The transaction that stored an acquired slot rolled back."""
+        if operator_id is None:
+            return
+        with self._lock:
+            state = self._ops.get(operator_id)
+            if state and state.pending:  # Else the slot is no longer held
+                state.pending.pop(0)
+                state.load = max(state.load - 1, 0)
+                self._touch(state)
+    
+    def release(self, operator_id: Optional[int]) -> None:
+        """A conversation left this operator (reassigned, AI_ONLY, closed)."""
+        if operator_id is None:
+            return
+        with self._lock:
+            state = self._ops.get(operator_id)
+            if state and state.load > 0:
+                state.load -= 1
+                self._touch(state)
+    
+    # ─── Reads ────────────────────────────────────────────────────────
+    
+    def is_online(self, operator_id: Optional[int]) -> bool:
+        with self._lock:
+            state = self._ops.get(operator_id)
+            return bool(state and state.is_online)
+    
+    def loads(self) -> Dict[int, int]:
+        """Active chat count per operator (console view)."""
+        with self._lock:
+            return {op_id: state.load for op_id, state in self._ops.items()}
+    
+    # ─── Heap internals (call with the lock held) ─────────────────────
+    
+    def _touch(self, state: OperatorLoad) -> None:
+        state.version += 1
+        self._push(state)
+        # Compact when stale entries dominate
+        if len(self._heap) > 4 * len(self._ops) + 64:
+            self._heap = []
+            for s in self._ops.values():
+                self._push(s)
+    
+    def _push(self, state: OperatorLoad) -> None:
+        if state.has_capacity:
+            heapq.heappush(
+                self._heap,
+                (state.ratio, state.load, state.operator_id, state.version),
+            )
+
+
+# Singleton instance
+operator_index = OperatorLoadIndex(resync_seconds=settings.OPERATOR_INDEX_RESYNC_SECONDS)
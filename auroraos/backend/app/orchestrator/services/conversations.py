@@ -0,0 +1,86 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║   AuroraOS Orchestrator — Conversation Store                     ║
+║   Message writes + denormalized conversation previews            ║
+║                                                                  ║
+║   Baron Baba © SiyahKare, 2025                                   ║
+╚══════════════════════════════════════════════════════════════════╝
+"""
+
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlmodel import Session
+
+from ..models import Conversation, ConversationMessage
+from .agent_cache import history_cache
+
+
+PREVIEW_LENGTH = 100  # Characters kept in Conversation.last_message_preview
+
+
+def append_message(
+    session: Session,
+    convo: Conversation,
+    *,
+    sender: str,
+    text: str,
+    source: str,
+    is_draft: bool = False,
+    tokens_used: Optional[int] = None,
+    model_used: Optional[str] = None,
+    count: bool = True,
+) -> ConversationMessage:
+    """
+    Add a message to a conversation and refresh its list-view columns.
+    
+    Keeps last_message_at / last_message_preview on the conversation
+    row in sync, so the operator console can render a page without
+    touching conversation_messages, and feeds the agent history cache
+    once the transaction commits. Does not commit.
+    """
+    msg = ConversationMessage(
+        conversation_id=convo.id,
+        sender=sender,
+        text=text,
+        source=source,
+        is_draft=is_draft,
+        tokens_used=tokens_used,
+        model_used=model_used,
+    )
+    session.add(msg)
+    
+    if count:
+        convo.message_count += 1
+    set_preview(convo, text, msg.created_at)
+    session.add(convo)
+    
+    if convo.id is not None:
+        history_cache.record_write(session, convo.id, sender, text)
+    
+    return msg
+
+
+def set_preview(convo: Conversation, text: str, at: Optional[datetime] = None) -> None:
+    """Update the denormalized last-message columns."""
+    convo.last_message_preview = text[:PREVIEW_LENGTH]
+    convo.last_message_at = at or datetime.utcnow()
+
+
+# ═══════════════════════════════════════════════════════════════════
+# KEYSET CURSORS — (last_message_at, id)
+# ═══════════════════════════════════════════════════════════════════
+
+def encode_cursor(convo: Conversation) -> str:
+    """Opaque cursor pointing just after this conversation in list order."""
+    ts = convo.last_message_at.isoformat() if convo.last_message_at else ""
+    raw = f"{ts}|{convo.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """Inverse of encode_cursor. Raises ValueError on a malformed cursor."""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    ts, _, convo_id = base64.urlsafe_b64decode(padded.encode()).decode().partition("|")
+    return (datetime.fromisoformat(ts) if ts else None), int(convo_id)
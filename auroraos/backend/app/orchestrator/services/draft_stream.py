@@ -0,0 +1,121 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║   AuroraOS Orchestrator — Streaming Drafts                       ║
+║   Agent draft tokens → operator console over SSE                 ║
+║                                                                  ║
+║   Baron Baba © SiyahKare, 2025                                   ║
+╚══════════════════════════════════════════════════════════════════╝
+"""
+
+import asyncio
+import json
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from sqlmodel import Session, select
+
+from ..models import Conversation, ConversationMessage
+from .agent import AgentCall, prepare_agent_call, stream_aurora_agent
+from .agent_pool import conversation_locks
+from .conversations import append_message
+from ...db import engine, unit_of_work
+from ...llm.tokens import estimate_tokens
+
+
+@dataclass
+class DraftRequest:
+    """A prepared streaming draft for one conversation."""
+    conversation_id: int
+    reply_to_message_id: int
+    call: AgentCall
+
+
+def prepare_draft(conversation_id: int) -> DraftRequest:
+    """
+    Build the agent call for a draft answering the newest user message.
+    
+    Raises LookupError if the conversation doesn't exist or has no
+    user message yet.
+    """
+    with Session(engine) as session:
+        convo = session.get(Conversation, conversation_id)
+        if not convo:
+            raise LookupError("Conversation not found")
+        
+        last = session.exec(
+            select(ConversationMessage.id, ConversationMessage.text)
+            .where(
+                ConversationMessage.conversation_id == conversation_id,
+                ConversationMessage.sender == "user",
+            )
+            .order_by(ConversationMessage.id.desc())
+            .limit(1)
+        ).first()
+        if last is None:
+            raise LookupError("No user message to draft a reply for")
+        
+        message_id, text = last
+        call = prepare_agent_call(session, convo.agent_id, convo.id, text, priority=convo.priority)
+        return DraftRequest(conversation_id, message_id, call)
+
+
+def _save_draft(draft: DraftRequest, text: str) -> int:
+    """Persist the finished draft (not counted, not sent)."""
+    call = draft.call
+    model = call.mock_reply.model_used if call.mock_reply else call.model
+    tokens = 0 if call.mock_reply else (
+        sum(estimate_tokens(m["content"]) for m in call.messages) + estimate_tokens(text)
+    )
+    
+    with Session(engine) as session:
+        convo = session.get(Conversation, draft.conversation_id)
+        with conversation_locks.hold(draft.conversation_id), unit_of_work(session):
+            msg = append_message(
+                session, convo,
+                sender="agent",
+                text=text,
+                source=convo.origin.value.lower(),
+                is_draft=True,
+                tokens_used=tokens,
+                model_used=model,
+                count=False,
+            )
+            session.flush()
+            return msg.id
+
+
+def _frame(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def stream_draft_events(draft: DraftRequest) -> AsyncIterator[str]:
+    """
+    Server-Sent Events for one streamed draft.
+    
+    - `start`: {conversation_id, reply_to_message_id}
+    - `token`: {text} per delta, as the model produces it
+    - `done`:  {message_id, text} once the draft is saved
+    - `error`: {detail} if the LLM fails (nothing is saved)
+    
+    The draft is saved as ConversationMessage(is_draft=True) only when
+    the completion finishes; a client that disconnects first cancels
+    the generation.
+    """
+    yield _frame("start", {
+        "conversation_id": draft.conversation_id,
+        "reply_to_message_id": draft.reply_to_message_id,
+    })
+    
+    parts = []
+    try:
+        async for delta in stream_aurora_agent(draft.call):
+            parts.append(delta)
+            yield _frame("token", {"text": delta})
+    except Exception as e:
+        print(f"[Draft] LLM stream error for conversation {draft.conversation_id}: {e}")
+        yield _frame("error", {"detail": "LLM error"})
+        return
+    
+    text = "".join(parts).strip()
+    message_id = await asyncio.to_thread(_save_draft, draft, text)
+    yield _frame("done", {"message_id": message_id, "text": text})
@@ -0,0 +1,403 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║   AuroraOS Orchestrator — Inbound Pipeline                       ║
+║   One message in, one commit per phase                           ║
+║                                                                  ║
+║   Baron Baba © SiyahKare, 2025                                   ║
+╚══════════════════════════════════════════════════════════════════╝
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from ..models import (
+    Conversation,
+    ConversationMessage,
+    ConversationMode,
+    ConversationOrigin,
+    PerformerSlot,
+)
+from ..schemas import (
+    IncomingMeta,
+    IncomingMessageDTO,
+    IncomingMessageResponse,
+    IncomingMessageBatchItem,
+)
+from .agent_pool import (
+    agent_pool,
+    AgentJob,
+    burst_gate,
+    coalesce_window,
+    conversation_locks,
+    respond_to_message,
+    use_async_replies,
+)
+from .assignment import operator_index
+from .conversations import append_message
+from .routing import decide_routing
+from .user_mapping import (
+    map_external_user_to_internal,
+    update_user_stats,
+    update_user_stats_many,
+    user_id_resolver,
+)
+from ...config import settings
+from ...db import after_commit, after_rollback, unit_of_work
+
+
+def process_incoming_message(
+    session: Session,
+    payload: IncomingMessageDTO,
+) -> IncomingMessageResponse:
+    """
+    Run one inbound message through the orchestrator.
+    
+    Phase 1 (ingest): user mapping, stats, conversation, the message
+    itself and the routing decision are flushed together and committed
+    once.
+    
+    Phase 2 (reply): the agent reply / draft and its outbound row are
+    committed together. With INBOUND_DEFER_REPLY=false both phases share
+    a single commit — fewest fsyncs, but the write transaction stays
+    open across the LLM call, so only use it with a fast model or a DB
+    that doesn't lock on writes. Coalescing (AGENT_COALESCE_WINDOW_SECONDS)
+    needs the message committed before the wait, so it keeps two commits.
+    
+    A synchronous reply first waits out the coalescing window; a request
+    whose message is followed by another in the same conversation comes
+    back with coalesced=True and no reply, and the newest request's turn
+    answers the whole burst.
+    
+    Raises LookupError if the performer slot does not exist.
+    """
+    text = payload.text
+    use_pool = use_async_replies(payload.async_reply) and agent_pool.running
+    coalesce = not use_pool and coalesce_window(payload.origin) > 0
+    single_commit = not settings.INBOUND_DEFER_REPLY and not use_pool and not coalesce
+    
+    # ─── Phase 1: ingest ─────────────────────────────────────────────
+    try:
+        convo, msg = _ingest(session, payload)
+        if not single_commit:
+            session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    
+    # ─── Phase 2: reply ──────────────────────────────────────────────
+    reply_text = None
+    tracking_id = None
+    coalesced = False
+    
+    needs_agent = convo.mode in (ConversationMode.AI_ONLY, ConversationMode.HYBRID_GHOST)
+    draft = convo.mode == ConversationMode.HYBRID_GHOST
+    
+    if needs_agent and use_pool and agent_pool.submit(
+        AgentJob(
+            tracking_id=msg.id,
+            conversation_id=convo.id,
+            text=text,
+            draft=draft,
+            origin=convo.origin,
+        )
+    ):
+        # Acknowledge now; the worker pool saves the reply / draft and
+        # pushes it into the outbound queue.
+        tracking_id = msg.id
+    
+    elif needs_agent and not burst_gate.wait(convo.id, convo.origin):
+        coalesced = True  # A newer message in this conversation gets the turn
+    
+    elif needs_agent:
+        # AI_ONLY: full reply + outbound, HYBRID_GHOST: draft for operator
+        with conversation_locks.hold(convo.id), unit_of_work(session):
+            reply_msg = respond_to_message(session, convo, text, draft=draft)
+            if not draft:
+                reply_text = reply_msg.text  # Read before commit expires it
+    
+    elif single_commit:
+        session.commit()  # HUMAN_ONLY: nothing to add to phase 1
+    
+    return IncomingMessageResponse(
+        conversation_id=convo.id,
+        mode=convo.mode,
+        reply=reply_text,
+        queued_for_operator=convo.mode != ConversationMode.AI_ONLY,
+        priority=convo.priority,
+        tracking_id=tracking_id,
+        reply_pending=tracking_id is not None,
+        coalesced=coalesced,
+    )
+
+
+def _ingest(
+    session: Session,
+    payload: IncomingMessageDTO,
+) -> Tuple[Conversation, ConversationMessage]:
+    """Phase 1 writes, flushed but not committed."""
+    origin = payload.origin
+    ext_user = payload.external_user_id
+    meta = payload.meta
+    
+    # 1) External → Internal user mapping (first: a lost race rolls back)
+    user_id = map_external_user_to_internal(session, origin, ext_user)
+    
+    # Update user stats if provided
+    if meta:
+        update_user_stats(
+            session, origin, ext_user,
+            coins_spent=meta.coins_spent_total,
+            vip_tier=meta.vip_tier,
+        )
+    
+    # 2) Find or create conversation
+    convo = _get_or_create_conversation(
+        session, user_id, ext_user, payload.performer_slot_id, origin,
+    )
+    
+    # 3) Save incoming message (also bumps count / preview)
+    msg = append_message(
+        session, convo,
+        sender="user",
+        text=payload.text,
+        source=origin.value.lower(),
+    )
+    if meta and meta.coins_spent_total:
+        convo.coins_spent = meta.coins_spent_total
+    
+    # 4) Routing decision
+    operator_index.sync(session)
+    _apply_routing(session, convo, meta)
+    
+    session.flush()  # msg.id doubles as the tracking ID
+    return convo, msg
+
+
+def _apply_routing(session: Session, convo: Conversation, meta: Optional[IncomingMeta]) -> None:
+    """Run decide_routing and stage the result on the conversation."""
+    routing = decide_routing(
+        coins_spent_total=meta.coins_spent_total if meta else 0,
+        vip_tier=meta.vip_tier if meta else "none",
+        current_mode=convo.mode,
+        message_count=convo.message_count,
+        current_operator_id=convo.operator_id,
+    )
+    
+    convo.mode = routing.mode
+    convo.priority = routing.priority
+    if routing.operator_id != convo.operator_id:
+        # The index reserved routing.operator_id; settle it with the commit
+        previous_operator_id = convo.operator_id
+        convo.operator_id = routing.operator_id
+        after_commit(session, lambda: operator_index.confirm(routing.operator_id))
+        after_commit(session, lambda: operator_index.release(previous_operator_id))
+        after_rollback(session, lambda: operator_index.cancel(routing.operator_id))
+    
+    session.add(convo)
+
+
+def _get_or_create_conversation(
+    session: Session,
+    user_id: int,
+    external_user_id: str,
+    slot_id: int,
+    origin: ConversationOrigin,
+) -> Conversation:
+    stmt = select(Conversation).where(
+        Conversation.user_id == user_id,
+        Conversation.performer_slot_id == slot_id,
+        Conversation.is_active == True,
+    )
+    convo: Optional[Conversation] = session.exec(stmt).first()
+    if convo:
+        return convo
+    
+    slot = session.get(PerformerSlot, slot_id)
+    if not slot:
+        raise LookupError("PerformerSlot not found")
+    
+    convo = Conversation(
+        user_id=user_id,
+        external_user_id=external_user_id,
+        performer_slot_id=slot_id,
+        agent_id=slot.agent_id,
+        origin=origin,
+        performer_slot_label=slot.label,
+    )
+    session.add(convo)
+    session.flush()
+    return convo
+
+
+# ═══════════════════════════════════════════════════════════════════
+# BATCH INGEST — /incoming-messages:batch
+# ═══════════════════════════════════════════════════════════════════
+
+def process_incoming_batch(
+    session: Session,
+    messages: List[IncomingMessageDTO],
+) -> List[IncomingMessageBatchItem]:
+    """
+    Ingest many messages with bulk reads / writes and one commit.
+    
+    - Users: resolver cache, then one IN query per origin, then one
+      flush for every new mapping
+    - Conversations: one query for the active ones, one for missing
+      slots, one flush for the new ones
+    - Messages: a single flush (multi-row INSERT)
+    
+    Agent replies are always fanned out to the worker pool, never
+    answered inline: each message takes a pool slot before it is
+    stored, and one the pool has no room for comes back `deferred`
+    (not stored, nor are the user's later messages in the batch, so a
+    resend keeps them in order). A message whose performer slot doesn't
+    exist fails on its own, without failing the batch.
+    """
+    results: List[Optional[IncomingMessageBatchItem]] = [None] * len(messages)
+    accepted = []
+    deferred = set()  # (origin, external_user_id) with a deferred message
+    reserved = 0
+    
+    try:
+        # 1) Users
+        user_ids = user_id_resolver.resolve_many(
+            session, [(m.origin, m.external_user_id) for m in messages],
+        )
+        
+        # 2) Conversations
+        convos = _get_or_create_conversations(session, messages, user_ids)
+        
+        # 3) Messages + routing, in request order
+        operator_index.sync(session)
+        for index, m in enumerate(messages):
+            convo = convos.get((user_ids[(m.origin, m.external_user_id)], m.performer_slot_id))
+            if convo is None:
+                results[index] = IncomingMessageBatchItem(
+                    index=index, success=False, error="PerformerSlot not found",
+                )
+                continue
+            
+            key = (m.origin, m.external_user_id)
+            if key in deferred or not agent_pool.reserve():
+                deferred.add(key)
+                results[index] = IncomingMessageBatchItem(
+                    index=index, success=False, deferred=True, error="Deferred: agent pool busy",
+                )
+                continue
+            reserved += 1
+            
+            msg = append_message(
+                session, convo,
+                sender="user",
+                text=m.text,
+                source=m.origin.value.lower(),
+            )
+            if m.meta and m.meta.coins_spent_total:
+                convo.coins_spent = m.meta.coins_spent_total
+            _apply_routing(session, convo, m.meta)
+            accepted.append((index, convo, msg))
+        
+        update_user_stats_many(session, [
+            (m.origin, m.external_user_id, m.meta.coins_spent_total, m.meta.vip_tier)
+            for m in (messages[index] for index, _, _ in accepted) if m.meta
+        ])
+        session.flush()
+        # Snapshot before commit expires the objects
+        accepted = [
+            (index, convo, msg.id, convo.id, convo.mode, convo.priority)
+            for index, convo, msg in accepted
+        ]
+        session.commit()
+    except Exception:
+        session.rollback()
+        agent_pool.release(reserved)
+        raise
+    
+    # 4) Fan out agent replies (on the slots reserved above)
+    for index, convo, message_id, conversation_id, mode, priority in accepted:
+        m = messages[index]
+        needs_agent = mode in (ConversationMode.AI_ONLY, ConversationMode.HYBRID_GHOST)
+        draft = mode == ConversationMode.HYBRID_GHOST
+        tracking_id = None
+        
+        if needs_agent:
+            if agent_pool.submit(AgentJob(
+                tracking_id=message_id,
+                conversation_id=conversation_id,
+                text=m.text,
+                draft=draft,
+                origin=m.origin,
+            ), reserved=True):
+                tracking_id = message_id
+            else:
+                # Only if the pool stopped mid-batch (shutdown)
+                with conversation_locks.hold(conversation_id), unit_of_work(session):
+                    respond_to_message(session, convo, m.text, draft=draft)
+        else:
+            agent_pool.release()
+        
+        results[index] = IncomingMessageBatchItem(
+            index=index,
+            success=True,
+            conversation_id=conversation_id,
+            message_id=message_id,
+            mode=mode,
+            priority=priority,
+            queued_for_operator=mode != ConversationMode.AI_ONLY,
+            tracking_id=tracking_id,
+            reply_pending=tracking_id is not None,
+        )
+    
+    return results
+
+
+def _get_or_create_conversations(
+    session: Session,
+    messages: List[IncomingMessageDTO],
+    user_ids: Dict[Tuple[ConversationOrigin, str], int],
+) -> Dict[Tuple[int, int], Conversation]:
+    """{(user_id, slot_id): active conversation}; keys with no such slot are left out."""
+    wanted: Dict[Tuple[int, int], IncomingMessageDTO] = {}
+    for m in messages:
+        wanted.setdefault((user_ids[(m.origin, m.external_user_id)], m.performer_slot_id), m)
+    
+    convos: Dict[Tuple[int, int], Conversation] = {}
+    for convo in session.exec(
+        select(Conversation).where(
+            Conversation.is_active == True,
+            Conversation.user_id.in_({user_id for user_id, _ in wanted}),
+            Conversation.performer_slot_id.in_({slot_id for _, slot_id in wanted}),
+        )
+    ).all():
+        key = (convo.user_id, convo.performer_slot_id)
+        if key in wanted:
+            convos.setdefault(key, convo)
+    
+    missing = [key for key in wanted if key not in convos]
+    if not missing:
+        return convos
+    
+    slots = {
+        slot.id: slot
+        for slot in session.exec(
+            select(PerformerSlot).where(PerformerSlot.id.in_({slot_id for _, slot_id in missing}))
+        ).all()
+    }
+    for key in missing:
+        slot = slots.get(key[1])
+        if not slot:
+            continue
+        m = wanted[key]
+        convos[key] = Conversation(
+            user_id=key[0],
+            external_user_id=m.external_user_id,
+            performer_slot_id=slot.id,
+            agent_id=slot.agent_id,
+            origin=m.origin,
+            performer_slot_label=slot.label,
+        )
+        session.add(convos[key])
+    
+    session.flush()
+    return convos
@@ -8,10 +8,23 @@
 """
 
 import asyncio
-from typing import Optional
+import json
+import threading
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Optional, AsyncIterator
 from dataclasses import dataclass
 
-from ..models import ConversationOrigin
+from sqlalchemy import update, delete, func
+from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
+
+from ..models import ConversationOrigin, OutboundQueueItem, OutboundStatus
+from ...config import settings
+from ...db import engine, after_commit, db_writer
+from ...metrics import metrics
 
 
 @dataclass
@@ -24,14 +37,118 @@ class OutboundMessage:
     message_id: Optional[int] = None
 
 
+# ─── Metrics ──────────────────────────────────────────────────────────
+
+outbound_enqueued = metrics.counter(
+    "aurora_outbound_enqueued_total",
+    "Replies queued for delivery (counted on commit)",
+    ["origin"],
+)
+outbound_leased = metrics.counter(
+    "aurora_outbound_leased_total",
+    "Queue rows handed out to pollers (redeliveries included)",
+    ["origin"],
+)
+outbound_delivered = metrics.counter(
+    "aurora_outbound_delivered_total",
+    "Replies acked as delivered",
+    ["origin"],
+)
+outbound_dead_lettered = metrics.counter(
+    "aurora_outbound_dead_lettered_total",
+    "Replies moved to DEAD after OUTBOUND_MAX_ATTEMPTS leases",
+    ["origin"],
+)
+outbound_queue_depth = metrics.gauge(
+    "aurora_outbound_queue_depth",
+    "PENDING rows in outbound_queue (leased or not)",
+    ["origin"],
+)
+outbound_queue_age = metrics.gauge(
+    "aurora_outbound_queue_oldest_age_seconds",
+    "Age of the oldest PENDING row",
+    ["origin"],
+)
+
+
+@metrics.on_collect
+def _collect_queue_metrics() -> None:
+    """Depth and oldest age per origin, read from the DB at scrape time."""
+    with Session(engine) as session:
+        rows = session.exec(
+            select(OutboundQueueItem.origin, func.count(), func.min(OutboundQueueItem.created_at))
+            .where(OutboundQueueItem.status == OutboundStatus.PENDING)
+            .group_by(OutboundQueueItem.origin)
+        ).all()
+    
+    now = datetime.utcnow()
+    pending = {origin: (count, oldest) for origin, count, oldest in rows}
+    for origin in ConversationOrigin:
+        count, oldest = pending.get(origin, (0, None))
+        outbound_queue_depth.set(count, origin=origin)
+        outbound_queue_age.set((now - oldest).total_seconds() if oldest else 0, origin=origin)
+
+
+def _to_message(item: OutboundQueueItem) -> OutboundMessage:
+    return OutboundMessage(
+        origin=item.origin,
+        external_user_id=item.external_user_id,
+        text=item.text,
+        conversation_id=item.conversation_id,
+        message_id=item.message_id,
+    )
+
+
 # ═══════════════════════════════════════════════════════════════════
-# OUTBOUND QUEUE (In-memory for now, Redis in production)
+# ENQUEUE NOTIFIER — Wakes long-poll / stream listeners
 # ═══════════════════════════════════════════════════════════════════
 
-_outbound_queue: list[OutboundMessage] = []
+class OutboundNotifier:
+    """
+    In-process wake-up signal per origin.
+    
+    enqueue_outbound_message commits in FastAPI's threadpool, agent
+    workers or async routes, while the listeners live on the event
+    loop, so notify() hops over with call_soon_threadsafe. Enqueues
+    made by *other* processes are picked up by the listeners' periodic
+    DB re-check instead.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._listeners: dict[ConversationOrigin, set] = defaultdict(set)
+    
+    @contextmanager
+    def listen(self, origin: ConversationOrigin):
+        """Register interest before checking the queue, so no enqueue is missed."""
+        entry = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._listeners[origin].add(entry)
+        try:
+            yield entry[1]
+        finally:
+            with self._lock:
+                self._listeners[origin].discard(entry)
+    
+    def notify(self, origin: ConversationOrigin) -> None:
+        with self._lock:
+            listeners = list(self._listeners.get(origin, ()))
+        for loop, event in listeners:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # Loop already closed
+
+
+outbound_notifier = OutboundNotifier()
+
 
+# ═══════════════════════════════════════════════════════════════════
+# OUTBOUND QUEUE (DB-backed, lease-based)
+# ═══════════════════════════════════════════════════════════════════
 
 def enqueue_outbound_message(
+    session: Session,
     origin: ConversationOrigin,
     external_user_id: str,
     text: str,
@@ -41,14 +158,14 @@ def enqueue_outbound_message(
     """
     Queue a message for delivery to the originating platform.
     
-    In production, this would:
-    1. Push to Redis/RabbitMQ queue
-    2. Worker process picks up and delivers
-    3. Handles retries, rate limiting, etc.
+    The row lives in `outbound_queue`, so it survives restarts and is
+    visible to every uvicorn worker. Platforms lease it via polling and
+    ack it by message_id.
     
-    For now: just add to in-memory list.
+    Joins the caller's transaction (no commit here); long-poll waiters
+    are woken once that transaction commits.
     """
-    msg = OutboundMessage(
+    item = OutboundQueueItem(
         origin=origin,
         external_user_id=external_user_id,
         text=text,
@@ -56,36 +173,84 @@ def enqueue_outbound_message(
         message_id=message_id,
     )
     
-    _outbound_queue.append(msg)
+    session.add(item)
+    
+    def on_commit() -> None:
+        outbound_enqueued.inc(origin=origin)
+        outbound_notifier.notify(origin)
+    
+    after_commit(session, on_commit)
     print(f"[Outbound] Queued message to {origin.value}:{external_user_id}")
     
     return True
 
 
-def get_pending_outbound(origin: ConversationOrigin = None) -> list[OutboundMessage]:
-    """Get pending outbound messages, optionally filtered by origin."""
+def get_pending_outbound(
+    session: Session,
+    origin: ConversationOrigin = None,
+    limit: int = 100,
+) -> list[OutboundMessage]:
+    """Get pending outbound messages (leased or not), optionally filtered by origin."""
+    stmt = select(OutboundQueueItem).where(OutboundQueueItem.status == OutboundStatus.PENDING)
     if origin:
-        return [m for m in _outbound_queue if m.origin == origin]
-    return _outbound_queue.copy()
+        stmt = stmt.where(OutboundQueueItem.origin == origin)
+    stmt = stmt.order_by(OutboundQueueItem.id).limit(limit)
+    return [_to_message(item) for item in session.exec(stmt).all()]
 
 
-def pop_outbound_message(origin: ConversationOrigin, external_user_id: str) -> Optional[OutboundMessage]:
-    """Pop the next message for a specific user."""
-    global _outbound_queue
-    
-    for i, msg in enumerate(_outbound_queue):
-        if msg.origin == origin and msg.external_user_id == external_user_id:
-            return _outbound_queue.pop(i)
+def pop_outbound_message(
+    session: Session,
+    origin: ConversationOrigin,
+    external_user_id: str,
+) -> Optional[OutboundMessage]:
+    """Pop the next message for a specific user (marks it delivered)."""
+    stmt = (
+        select(OutboundQueueItem)
+        .where(
+            OutboundQueueItem.origin == origin,
+            OutboundQueueItem.status == OutboundStatus.PENDING,
+            OutboundQueueItem.external_user_id == external_user_id,
+        )
+        .order_by(OutboundQueueItem.id)
+        .limit(1)
+    )
+    item = session.exec(stmt).first()
+    if not item:
+        return None
     
-    return None
+    item.status = OutboundStatus.DELIVERED
+    item.delivered_at = datetime.utcnow()
+    session.add(item)
+    session.commit()
+    outbound_delivered.inc(origin=origin)
+    return _to_message(item)
 
 
-def clear_outbound_queue() -> int:
+def clear_outbound_queue(session: Session) -> int:
     """Clear all pending messages (for testing)."""
-    global _outbound_queue
-    count = len(_outbound_queue)
-    _outbound_queue = []
-    return count
+    result = session.exec(
+        delete(OutboundQueueItem).where(OutboundQueueItem.status == OutboundStatus.PENDING)
+    )
+    session.commit()
+    return result.rowcount
+
+
+def get_dead_letters(
+    session: Session,
+    origin: ConversationOrigin,
+    limit: int = 50,
+) -> list[OutboundQueueItem]:
+    """Messages that exhausted OUTBOUND_MAX_ATTEMPTS without an ack."""
+    stmt = (
+        select(OutboundQueueItem)
+        .where(
+            OutboundQueueItem.origin == origin,
+            OutboundQueueItem.status == OutboundStatus.DEAD,
+        )
+        .order_by(OutboundQueueItem.id.desc())
+        .limit(limit)
+    )
+    return list(session.exec(stmt).all())
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -130,19 +295,105 @@ async def deliver_message(msg: OutboundMessage) -> bool:
 # POLLING ENDPOINT SUPPORT
 # ═══════════════════════════════════════════════════════════════════
 
+def _visible_pending(origin: ConversationOrigin, now: datetime):
+    return select(OutboundQueueItem.id, OutboundQueueItem.attempts).where(
+        OutboundQueueItem.origin == origin,
+        OutboundQueueItem.status == OutboundStatus.PENDING,
+        OutboundQueueItem.visible_at <= now,
+    )
+
+
 def get_outbound_for_polling(
     origin: ConversationOrigin,
     limit: int = 10,
 ) -> list[dict]:
     """
-    Get pending messages for a platform to poll.
+    Lease pending messages for a platform to poll.
     
     FlirtMarket calls:
     GET /orchestrator/outbound/poll?origin=FLIRTMARKET
     
-    Returns list of messages, marks them as in-flight.
+    Claimed rows stay invisible for OUTBOUND_LEASE_SECONDS. A row that
+    is not acked by then is handed out again; after OUTBOUND_MAX_ATTEMPTS
+    leases it is moved to DEAD instead.
+    
+    Most polls find nothing, so a plain read checks first; only a poll
+    with work goes through the group commit writer to claim it.
     """
-    pending = [m for m in _outbound_queue if m.origin == origin][:limit]
+    with Session(engine) as session:
+        if session.exec(_visible_pending(origin, datetime.utcnow()).limit(1)).first() is None:
+            return []
+    
+    messages = db_writer.submit(lambda session: _lease_outbound(session, origin, limit))
+    outbound_leased.inc(len(messages), origin=origin)
+    return messages
+
+
+def _lease_outbound(session: Session, origin: ConversationOrigin, limit: int) -> list[dict]:
+    """
+    Claim up to `limit` visible rows (no commit; a group commit job).
+    
+    Each pass reads the next rows in ix_outbound_queue_claim order (a
+    limited range read, however long the backlog), dead-letters the
+    exhausted ones among them and leases the rest. Only a pass that hit
+    exhausted rows is followed by another one for the slots they took,
+    so a poll comes back short only when there are fewer than `limit`
+    deliverable rows, and each dead row is read once. The conditional
+    UPDATEs make concurrent pollers (other workers or processes) skip
+    rows someone else already took.
+    """
+    now = datetime.utcnow()
+    token = uuid.uuid4().hex
+    leased = dead = 0
+    
+    while leased < limit:
+        wanted = limit - leased
+        rows = session.exec(
+            _visible_pending(origin, now)
+            .order_by(OutboundQueueItem.visible_at, OutboundQueueItem.id)
+            .limit(wanted)
+            .with_for_update(skip_locked=True)
+        ).all()
+        exhausted = [row_id for row_id, attempts in rows if attempts >= settings.OUTBOUND_MAX_ATTEMPTS]
+        live = [row_id for row_id, attempts in rows if attempts < settings.OUTBOUND_MAX_ATTEMPTS]
+        
+        if exhausted:
+            dead += session.exec(
+                update(OutboundQueueItem)
+                .where(
+                    OutboundQueueItem.id.in_(exhausted),
+                    OutboundQueueItem.status == OutboundStatus.PENDING,
+                )
+                .values(status=OutboundStatus.DEAD)
+            ).rowcount
+        if live:
+            leased += session.exec(
+                update(OutboundQueueItem)
+                .where(
+                    OutboundQueueItem.id.in_(live),
+                    OutboundQueueItem.status == OutboundStatus.PENDING,
+                    OutboundQueueItem.visible_at <= now,
+                )
+                .values(
+                    visible_at=now + timedelta(seconds=settings.OUTBOUND_LEASE_SECONDS),
+                    attempts=OutboundQueueItem.attempts + 1,
+                    lease_token=token,
+                )
+            ).rowcount
+        if not exhausted or len(rows) < wanted:
+            break  # Every slot went to a deliverable row, or the backlog is drained
+    
+    if dead:
+        after_commit(session, lambda: outbound_dead_lettered.inc(dead, origin=origin))
+        print(f"[Outbound] Dead-lettered {dead} message(s) for {origin.value}")
+    
+    claimed: list[OutboundQueueItem] = []
+    if leased:
+        claimed = list(session.exec(
+            select(OutboundQueueItem)
+            .where(OutboundQueueItem.lease_token == token)
+            .order_by(OutboundQueueItem.id)
+        ).all())
     
     return [
         {
@@ -150,8 +401,9 @@ def get_outbound_for_polling(
             "text": m.text,
             "conversation_id": m.conversation_id,
             "message_id": m.message_id,
+            "attempts": m.attempts,
         }
-        for m in pending
+        for m in claimed
     ]
 
 
@@ -160,18 +412,144 @@ def confirm_outbound_delivered(
     external_user_id: str,
     message_id: int,
 ) -> bool:
-    """Mark a message as successfully delivered."""
-    global _outbound_queue
-    
-    for i, msg in enumerate(_outbound_queue):
-        if (
-            msg.origin == origin
-            and msg.external_user_id == external_user_id
-            and msg.message_id == message_id
-        ):
-            _outbound_queue.pop(i)
-            print(f"[Outbound] Confirmed delivery: {origin.value}:{external_user_id}:{message_id}")
-            return True
+    """Mark a message as successfully delivered (ack by message_id, group committed)."""
+    def work(session: Session) -> int:
+        return session.exec(
+            update(OutboundQueueItem)
+            .where(
+                OutboundQueueItem.origin == origin,
+                OutboundQueueItem.message_id == message_id,
+                OutboundQueueItem.external_user_id == external_user_id,
+                OutboundQueueItem.status == OutboundStatus.PENDING,
+            )
+            .values(
+                status=OutboundStatus.DELIVERED,
+                delivered_at=datetime.utcnow(),
+                lease_token=None,
+            )
+        ).rowcount
+    
+    delivered = db_writer.submit(work)
+    if delivered:
+        outbound_delivered.inc(delivered, origin=origin)
+        print(f"[Outbound] Confirmed delivery: {origin.value}:{external_user_id}:{message_id}")
+        return True
     
     return False
 
+
+def confirm_outbound_delivered_batch(
+    origin: ConversationOrigin,
+    acks: list[tuple[str, int]],
+) -> set[int]:
+    """
+    Ack many (external_user_id, message_id) pairs with one lookup and
+    one UPDATE, in one group commit. Returns the message_ids that were
+    confirmed; pairs that aren't pending (already acked, dead, wrong
+    user) are skipped, like the single ack.
+    """
+    wanted = set(acks)
+    if not wanted:
+        return set()
+    
+    confirmed, delivered = db_writer.submit(lambda session: _mark_delivered_batch(session, origin, wanted))
+    if delivered:
+        outbound_delivered.inc(delivered, origin=origin)
+        print(f"[Outbound] Confirmed {delivered} deliveries for {origin.value} in one batch")
+    return confirmed
+
+
+def _mark_delivered_batch(
+    session: Session,
+    origin: ConversationOrigin,
+    wanted: set[tuple[str, int]],
+) -> tuple[set[int], int]:
+    rows = session.exec(
+        select(OutboundQueueItem.id, OutboundQueueItem.external_user_id, OutboundQueueItem.message_id)
+        .where(
+            OutboundQueueItem.origin == origin,
+            OutboundQueueItem.message_id.in_({message_id for _, message_id in wanted}),
+            OutboundQueueItem.status == OutboundStatus.PENDING,
+        )
+    ).all()
+    matched = [(row_id, message_id) for row_id, user, message_id in rows if (user, message_id) in wanted]
+    if not matched:
+        return set(), 0
+    
+    result = session.exec(
+        update(OutboundQueueItem)
+        .where(
+            OutboundQueueItem.id.in_([row_id for row_id, _ in matched]),
+            OutboundQueueItem.status == OutboundStatus.PENDING,
+        )
+        .values(
+            status=OutboundStatus.DELIVERED,
+            delivered_at=datetime.utcnow(),
+            lease_token=None,
+        )
+    )
+    return {message_id for _, message_id in matched}, result.rowcount
+
+
+# ═══════════════════════════════════════════════════════════════════
+# LONG-POLL / STREAM SUPPORT
+# ═══════════════════════════════════════════════════════════════════
+
+async def wait_for_outbound(
+    origin: ConversationOrigin,
+    limit: int = 10,
+    wait: float = 0.0,
+) -> list[dict]:
+    """
+    Lease messages, blocking up to `wait` seconds until one is enqueued.
+    
+    Returns as soon as an enqueue for this origin happens in this
+    process; otherwise re-checks the DB every OUTBOUND_RECHECK_SECONDS.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    
+    while True:
+        with outbound_notifier.listen(origin) as enqueued:
+            messages = await run_in_threadpool(get_outbound_for_polling, origin, limit)
+            remaining = deadline - loop.time()
+            if messages or remaining <= 0:
+                return messages
+            
+            try:
+                await asyncio.wait_for(
+                    enqueued.wait(),
+                    timeout=min(remaining, settings.OUTBOUND_RECHECK_SECONDS),
+                )
+            except asyncio.TimeoutError:
+                pass
+
+
+async def stream_outbound_events(
+    origin: ConversationOrigin,
+    limit: int = 10,
+    is_disconnected=None,
+) -> AsyncIterator[str]:
+    """
+    Server-Sent Events feed of leased outbound messages.
+    
+    Each message is one `event: message` frame; idle periods emit a
+    keepalive comment. Messages are leased exactly like /outbound/poll,
+    so the subscriber still acks them by message_id.
+    """
+    while True:
+        if is_disconnected and await is_disconnected():
+            return
+        
+        messages = await wait_for_outbound(
+            origin,
+            limit,
+            wait=settings.OUTBOUND_STREAM_KEEPALIVE_SECONDS,
+        )
+        
+        if not messages:
+            yield ": keepalive\n\n"
+            continue
+        
+        for m in messages:
+            yield f"event: message\ndata: {json.dumps(m, default=str)}\n\n"
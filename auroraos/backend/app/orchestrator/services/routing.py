@@ -11,6 +11,7 @@ from dataclasses import dataclass
 from typing import Optional
 
 from ..models import ConversationMode, ConversationPriority
+from .assignment import operator_index
 
 
 @dataclass
@@ -24,40 +25,45 @@ class RoutingDecision:
 def decide_routing(
     coins_spent_total: int,
     vip_tier: str,
-    operator_online: bool,
     current_mode: ConversationMode,
     message_count: int = 0,
+    current_operator_id: Optional[int] = None,
 ) -> RoutingDecision:
     """
     Decide how to route a conversation.
     
     Rules (v1 - simple):
-    1. VIP (gold/platinum) or big spender (>500 coins) → HYBRID if operator online
+    1. VIP (gold/platinum) or big spender (>500 coins) → HYBRID if an operator has capacity
     2. Medium spender (50-500 coins) → AI_ONLY but HIGH priority
     3. Low spender (<50 coins) → AI_ONLY, NORMAL priority
     4. If already HUMAN_ONLY, stay HUMAN_ONLY
     
+    Operators come from the live load index: a conversation keeps its
+    operator while they are online, otherwise the least-loaded online
+    operator is reserved. A new operator_id in the decision holds a
+    slot in the index, so callers must persist it (or release it).
+    
     Future enhancements:
     - Time of day (operator availability)
     - Conversation sentiment
     - User complaint history
-    - Operator load balancing
     """
     
     # If currently HUMAN_ONLY, operator keeps control
     if current_mode == ConversationMode.HUMAN_ONLY:
         return RoutingDecision(
             mode=ConversationMode.HUMAN_ONLY,
-            operator_id=1,  # TODO: actual operator assignment
+            operator_id=_keep_or_assign(current_operator_id),
             priority=ConversationPriority.VIP,
         )
     
     # VIP users or big spenders
     if vip_tier in ("gold", "platinum") or coins_spent_total > 500:
-        if operator_online:
+        operator_id = _keep_or_assign(current_operator_id)
+        if operator_id is not None:
             return RoutingDecision(
                 mode=ConversationMode.HYBRID_GHOST,
-                operator_id=1,  # TODO: load balance
+                operator_id=operator_id,
                 priority=ConversationPriority.VIP,
             )
         else:
@@ -83,6 +89,13 @@ def decide_routing(
     )
 
 
+def _keep_or_assign(current_operator_id: Optional[int]) -> Optional[int]:
+    """Sticky assignment: keep an online operator, else take the least-loaded one."""
+    if current_operator_id is not None and operator_index.is_online(current_operator_id):
+        return current_operator_id
+    return operator_index.acquire()
+
+
 def should_escalate_to_human(
     message_text: str,
     sentiment_score: float = 0.0,
@@ -26,9 +26,20 @@ from ..schemas import (
     TelegramInboundResponse,
     RoutingMode,
 )
-from .agent import call_aurora_agent
 from .routing_decision import orchestrator_decision
-from .outbound import enqueue_outbound_message
+from .conversations import append_message
+from .user_mapping import user_id_resolver
+from .agent_pool import (
+    agent_pool,
+    AgentJob,
+    burst_gate,
+    coalesce_window,
+    conversation_locks,
+    respond_to_message,
+    use_async_replies,
+)
+from ...config import settings
+from ...db import unit_of_work
 
 
 class TelegramBridgeService:
@@ -52,83 +63,118 @@ class TelegramBridgeService:
         self,
         db: Session,
         message: TelegramInboundMessage,
+        reserved: bool = False,
     ) -> TelegramInboundResponse:
         """
         Process an inbound Telegram message.
-        """
-        # 1. Map Telegram user to internal user
-        user_id, is_new_user = self._get_or_create_user(
-            db,
-            telegram_user_id=message.telegram_user_id,
-            username=message.username,
-            first_name=message.first_name,
-        )
-        
-        # 2. Find or create conversation
-        conversation, is_new_conv = self._get_or_create_conversation(
-            db,
-            user_id=user_id,
-            external_user_id=f"tg_{message.telegram_user_id}",
-        )
-        
-        # 3. Save incoming message
-        self._save_message(
-            db,
-            conversation_id=conversation.id,
-            text=message.message,
-            sender="user",
-        )
-        
-        # 4. Make routing decision
-        routing_decision = orchestrator_decision.decide_route(
-            conversation={
-                "id": str(conversation.id),
-                "performer": {"id": conversation.agent_id},
-                "customer": {
-                    "tier": self._get_user_tier(db, user_id),
-                    "coins_spent": conversation.coins_spent,
-                },
-            },
-            customer_risk_score=self._calculate_risk_score(conversation),
-        )
-        
-        # 5. Update conversation mode based on routing
-        conversation.mode = self._map_routing_to_mode(routing_decision.routing_mode)
-        db.add(conversation)
-        db.commit()
         
-        # 6. Handle based on routing mode
-        ai_reply = None
-        queued_for_operator = False
+        `reserved`: the caller holds an agent pool slot for this message
+        (agent_pool.reserve()); it is used for the reply or given back.
+        """
+        use_pool = reserved or (use_async_replies(message.async_reply) and agent_pool.running)
+        coalesce = not use_pool and coalesce_window(ConversationOrigin.TELEGRAM) > 0
+        single_commit = not settings.INBOUND_DEFER_REPLY and not use_pool and not coalesce
         
-        if routing_decision.routing_mode == RoutingMode.AI_ONLY:
-            # Full AI response
-            ai_reply = self._generate_ai_reply(
+        # Steps 1-5 are one transaction (phase 1)
+        try:
+            # 1. Map Telegram user to internal user
+            user_id, is_new_user = self._get_or_create_user(
                 db,
-                conversation=conversation,
-                message=message.message,
+                telegram_user_id=message.telegram_user_id,
+                username=message.username,
+                first_name=message.first_name,
             )
             
-            # Queue for outbound (Telegram worker will poll)
-            enqueue_outbound_message(
-                origin=ConversationOrigin.TELEGRAM,
+            # 2. Find or create conversation
+            conversation, is_new_conv = self._get_or_create_conversation(
+                db,
+                user_id=user_id,
                 external_user_id=f"tg_{message.telegram_user_id}",
-                text=ai_reply,
-                conversation_id=conversation.id,
             )
             
-        elif routing_decision.routing_mode == RoutingMode.HYBRID:
-            # Generate AI draft for operator review
-            ai_reply = self._generate_ai_reply(
+            # 3. Save incoming message
+            user_msg = self._save_message(
                 db,
-                conversation=conversation,
-                message=message.message,
-                is_draft=True,
+                conversation,
+                text=message.message,
+                sender="user",
             )
-            queued_for_operator = True
+            
+            # 4. Make routing decision
+            routing_decision = orchestrator_decision.decide_route(
+                conversation={
+                    "id": str(conversation.id),
+                    "performer": {"id": conversation.agent_id},
+                    "customer": {
+                        "tier": self._get_user_tier(db, user_id),
+                        "coins_spent": conversation.coins_spent,
+                    },
+                },
+                customer_risk_score=self._calculate_risk_score(conversation),
+            )
+            
+            # 5. Update conversation mode based on routing
+            conversation.mode = self._map_routing_to_mode(routing_decision.routing_mode)
+            db.add(conversation)
+            if not single_commit:
+                db.commit()
+        except Exception:
+            db.rollback()
+            if reserved:
+                agent_pool.release()
+            raise
+        
+        # 6. Handle based on routing mode (phase 2)
+        ai_reply = None
+        queued_for_operator = False
+        tracking_id = None
+        coalesced = False
+        
+        needs_agent = routing_decision.routing_mode in (RoutingMode.AI_ONLY, RoutingMode.HYBRID)
+        is_hybrid = routing_decision.routing_mode == RoutingMode.HYBRID
+        
+        if needs_agent and use_pool and agent_pool.submit(
+            AgentJob(
+                tracking_id=user_msg.id,
+                conversation_id=conversation.id,
+                text=message.message,
+                draft=is_hybrid,
+                source="telegram",
+                count_reply=False,
+                origin=ConversationOrigin.TELEGRAM,
+            ),
+            reserved=reserved,
+        ):
+            # Reply (or draft) is generated by the worker pool
+            tracking_id = user_msg.id
+            queued_for_operator = is_hybrid
+            
+        elif needs_agent and not burst_gate.wait(conversation.id, ConversationOrigin.TELEGRAM):
+            # A newer DM in this conversation gets the turn for the burst
+            coalesced = True
+            queued_for_operator = is_hybrid
+            
+        elif needs_agent:
+            # AI_ONLY: full reply, queued for outbound (the Telegram worker
+            # polls and acks by message_id). HYBRID: draft for operator review.
+            with conversation_locks.hold(conversation.id), unit_of_work(db):
+                reply_msg = respond_to_message(
+                    db,
+                    conversation,
+                    message.message,
+                    draft=is_hybrid,
+                    source="telegram",
+                    count_reply=False,
+                )
+            ai_reply = reply_msg.text
+            queued_for_operator = is_hybrid
             
         else:  # HUMAN_ONLY
             queued_for_operator = True
+            if reserved:
+                agent_pool.release()
+            if single_commit:
+                db.commit()
         
         # 7. Try to match with FlirtMarket conversation
         fm_conv_id = self._find_flirtmarket_match(db, message.telegram_user_id)
@@ -140,6 +186,9 @@ class TelegramBridgeService:
             ai_reply=ai_reply,
             queued_for_operator=queued_for_operator,
             matched_flirtmarket_conversation=fm_conv_id,
+            tracking_id=tracking_id,
+            reply_pending=tracking_id is not None,
+            coalesced=coalesced,
         )
     
     def _get_or_create_user(
@@ -150,38 +199,12 @@ class TelegramBridgeService:
         first_name: Optional[str],
     ) -> Tuple[int, bool]:
         """Get or create internal user from Telegram user."""
-        external_id = f"tg_{telegram_user_id}"
-        
-        stmt = select(UserMapping).where(
-            UserMapping.origin == ConversationOrigin.TELEGRAM,
-            UserMapping.external_user_id == external_id,
-        )
-        mapping = db.exec(stmt).first()
-        
-        if mapping:
-            # Update display name if changed
-            display = username or first_name
-            if display and mapping.display_name != display:
-                mapping.display_name = display
-                db.add(mapping)
-                db.commit()
-            return mapping.internal_user_id, False
-        
-        # Create new mapping
-        max_stmt = select(UserMapping).order_by(UserMapping.internal_user_id.desc()).limit(1)
-        last = db.exec(max_stmt).first()
-        new_id = (last.internal_user_id + 1) if last else 1
-        
-        new_mapping = UserMapping(
-            origin=ConversationOrigin.TELEGRAM,
-            external_user_id=external_id,
-            internal_user_id=new_id,
+        return user_id_resolver.resolve(
+            db,
+            ConversationOrigin.TELEGRAM,
+            f"tg_{telegram_user_id}",
             display_name=username or first_name,
         )
-        db.add(new_mapping)
-        db.commit()
-        
-        return new_id, True
     
     def _get_or_create_conversation(
         self,
@@ -201,7 +224,6 @@ class TelegramBridgeService:
             conv.last_message_at = datetime.utcnow()
             conv.message_count += 1
             db.add(conv)
-            db.commit()
             return conv, False
         
         # Get default performer slot
@@ -217,60 +239,33 @@ class TelegramBridgeService:
             mode=ConversationMode.AI_ONLY,
             last_message_at=datetime.utcnow(),
             message_count=1,
+            performer_slot_label=slot.label if slot else None,
         )
         db.add(conv)
-        db.commit()
-        db.refresh(conv)
+        db.flush()
         
         return conv, True
     
     def _save_message(
         self,
         db: Session,
-        conversation_id: int,
+        conversation: Conversation,
         text: str,
         sender: str,
         is_draft: bool = False,
     ) -> ConversationMessage:
-        """Save a message to the conversation."""
-        msg = ConversationMessage(
-            conversation_id=conversation_id,
+        """Add a message to the conversation (count is bumped on lookup). Flushes, no commit."""
+        msg = append_message(
+            db, conversation,
             sender=sender,
             text=text,
             source="telegram",
             is_draft=is_draft,
+            count=False,
         )
-        db.add(msg)
-        db.commit()
-        db.refresh(msg)
+        db.flush()
         return msg
     
-    def _generate_ai_reply(
-        self,
-        db: Session,
-        conversation: Conversation,
-        message: str,
-        is_draft: bool = False,
-    ) -> str:
-        """Generate AI reply using Aurora agent."""
-        result = call_aurora_agent(
-            session=db,
-            agent_id=conversation.agent_id,
-            conversation_id=conversation.id,
-            message=message,
-        )
-        
-        # Save the reply
-        self._save_message(
-            db,
-            conversation_id=conversation.id,
-            text=result.reply,
-            sender="agent",
-            is_draft=is_draft,
-        )
-        
-        return result.reply
-    
     def _get_user_tier(self, db: Session, user_id: int) -> str:
         """Get user's VIP tier."""
         stmt = select(UserMapping).where(UserMapping.internal_user_id == user_id)
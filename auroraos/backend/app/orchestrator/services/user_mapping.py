@@ -7,9 +7,263 @@
 ╚══════════════════════════════════════════════════════════════════╝
 """
 
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
 
-from ..models import UserMapping, ConversationOrigin
+from ..models import UserMapping, InternalUserId, ConversationOrigin
+from ...config import settings
+from ...db import after_commit
+
+
+# ═══════════════════════════════════════════════════════════════════
+# RESOLVER — LRU read-through cache over user_mappings
+# ═══════════════════════════════════════════════════════════════════
+
+@dataclass
+class _CachedUser:
+    internal_user_id: Optional[int]  # None → negative entry
+    display_name: Optional[str] = None
+    expires_at: Optional[float] = None  # Negative entries only
+
+
+class UserIdResolver:
+    """
+    External → internal user ID resolution.
+    
+    Mappings never change once created, so hits are served from a
+    bounded LRU without touching the DB. Misses read through to
+    user_mappings; unknown users are cached negatively for a short TTL
+    so lookups for them don't hit the DB either.
+    
+    New IDs come from the internal_user_ids sequence table (migration 3
+    starts it after the IDs handed out before it existed), and the
+    unique (origin, external_user_id) constraint settles races: the
+    loser of a concurrent insert re-reads the winner's mapping.
+    """
+    
+    MAX_CREATE_ATTEMPTS = 3
+    
+    def __init__(self, max_entries: int, negative_ttl: float):
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[Tuple[ConversationOrigin, str], _CachedUser] = OrderedDict()
+    
+    def lookup(
+        self,
+        session: Session,
+        origin: ConversationOrigin,
+        external_user_id: str,
+    ) -> Optional[int]:
+        """Internal ID for a known user, None if unknown. Never creates."""
+        entry = self._get((origin, external_user_id))
+        if entry is None:
+            entry = self._load(session, origin, external_user_id)
+        return entry.internal_user_id
+    
+    def resolve(
+        self,
+        session: Session,
+        origin: ConversationOrigin,
+        external_user_id: str,
+        display_name: Optional[str] = None,
+    ) -> Tuple[int, bool]:
+        """
+        Get or create the internal ID. Returns (internal_user_id, created).
+        
+        A known user costs no queries, unless display_name is given
+        and differs from the stored one. A user cached as unknown goes
+        straight to the insert; if someone created them in the meantime
+        the unique constraint says so and the mapping is re-read.
+        
+        Writes join the caller's transaction and reach the cache once it
+        commits. Call this before other writes in the transaction: a lost
+        insert race rolls the session back before re-reading.
+        """
+        key = (origin, external_user_id)
+        
+        for _ in range(self.MAX_CREATE_ATTEMPTS):
+            entry = self._get(key)
+            if entry is None:
+                entry = self._load(session, origin, external_user_id)
+            
+            if entry.internal_user_id is not None:
+                if display_name and entry.display_name != display_name:
+                    self._update_display_name(session, key, display_name)
+                return entry.internal_user_id, False
+            
+            try:
+                mapping = UserMapping(
+                    origin=origin,
+                    external_user_id=external_user_id,
+                    internal_user_id=self._allocate(session),
+                    display_name=display_name,
+                )
+                session.add(mapping)
+                session.flush()
+            except IntegrityError:
+                # Another writer mapped this user first — re-read theirs
+                session.rollback()
+                self.invalidate(origin, external_user_id)
+                continue
+            
+            self._put_after_commit(session, key, _CachedUser(mapping.internal_user_id, display_name))
+            return mapping.internal_user_id, True
+        
+        raise RuntimeError(f"Could not map {origin.value}:{external_user_id}")
+    
+    def resolve_many(
+        self,
+        session: Session,
+        keys: Iterable[Tuple[ConversationOrigin, str]],
+    ) -> Dict[Tuple[ConversationOrigin, str], int]:
+        """
+        Bulk get-or-create for batch ingest: {(origin, external_user_id): internal_user_id}.
+        
+        Cache hits first, then one IN query per origin for the misses,
+        then one flush that creates every remaining mapping (users cached
+        as unknown skip the query). Same transaction rules as resolve().
+        """
+        result: Dict[Tuple[ConversationOrigin, str], int] = {}
+        misses: Dict[ConversationOrigin, List[str]] = defaultdict(list)
+        unknown: List[Tuple[ConversationOrigin, str]] = []
+        
+        for key in dict.fromkeys(keys):
+            entry = self._get(key)
+            if entry is None:
+                misses[key[0]].append(key[1])
+            elif entry.internal_user_id is None:
+                unknown.append(key)
+            else:
+                result[key] = entry.internal_user_id
+        
+        for origin, external_ids in misses.items():
+            rows = session.exec(
+                select(
+                    UserMapping.external_user_id,
+                    UserMapping.internal_user_id,
+                    UserMapping.display_name,
+                ).where(
+                    UserMapping.origin == origin,
+                    UserMapping.external_user_id.in_(external_ids),
+                )
+            ).all()
+            for external_user_id, internal_user_id, display_name in rows:
+                key = (origin, external_user_id)
+                result[key] = internal_user_id
+                self._put(key, _CachedUser(internal_user_id, display_name))
+        
+        missing = unknown + [
+            (origin, external_user_id)
+            for origin, external_ids in misses.items()
+            for external_user_id in external_ids
+            if (origin, external_user_id) not in result
+        ]
+        if not missing:
+            return result
+        
+        try:
+            new_ids = self._allocate_many(session, len(missing))
+            mappings = [
+                UserMapping(origin=origin, external_user_id=external_user_id, internal_user_id=new_id)
+                for (origin, external_user_id), new_id in zip(missing, new_ids)
+            ]
+            session.add_all(mappings)
+            session.flush()
+        except IntegrityError:
+            # Lost a race with a concurrent writer — settle one at a time
+            session.rollback()
+            for key in missing:
+                self.invalidate(*key)
+                result[key], _ = self.resolve(session, *key)
+            return result
+        
+        for key, mapping in zip(missing, mappings):
+            result[key] = mapping.internal_user_id
+            self._put_after_commit(session, key, _CachedUser(mapping.internal_user_id))
+        return result
+    
+    def invalidate(self, origin: ConversationOrigin, external_user_id: str) -> None:
+        with self._lock:
+            self._cache.pop((origin, external_user_id), None)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+    
+    # ─── Internals ────────────────────────────────────────────────────
+    
+    def _get(self, key) -> Optional[_CachedUser]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at is not None and entry.expires_at < time.monotonic():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return entry
+    
+    def _put(self, key, entry: _CachedUser) -> None:
+        with self._lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+    
+    def _load(self, session: Session, origin: ConversationOrigin, external_user_id: str) -> _CachedUser:
+        row = session.exec(
+            select(UserMapping.internal_user_id, UserMapping.display_name).where(
+                UserMapping.origin == origin,
+                UserMapping.external_user_id == external_user_id,
+            )
+        ).first()
+        if row:
+            entry = _CachedUser(row[0], row[1])
+        else:
+            entry = _CachedUser(None, expires_at=time.monotonic() + self.negative_ttl)
+        self._put((origin, external_user_id), entry)
+        return entry
+    
+    def _allocate(self, session: Session) -> int:
+        """Next internal user ID from the sequence table (flushes, no commit)."""
+        return self._allocate_many(session, 1)[0]
+    
+    def _allocate_many(self, session: Session, count: int) -> List[int]:
+        """`count` new IDs with a single flush."""
+        seqs = [InternalUserId() for _ in range(count)]
+        session.add_all(seqs)
+        session.flush()
+        return [seq.id for seq in seqs]
+    
+    def _update_display_name(self, session: Session, key, display_name: str) -> None:
+        origin, external_user_id = key
+        mapping = session.exec(
+            select(UserMapping).where(
+                UserMapping.origin == origin,
+                UserMapping.external_user_id == external_user_id,
+            )
+        ).first()
+        if mapping:
+            mapping.display_name = display_name
+            session.add(mapping)
+            self._put_after_commit(session, key, _CachedUser(mapping.internal_user_id, display_name))
+    
+    def _put_after_commit(self, session: Session, key, entry: _CachedUser) -> None:
+        after_commit(session, lambda: self._put(key, entry))
+
+
+# Singleton instance
+user_id_resolver = UserIdResolver(
+    max_entries=settings.USER_ID_CACHE_SIZE,
+    negative_ttl=settings.USER_ID_NEGATIVE_TTL_SECONDS,
+)
 
 
 def map_external_user_to_internal(
@@ -25,39 +279,11 @@ def map_external_user_to_internal(
     - Telegram: "tg_987654321"
     - Web: "web_abc123"
     
-    Returns internal Aurora user ID (auto-incremented).
+    Returns internal Aurora user ID (from the internal_user_ids sequence).
+    Known users are answered from the resolver cache.
     """
-    
-    # Try to find existing mapping
-    stmt = select(UserMapping).where(
-        UserMapping.origin == origin,
-        UserMapping.external_user_id == external_user_id,
-    )
-    mapping = session.exec(stmt).first()
-    
-    if mapping:
-        return mapping.internal_user_id
-    
-    # Create new mapping
-    # Internal user ID is just auto-increment from the mapping table
-    # In production, this might link to a proper User table
-    
-    # Get max internal_user_id
-    max_stmt = select(UserMapping).order_by(UserMapping.internal_user_id.desc()).limit(1)
-    last_mapping = session.exec(max_stmt).first()
-    new_internal_id = (last_mapping.internal_user_id + 1) if last_mapping else 1
-    
-    new_mapping = UserMapping(
-        origin=origin,
-        external_user_id=external_user_id,
-        internal_user_id=new_internal_id,
-    )
-    
-    session.add(new_mapping)
-    session.commit()
-    session.refresh(new_mapping)
-    
-    return new_mapping.internal_user_id
+    internal_user_id, _ = user_id_resolver.resolve(session, origin, external_user_id)
+    return internal_user_id
 
 
 def update_user_stats(
@@ -79,6 +305,45 @@ def update_user_stats(
     if not mapping:
         return
     
+    _apply_user_stats(mapping, coins_spent, vip_tier, display_name)
+    session.add(mapping)  # Committed with the caller's unit of work
+
+
+def update_user_stats_many(
+    session: Session,
+    updates: List[Tuple[ConversationOrigin, str, int, Optional[str]]],
+) -> None:
+    """
+    Batch form of update_user_stats: (origin, external_user_id,
+    coins_spent, vip_tier) tuples applied in order, one IN query per origin.
+    """
+    by_origin: Dict[ConversationOrigin, set] = defaultdict(set)
+    for origin, external_user_id, _, _ in updates:
+        by_origin[origin].add(external_user_id)
+    
+    mappings: Dict[Tuple[ConversationOrigin, str], UserMapping] = {}
+    for origin, external_ids in by_origin.items():
+        for mapping in session.exec(
+            select(UserMapping).where(
+                UserMapping.origin == origin,
+                UserMapping.external_user_id.in_(external_ids),
+            )
+        ).all():
+            mappings[(origin, mapping.external_user_id)] = mapping
+    
+    for origin, external_user_id, coins_spent, vip_tier in updates:
+        mapping = mappings.get((origin, external_user_id))
+        if mapping:
+            _apply_user_stats(mapping, coins_spent, vip_tier)
+            session.add(mapping)
+
+
+def _apply_user_stats(
+    mapping: UserMapping,
+    coins_spent: int = 0,
+    vip_tier: str = None,
+    display_name: str = None,
+) -> None:
     if coins_spent > 0:
         mapping.total_coins_spent += coins_spent
     
@@ -87,9 +352,6 @@ def update_user_stats(
     
     if display_name:
         mapping.display_name = display_name
-    
-    session.add(mapping)
-    session.commit()
 
 
 def get_user_info(
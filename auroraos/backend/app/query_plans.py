@@ -0,0 +1,95 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║   AuroraOS Query Plan Audit                                      ║
+║   EXPLAIN QUERY PLAN every distinct SELECT, flag full scans      ║
+║                                                                  ║
+║   Baron Baba © SiyahKare, 2025                                   ║
+╚══════════════════════════════════════════════════════════════════╝
+"""
+
+import re
+import threading
+from typing import Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlmodel import SQLModel
+
+from .config import settings
+from .metrics import metrics
+
+
+db_full_scans = metrics.counter(
+    "aurora_db_full_scans_total",
+    "Distinct SELECTs whose SQLite plan scans a table without an index (QUERY_PLAN_CHECK)",
+    ["table"],
+)
+
+# "SCAN conversations" is a full table scan; "SCAN x USING [COVERING] INDEX ix" is not
+_FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$")
+
+
+class FullScanError(RuntimeError):
+    """A query would scan a whole table (QUERY_PLAN_CHECK=raise)."""
+
+
+class QueryPlanAudit:
+    """
+    Checks that queries hit an index, as they actually run.
+    
+    The first time a SELECT's text is seen, its EXPLAIN QUERY PLAN is
+    taken on the same connection and every full table scan is recorded
+    (tables in `allow_scan`, small by design, are ignored). "warn" logs
+    and counts it; "raise" also fails the query, so running the app or
+    a script against it with QUERY_PLAN_CHECK=raise asserts that every
+    route's queries are indexed (tests/test_query_plans.py does this
+    for the orchestrator and state routers). Plans are cached per
+    statement, so the cost is one EXPLAIN per distinct SQL string.
+    SQLite only; meant for development and CI, not production.
+    """
+    
+    def __init__(self, mode: str, allow_scan: List[str]):
+        self.mode = mode
+        self.allow_scan = set(allow_scan)
+        self._lock = threading.Lock()
+        self._plans: Dict[str, List[str]] = {}  # Statement → fully scanned tables
+    
+    def attach(self, engine: Engine) -> None:
+        @event.listens_for(engine, "before_cursor_execute")
+        def _check(conn, cursor, statement, parameters, context, executemany):
+            if executemany or not statement.lstrip()[:6].upper().startswith(("SELECT", "WITH")):
+                return
+            with self._lock:
+                scans = self._plans.get(statement)
+            if scans is None:
+                scans = self._explain(conn, statement, parameters)
+            if scans and self.mode == "raise":
+                raise FullScanError(f"Full scan of {', '.join(scans)}: {statement.strip()[:300]}")
+    
+    def _explain(self, conn, statement: str, parameters) -> List[str]:
+        plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+        scans = []
+        for row in plan:
+            match = _FULL_SCAN.match(row[-1])
+            if match and match.group(1) in SQLModel.metadata.tables and match.group(1) not in self.allow_scan:
+                scans.append(match.group(1))
+        with self._lock:
+            if statement in self._plans:
+                return self._plans[statement]
+            self._plans[statement] = scans
+        for table in scans:
+            db_full_scans.inc(table=table)
+            print(f"[QueryPlan] Full scan of {table}: {' '.join(statement.split())[:300]}")
+        return scans
+    
+    def report(self) -> Dict[str, List[str]]:
+        """Every audited statement that scans a table, with those tables."""
+        with self._lock:
+            return {statement: scans for statement, scans in self._plans.items() if scans}
+
+
+# Singleton instance
+query_plan_audit = QueryPlanAudit(
+    mode=settings.QUERY_PLAN_CHECK,
+    allow_scan=settings.QUERY_PLAN_ALLOW_SCAN,
+)
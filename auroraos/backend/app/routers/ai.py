@@ -18,21 +18,42 @@ from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session, select
 from pydantic import BaseModel
+from functools import partial
 from typing import Optional
 
 from ..deps import get_db
 from .. import models, schemas
 from ..config import settings
+from ..llm.context import (
+    FoldedTurn,
+    SUMMARY_FOLD_BATCH,
+    SUMMARY_HEADER,
+    conversation_summaries,
+    fit_newest,
+    fit_prefix,
+)
+from ..llm.gateway import llm_gateway
+from ..llm.health import provider_health
+from ..llm.ledger import usage_ledger
+from ..llm.scheduler import llm_scheduler
+from ..llm.tokens import estimate_message_tokens
+from ..metrics import metrics
 
 # ═══════════════════════════════════════════════════════════════════
 # SPRINT 005: MEMORY CONSTANTS
 # ═══════════════════════════════════════════════════════════════════
 
-MAX_CONTEXT_MESSAGES = 6  # Son kaç mesaj context'e dahil edilsin
-MAX_STYLE_EXAMPLES = 5    # Kaç "Bu çok ben" örneği prompt'a eklensin
+MAX_CONTEXT_MESSAGES = 6  # Son kaç mesaj context'e dahil edilsin (token bütçesi ayrıca kırpar)
+MAX_STYLE_EXAMPLES = 5    # Kaç "Bu çok ben" örneği prompt'a eklensin (token bütçesi ayrıca kırpar)
 
 router = APIRouter(prefix="/ai", tags=["ai"])
 
+ai_generations = metrics.counter(
+    "aurora_ai_generations_total",
+    "Aurora Engine results by engine and source (llm / mock / error_fallback)",
+    ["engine", "source"],
+)
+
 # ═══════════════════════════════════════════════════════════════════
 # AURORA SYSTEM PROMPT — Betül-AI Persona
 # ═══════════════════════════════════════════════════════════════════
@@ -92,28 +113,6 @@ class AuroraLLMResponse(BaseModel):
 # HELPER FUNCTIONS
 # ═══════════════════════════════════════════════════════════════════
 
-def get_openai_client():
-    """Get OpenAI client, returns None if no API key."""
-    api_key = settings.OPENAI_API_KEY
-    if not api_key:
-        print("[Aurora Engine] No OPENAI_API_KEY found, using mock mode")
-        return None
-    from openai import OpenAI
-    print(f"[Aurora Engine] OpenAI client initialized (key: {api_key[:20]}...)")
-    return OpenAI(api_key=api_key)
-
-
-def get_grok_client():
-    """Get Grok (xAI) client for soft-ero content, returns None if no API key."""
-    api_key = settings.XAI_API_KEY
-    if not api_key:
-        print("[Aurora Engine] No XAI_API_KEY found, Grok unavailable")
-        return None
-    from openai import OpenAI
-    print(f"[Aurora Engine] Grok client initialized (key: {api_key[:15]}...)")
-    return OpenAI(api_key=api_key, base_url="https://api.x.ai/v1")
-
-
 def build_user_prompt(body: schemas.AIGenerateRequest) -> str:
     """Build the user prompt for Aurora Engine."""
     scenario_text = body.scenario or "günlük, doğal"
@@ -168,16 +167,17 @@ def call_aurora_engine(body: schemas.AIGenerateRequest) -> list[dict]:
     Call Aurora Engine (OpenAI) to generate content variants.
     Falls back to mock if no API key is configured.
     """
-    client = get_openai_client()
-    
-    if not client:
+    if not llm_gateway.is_available("openai"):
         # No API key, use enhanced mock
+        ai_generations.inc(engine="aurora_engine", source="mock")
         return generate_mock_variants(body)
     
     user_prompt = build_user_prompt(body)
     
     try:
-        completion = client.chat.completions.create(
+        completion = llm_gateway.chat(
+            "openai",
+            caller="aurora_engine",
             model="gpt-3.5-turbo",  # Fast and cheap, good for this
             messages=[
                 {"role": "system", "content": AURORA_SYSTEM_PROMPT},
@@ -192,11 +192,13 @@ def call_aurora_engine(body: schemas.AIGenerateRequest) -> list[dict]:
         data = json.loads(raw)
         parsed = AuroraLLMResponse(**data)
         
+        ai_generations.inc(engine="aurora_engine", source="llm")
         return [v.model_dump() for v in parsed.variants]
         
     except Exception as e:
         # Log error and fallback to mock
         print(f"[Aurora Engine] LLM error, falling back to mock: {e}")
+        ai_generations.inc(engine="aurora_engine", source="error_fallback")
         return generate_mock_variants(body)
 
 
@@ -288,6 +290,9 @@ def engine_status():
             "style_learning",
         ],
         "dedicated_to": "Betül",
+        "providers": provider_health.snapshot(),  # p50/p95, error rate, circuit per model
+        "scheduler": llm_scheduler.snapshot(),    # RPM/TPM headroom, queued / shed by priority
+        "ledger": usage_ledger.snapshot(),        # ai_operations write-behind buffer
     }
 
 
@@ -341,6 +346,67 @@ def get_style_examples(db: Session, limit: int = MAX_STYLE_EXAMPLES) -> list[str
     return examples
 
 
+def build_dm_context(
+    db: Session,
+    channel: str,
+    external_user_id: str,
+) -> tuple[list[models.DMMessage], Optional[str]]:
+    """
+    Recent DM messages that fit AI_REPLY_CONTEXT_TOKEN_BUDGET, plus the
+    rolling summary of everything older.
+    
+    When messages fall out (over budget, or older than the window) the
+    summary is refreshed in the background.
+    """
+    key = f"dm:{channel}:{external_user_id}"
+    summary = conversation_summaries.get(db, key)
+    messages = get_dm_context(db, channel, external_user_id)
+    
+    budget = settings.AI_REPLY_CONTEXT_TOKEN_BUDGET
+    if summary:
+        budget -= estimate_message_tokens(f"{SUMMARY_HEADER}\n{summary}")
+    kept = fit_newest([m.text for m in messages], budget)
+    
+    if kept < len(messages) or len(messages) >= MAX_CONTEXT_MESSAGES:
+        loader = partial(_load_folded_dm_turns, channel, external_user_id)
+        conversation_summaries.schedule(key, loader, kept)
+    
+    return messages[len(messages) - kept:], summary
+
+
+def _load_folded_dm_turns(
+    channel: str,
+    external_user_id: str,
+    db: Session,
+    after_id: int,
+    keep: int,
+) -> list[FoldedTurn]:
+    """DM messages after `after_id`, minus the newest `keep`, oldest first."""
+    conditions = [
+        models.DMMessage.channel == channel,
+        models.DMMessage.external_user_id == external_user_id,
+    ]
+    if keep:
+        boundary = db.exec(
+            select(models.DMMessage.id)
+            .where(*conditions)
+            .order_by(models.DMMessage.id.desc())
+            .offset(keep - 1)
+            .limit(1)
+        ).first()
+        if boundary is None:
+            return []
+        conditions.append(models.DMMessage.id < boundary)
+    
+    rows = db.exec(
+        select(models.DMMessage)
+        .where(*conditions, models.DMMessage.id > after_id)
+        .order_by(models.DMMessage.id)
+        .limit(SUMMARY_FOLD_BATCH)
+    ).all()
+    return [(m.id, "O" if m.direction == "incoming" else "Ben", m.text) for m in rows]
+
+
 def format_dm_context(messages: list[models.DMMessage]) -> str:
     """
     Format conversation history into a readable string for the LLM.
@@ -492,9 +558,8 @@ def call_aurora_reply_engine(
     - Uses conversation history for coherent replies
     - Uses "Bu çok ben" examples for style consistency
     """
-    client = get_openai_client()
-    
-    if not client:
+    if not llm_gateway.is_available("openai"):
+        ai_generations.inc(engine="aurora_reply", source="mock")
         return generate_mock_replies(body.incoming_text)
     
     # Build context-aware prompt
@@ -505,7 +570,9 @@ def call_aurora_reply_engine(
     )
     
     try:
-        completion = client.chat.completions.create(
+        completion = llm_gateway.chat(
+            "openai",
+            caller="aurora_reply",
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": AURORA_REPLY_SYSTEM},
@@ -518,10 +585,12 @@ def call_aurora_reply_engine(
         
         raw = completion.choices[0].message.content
         data = json.loads(raw)
+        ai_generations.inc(engine="aurora_reply", source="llm")
         return data.get("variants", [])
         
     except Exception as e:
         print(f"[Aurora Reply] LLM error, falling back to mock: {e}")
+        ai_generations.inc(engine="aurora_reply", source="error_fallback")
         return generate_mock_replies(body.incoming_text)
 
 
@@ -544,18 +613,22 @@ def reply_suggestions(
     """
     ctx_text = ""
     ctx_messages = []
+    summary = None
     
     # Parse context if provided (format: "channel:external_user_id")
     if body.context and ":" in body.context:
         try:
             channel_key, external_id = body.context.split(":", 1)
-            ctx_messages = get_dm_context(db, channel_key, external_id)
+            ctx_messages, summary = build_dm_context(db, channel_key, external_id)
             ctx_text = format_dm_context(ctx_messages)
+            if summary:
+                ctx_text = f"{SUMMARY_HEADER}\n{summary}\n\n{ctx_text}"
         except Exception as e:
             print(f"[Aurora Reply] Context parse error: {e}")
     
-    # Get Betül's style examples from "Bu çok ben" decisions
+    # Get Betül's style examples from "Bu çok ben" decisions (within budget)
     style_examples = get_style_examples(db)
+    style_examples = style_examples[:fit_prefix(style_examples, settings.AI_REPLY_STYLE_TOKEN_BUDGET)]
     
     # Generate variants with context
     variants = call_aurora_reply_engine(body, ctx_text, style_examples)
@@ -565,6 +638,7 @@ def reply_suggestions(
         "incoming_text": body.incoming_text[:100] + "..." if len(body.incoming_text) > 100 else body.incoming_text,
         "context_used": len(ctx_messages) > 0,
         "context_messages": len(ctx_messages),
+        "context_summary_used": summary is not None,
         "style_examples_used": len(style_examples),
         "variants": variants,
     }
@@ -646,9 +720,8 @@ def generate_mock_sugoda_script(theme: str) -> list[dict]:
 
 def call_aurora_sugoda_engine(body: schemas.SugodaScriptRequest) -> list[dict]:
     """Call Aurora Sugoda Engine for stream scripts."""
-    client = get_openai_client()
-    
-    if not client:
+    if not llm_gateway.is_available("openai"):
+        ai_generations.inc(engine="aurora_sugoda", source="mock")
         return generate_mock_sugoda_script(body.theme)
     
     prompt = AURORA_SUGODA_PROMPT.format(
@@ -657,7 +730,9 @@ def call_aurora_sugoda_engine(body: schemas.SugodaScriptRequest) -> list[dict]:
     )
     
     try:
-        completion = client.chat.completions.create(
+        completion = llm_gateway.chat(
+            "openai",
+            caller="aurora_sugoda",
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": "AuroraOS Betül-AI Sugoda script engine"},
@@ -670,10 +745,12 @@ def call_aurora_sugoda_engine(body: schemas.SugodaScriptRequest) -> list[dict]:
         
         raw = completion.choices[0].message.content
         data = json.loads(raw)
+        ai_generations.inc(engine="aurora_sugoda", source="llm")
         return data.get("scripts", [])
         
     except Exception as e:
         print(f"[Aurora Sugoda] LLM error, falling back to mock: {e}")
+        ai_generations.inc(engine="aurora_sugoda", source="error_fallback")
         return generate_mock_sugoda_script(body.theme)
 
 
@@ -804,15 +881,16 @@ def generate_mock_day_summary(timeline: schemas.DayTimeline) -> dict:
 
 def call_aurora_day_engine(timeline: schemas.DayTimeline) -> dict:
     """Call Aurora Day Summary Engine."""
-    client = get_openai_client()
-    
-    if not client:
+    if not llm_gateway.is_available("openai"):
+        ai_generations.inc(engine="aurora_day", source="mock")
         return generate_mock_day_summary(timeline)
     
     prompt = build_day_prompt(timeline)
     
     try:
-        completion = client.chat.completions.create(
+        completion = llm_gateway.chat(
+            "openai",
+            caller="aurora_day",
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": "AuroraOS Betül-AI day summary engine"},
@@ -825,10 +903,12 @@ def call_aurora_day_engine(timeline: schemas.DayTimeline) -> dict:
         
         raw = completion.choices[0].message.content
         data = json.loads(raw)
+        ai_generations.inc(engine="aurora_day", source="llm")
         return data
         
     except Exception as e:
         print(f"[Aurora Day] LLM error, falling back to mock: {e}")
+        ai_generations.inc(engine="aurora_day", source="error_fallback")
         return generate_mock_day_summary(timeline)
 
 
@@ -1093,16 +1173,17 @@ def call_grok_soft_ero_engine(body: SoftEroRequest) -> list[dict]:
     Call Grok (xAI) for soft-ero content generation.
     Grok has more flexible content policies than OpenAI.
     """
-    client = get_grok_client()
-    
-    if not client:
+    if not llm_gateway.is_available("grok"):
         print("[Grok Engine] No API key, falling back to mock")
+        ai_generations.inc(engine="grok_soft_ero", source="mock")
         return generate_mock_soft_ero(body)
     
     user_prompt = build_soft_ero_prompt(body)
     
     try:
-        completion = client.chat.completions.create(
+        completion = llm_gateway.chat(
+            "grok",
+            caller="grok_soft_ero",
             model="grok-3-latest",  # or grok-3-mini for faster/cheaper
             messages=[
                 {"role": "system", "content": GROK_SOFT_ERO_PROMPT},
@@ -1123,13 +1204,16 @@ def call_grok_soft_ero_engine(body: SoftEroRequest) -> list[dict]:
                 raw = raw.split("```")[1].split("```")[0]
             
             data = json.loads(raw.strip())
+            ai_generations.inc(engine="grok_soft_ero", source="llm")
             return data.get("variants", [])
         except json.JSONDecodeError:
             print(f"[Grok Engine] JSON parse error, raw: {raw[:200]}")
+            ai_generations.inc(engine="grok_soft_ero", source="error_fallback")
             return generate_mock_soft_ero(body)
         
     except Exception as e:
         print(f"[Grok Engine] Error: {e}")
+        ai_generations.inc(engine="grok_soft_ero", source="error_fallback")
         return generate_mock_soft_ero(body)
 
 
@@ -1151,7 +1235,7 @@ def generate_soft_ero(body: SoftEroRequest):
     return SoftEroResponse(
         scenario=body.scenario,
         intensity=body.intensity,
-        provider="grok" if get_grok_client() else "mock",
+        provider="grok" if llm_gateway.is_available("grok") else "mock",
         variants=variants,
     )
 
@@ -1290,16 +1374,17 @@ def call_grok_hard_ero_engine(body: HardEroRequest) -> list[dict]:
     Call Grok (xAI) for hard-ero explicit content generation.
     Grok allows adult content that OpenAI blocks.
     """
-    client = get_grok_client()
-    
-    if not client:
+    if not llm_gateway.is_available("grok"):
         print("[Grok Hard-Ero] No API key, falling back to mock")
+        ai_generations.inc(engine="grok_hard_ero", source="mock")
         return generate_mock_hard_ero(body)
     
     user_prompt = build_hard_ero_prompt(body)
     
     try:
-        completion = client.chat.completions.create(
+        completion = llm_gateway.chat(
+            "grok",
+            caller="grok_hard_ero",
             model="grok-3-latest",
             messages=[
                 {"role": "system", "content": GROK_HARD_ERO_PROMPT},
@@ -1319,13 +1404,16 @@ def call_grok_hard_ero_engine(body: HardEroRequest) -> list[dict]:
                 raw = raw.split("```")[1].split("```")[0]
             
             data = json.loads(raw.strip())
+            ai_generations.inc(engine="grok_hard_ero", source="llm")
             return data.get("variants", [])
         except json.JSONDecodeError:
             print(f"[Grok Hard-Ero] JSON parse error, raw: {raw[:200]}")
+            ai_generations.inc(engine="grok_hard_ero", source="error_fallback")
             return generate_mock_hard_ero(body)
         
     except Exception as e:
         print(f"[Grok Hard-Ero] Error: {e}")
+        ai_generations.inc(engine="grok_hard_ero", source="error_fallback")
         return generate_mock_hard_ero(body)
 
 
@@ -1348,7 +1436,7 @@ def generate_hard_ero(body: HardEroRequest):
     return HardEroResponse(
         scenario=body.scenario,
         intensity=body.intensity,
-        provider="grok" if get_grok_client() else "mock",
+        provider="grok" if llm_gateway.is_available("grok") else "mock",
         age_verified=True,  # Frontend should verify
         variants=variants,
     )
@@ -1,54 +1,59 @@
 # backend/app/routers/content.py
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from sqlalchemy.orm import selectinload
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List
 
-from ..deps import get_db
+from ..deps import get_async_db
 from .. import models, schemas
 
 router = APIRouter(prefix="/content", tags=["content"])
 
 
 @router.get("/pending", response_model=List[schemas.ContentItemWithVariants])
-def get_pending_content(db: Session = Depends(get_db)):
+async def get_pending_content(db: AsyncSession = Depends(get_async_db)):
     stmt = (
         select(models.ContentItem)
+        .options(selectinload(models.ContentItem.variants))  # No lazy loads on AsyncSession
         .where(models.ContentItem.status == "pending_decision")
         .order_by(models.ContentItem.created_at.desc())
     )
-    items = db.exec(stmt).all()
+    items = (await db.exec(stmt)).all()
     return items
 
 
 @router.get("/approved", response_model=List[schemas.ContentItemWithVariants])
-def get_approved_content(db: Session = Depends(get_db), limit: int = 20):
+async def get_approved_content(db: AsyncSession = Depends(get_async_db), limit: int = 20):
     """
     Get approved content items (Content Wall).
     These are the contents Betül approved for use.
     """
     stmt = (
         select(models.ContentItem)
+        .options(selectinload(models.ContentItem.variants))
         .where(models.ContentItem.status == "approved")
         .order_by(models.ContentItem.created_at.desc())
         .limit(limit)
     )
-    items = db.exec(stmt).all()
+    items = (await db.exec(stmt)).all()
     return items
 
 
 @router.get("/wall")
-def get_content_wall(db: Session = Depends(get_db), limit: int = 20):
+async def get_content_wall(db: AsyncSession = Depends(get_async_db), limit: int = 20):
     """
     Get content wall with selected variant text for each approved item.
     Returns ready-to-use content for Instagram/Sugoda.
     """
     stmt = (
         select(models.ContentItem)
+        .options(selectinload(models.ContentItem.variants))
         .where(models.ContentItem.status == "approved")
         .order_by(models.ContentItem.created_at.desc())
         .limit(limit)
     )
-    items = db.exec(stmt).all()
+    items = (await db.exec(stmt)).all()
     
     wall = []
     for item in items:
@@ -60,7 +65,7 @@ def get_content_wall(db: Session = Depends(get_db), limit: int = 20):
             .where(models.Decision.decision == "approve")
             .order_by(models.Decision.created_at.desc())
         )
-        decision = db.exec(decision_stmt).first()
+        decision = (await db.exec(decision_stmt)).first()
         
         selected_text = None
         selected_vibe = None
@@ -87,12 +92,12 @@ def get_content_wall(db: Session = Depends(get_db), limit: int = 20):
 
 
 @router.post("/{content_id}/decision")
-def decide_content(
+async def decide_content(
     content_id: int,
     payload: schemas.DecisionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    content = db.get(models.ContentItem, content_id)
+    content = await db.get(models.ContentItem, content_id)
     if not content:
         raise HTTPException(status_code=404, detail="Content not found")
 
@@ -120,8 +125,8 @@ def decide_content(
         content.status = "scheduled"
 
     db.add(content)
-    db.commit()
-    db.refresh(content)
+    await db.commit()
+    await db.refresh(content)
 
     # burda ileride aurora-engine'e feedback event'i atarız (queue vs.)
 
@@ -9,11 +9,12 @@
 """
 
 from fastapi import APIRouter, Depends
-from sqlmodel import Session, select
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 from pydantic import BaseModel
 from typing import Optional
 
-from ..deps import get_db
+from ..deps import get_async_db
 from .. import models
 
 
@@ -45,7 +46,7 @@ class DMContextRequest(BaseModel):
 # ═══════════════════════════════════════════════════════════════════
 
 @router.post("/log")
-def log_dm(payload: DMLogPayload, db: Session = Depends(get_db)):
+async def log_dm(payload: DMLogPayload, db: AsyncSession = Depends(get_async_db)):
     """
     Log a DM message for context-aware replies.
     
@@ -61,8 +62,8 @@ def log_dm(payload: DMLogPayload, db: Session = Depends(get_db)):
         vibe_mode=payload.vibe_mode,
     )
     db.add(msg)
-    db.commit()
-    db.refresh(msg)
+    await db.commit()
+    await db.refresh(msg)
     
     return {
         "ok": True,
@@ -72,7 +73,7 @@ def log_dm(payload: DMLogPayload, db: Session = Depends(get_db)):
 
 
 @router.post("/context")
-def get_context(body: DMContextRequest, db: Session = Depends(get_db)):
+async def get_context(body: DMContextRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Get conversation context for a specific user.
     
@@ -89,7 +90,7 @@ def get_context(body: DMContextRequest, db: Session = Depends(get_db)):
         .limit(body.limit)
     )
     
-    messages = list(reversed(db.exec(stmt).all()))
+    messages = list(reversed((await db.exec(stmt)).all()))
     
     return {
         "channel": body.channel,
@@ -108,21 +109,23 @@ def get_context(body: DMContextRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/stats")
-def dm_stats(db: Session = Depends(get_db)):
+async def dm_stats(db: AsyncSession = Depends(get_async_db)):
     """
     Get DM memory statistics.
     """
-    total = db.exec(select(models.DMMessage)).all()
-    incoming = [m for m in total if m.direction == "incoming"]
-    outgoing = [m for m in total if m.direction == "outgoing"]
+    by_direction = dict((await db.exec(
+        select(models.DMMessage.direction, func.count())
+        .group_by(models.DMMessage.direction)
+    )).all())
     
     # Unique conversations
-    unique_users = set((m.channel, m.external_user_id) for m in total)
+    threads = select(models.DMMessage.channel, models.DMMessage.external_user_id).distinct().subquery()
+    unique_users = (await db.exec(select(func.count()).select_from(threads))).one()
     
     return {
-        "total_messages": len(total),
-        "incoming": len(incoming),
-        "outgoing": len(outgoing),
-        "unique_conversations": len(unique_users),
+        "total_messages": sum(by_direction.values()),
+        "incoming": by_direction.get("incoming", 0),
+        "outgoing": by_direction.get("outgoing", 0),
+        "unique_conversations": unique_users,
     }
 
@@ -0,0 +1,298 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║   AuroraOS State Module — Dashboard Stats                        ║
+║   Aggregated in a few single-pass queries, materialized in a row ║
+║                                                                  ║
+║   Baron Baba © SiyahKare, 2025                                   ║
+╚══════════════════════════════════════════════════════════════════╝
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, case, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..config import settings
+from .models import (
+    Citizen,
+    CitizenStatus,
+    SnapshotPeriod,
+    TreasuryTransaction,
+    TreasurySnapshot,
+    AIOperation,
+    AIOperationStatus,
+    ContentFlag,
+    ThreatLog,
+    DashboardStatsRow,
+)
+from .schemas import (
+    DashboardStats,
+    CitizenStats,
+    TreasuryStats,
+    ThreatStatus,
+    AIOpsStats,
+    AICallerCost,
+)
+
+
+STATS_ROW_ID = 1
+
+
+def format_number(n: float) -> str:
+    """Format number with commas."""
+    return f"{n:,.0f}"
+
+
+def format_percentage(n: float) -> str:
+    """Format as percentage with sign."""
+    return f"{'+' if n >= 0 else ''}{n:.1f}%"
+
+
+def _count_if(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# Aggregation
+# ═══════════════════════════════════════════════════════════════════
+
+async def compute_dashboard_stats(db: AsyncSession) -> DashboardStats:
+    """The full dashboard, straight from the source tables."""
+    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    
+    # Citizens: one pass, per tier, status counts as conditional sums
+    tiers = (await db.exec(
+        select(
+            Citizen.tier,
+            func.count(Citizen.id),
+            _count_if(Citizen.status == CitizenStatus.VERIFIED),
+            _count_if(Citizen.status == CitizenStatus.PENDING),
+            _count_if(Citizen.is_online == True),
+            _count_if(Citizen.status == CitizenStatus.BANNED),
+            _count_if(Citizen.joined_at >= today_start),
+        )
+        .group_by(Citizen.tier)
+    )).all()
+    totals = [sum(row[i] for row in tiers) for i in range(1, 7)]
+    tier_counts = {tier.value: count for tier, count, *_ in tiers}
+    
+    citizen_stats = CitizenStats(
+        total=totals[0],
+        verified=totals[1],
+        pending=totals[2],
+        online=totals[3],
+        banned=totals[4],
+        new_today=totals[5],
+        basic_count=tier_counts.get("BASIC", 0),
+        silver_count=tier_counts.get("SILVER", 0),
+        gold_count=tier_counts.get("GOLD", 0),
+        platinum_count=tier_counts.get("PLATINUM", 0),
+        founder_count=tier_counts.get("FOUNDER", 0),
+    )
+    
+    # Treasury: the latest daily rollup (state/rollup.py)
+    snapshot = (await db.exec(
+        select(TreasurySnapshot)
+        .where(TreasurySnapshot.period == SnapshotPeriod.DAY)
+        .order_by(TreasurySnapshot.date.desc())
+        .limit(1)
+    )).first()
+    
+    if snapshot:
+        reserve_raw = snapshot.total_reserve
+        gdp_raw = snapshot.gdp_growth
+        inflation_raw = snapshot.inflation_rate
+        # No row for today yet = nothing rolled up today
+        today = snapshot.date >= today_start
+        transactions_24h = snapshot.transaction_count if today else 0
+        volume_24h = snapshot.gdp_24h if today else 0.0
+    else:
+        # Rollup hasn't run (or is disabled): today's count + volume in one query
+        reserve_raw = 4500000.0  # Default
+        gdp_raw = 12.0
+        inflation_raw = -2.4
+        transactions_24h, volume_24h = (await db.exec(
+            select(
+                func.count(TreasuryTransaction.id),
+                func.coalesce(func.sum(TreasuryTransaction.amount), 0.0),
+            )
+            .where(TreasuryTransaction.created_at >= today_start)
+        )).one()
+    
+    treasury_stats = TreasuryStats(
+        reserve=f"{format_number(reserve_raw)} NCR",
+        reserve_raw=reserve_raw,
+        gdp_24h=format_percentage(gdp_raw),
+        gdp_raw=gdp_raw,
+        inflation=format_percentage(inflation_raw),
+        inflation_raw=inflation_raw,
+        liquidity="High" if reserve_raw > 1000000 else "Medium" if reserve_raw > 100000 else "Low",
+        transactions_24h=transactions_24h,
+        volume_24h=volume_24h,
+        avg_transaction=volume_24h / transactions_24h if transactions_24h > 0 else 0,
+    )
+    
+    # Threats: active + recently mitigated from the status index, newest from the created_at index
+    active_threats, mitigated_24h = (await db.exec(
+        select(
+            _count_if(ThreatLog.status == "ACTIVE"),
+            _count_if(and_(
+                ThreatLog.status == "MITIGATED",
+                ThreatLog.mitigated_at >= today_start - timedelta(days=1),
+            )),
+        )
+        .where(ThreatLog.status.in_(["ACTIVE", "MITIGATED"]))
+    )).one()
+    last_incident = (await db.exec(select(func.max(ThreatLog.created_at)))).one()
+    
+    threat_status = ThreatStatus(
+        level="LOW" if active_threats == 0 else "MEDIUM" if active_threats < 3 else "HIGH",
+        active_threats=active_threats,
+        mitigated_24h=mitigated_24h,
+        last_incident=last_incident,
+        details=f"{active_threats} Cyber-Attacks detected" if active_threats > 0 else "0 Cyber-Attacks detected",
+    )
+    
+    # AI operations 24h (LLM calls are ledgered by the gateway, see llm/ledger.py)
+    ai_ops_24h, ai_failed, ai_tokens, ai_cost, ai_avg_ms = (await db.exec(
+        select(
+            func.count(AIOperation.id),
+            _count_if(AIOperation.status == AIOperationStatus.FAILED),
+            func.coalesce(func.sum(AIOperation.tokens_used), 0),
+            func.coalesce(func.sum(AIOperation.cost), 0.0),
+            func.avg(AIOperation.duration_ms),
+        )
+        .where(AIOperation.created_at >= today_start)
+    )).one()
+    
+    by_caller = (await db.exec(
+        select(
+            AIOperation.caller,
+            func.count(AIOperation.id),
+            func.coalesce(func.sum(AIOperation.tokens_used), 0),
+            func.coalesce(func.sum(AIOperation.cost), 0.0),
+        )
+        .where(AIOperation.created_at >= today_start, AIOperation.caller.is_not(None))
+        .group_by(AIOperation.caller)
+        .order_by(func.sum(AIOperation.cost).desc())
+    )).all()
+    
+    ai_ops = AIOpsStats(
+        operations=ai_ops_24h,
+        failed=ai_failed,
+        tokens=ai_tokens,
+        cost=round(ai_cost, 6),
+        cost_formatted=f"${ai_cost:,.2f}",
+        avg_duration_ms=round(ai_avg_ms) if ai_avg_ms is not None else None,
+        by_caller=[
+            AICallerCost(caller=caller, operations=ops, tokens=tokens, cost=round(cost, 6))
+            for caller, ops, tokens, cost in by_caller
+        ],
+    )
+    
+    # Flagged content
+    flagged = (await db.exec(
+        select(func.count(ContentFlag.id))
+        .where(ContentFlag.status == "PENDING")
+    )).one() or 0
+    
+    return DashboardStats(
+        citizens=citizen_stats,
+        treasury=treasury_stats,
+        threat=threat_status,
+        ai_operations_24h=ai_ops_24h,
+        ai_ops=ai_ops,
+        flagged_content=flagged,
+    )
+
+
+# ═══════════════════════════════════════════════════════════════════
+# Materialized row
+# ═══════════════════════════════════════════════════════════════════
+
+async def invalidate_dashboard_stats(db: AsyncSession) -> None:
+    """
+    Mark the row stale in the caller's transaction, so the next poll in
+    any process recomputes it. Called by the State write routes whose
+    effect should show right away (citizen status / tier, flags); every
+    other source reaches the dashboard within DASHBOARD_STATS_TTL_SECONDS.
+    """
+    await db.exec(
+        update(DashboardStatsRow)
+        .where(DashboardStatsRow.id == STATS_ROW_ID)
+        .values(version=DashboardStatsRow.version + 1)
+    )
+
+
+class DashboardStatsCache:
+    """
+    Serves /state/dashboard from the dashboard_stats row.
+    
+    A poll is one primary-key read while the row is current. Otherwise
+    one request per process recomputes it (others wait for the result)
+    and stores it against the version it read first, so a write that
+    lands mid-refresh leaves the row stale rather than being lost.
+    
+    This is invalidate-and-recompute, not incremental maintenance: a
+    refresh reruns compute_dashboard_stats() over the source tables
+    (a handful of indexed aggregates). Per-write counter updates would
+    drift on status / tier changes and day rollover, and would put every
+    writer on this one row. Only invalidate_dashboard_stats() writes to
+    it, from low-volume admin routes; treasury transactions, rollups,
+    AI operations and threats are picked up by the TTL.
+    """
+    
+    def __init__(self, ttl_seconds: float):
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self._refresh_lock = asyncio.Lock()
+        self.refreshes = 0
+    
+    def _current(self, row: DashboardStatsRow) -> bool:
+        if row.payload is None or row.computed_version != row.version or row.refreshed_at is None:
+            return False
+        now = datetime.utcnow()
+        # Today's counters restart at midnight
+        return now - row.refreshed_at < self.ttl and row.refreshed_at.date() == now.date()
+    
+    async def _load(self, db: AsyncSession) -> DashboardStatsRow:
+        row = await db.get(DashboardStatsRow, STATS_ROW_ID, populate_existing=True)
+        if row is None:  # Seeded by migration 7; recreate if it went missing
+            db.add(DashboardStatsRow(id=STATS_ROW_ID))
+            try:
+                await db.commit()
+            except IntegrityError:
+                await db.rollback()  # Another process created it first
+            row = await db.get(DashboardStatsRow, STATS_ROW_ID, populate_existing=True)
+        return row
+    
+    async def get(self, db: AsyncSession) -> DashboardStats:
+        row = await self._load(db)
+        if self._current(row):
+            return DashboardStats.model_validate_json(row.payload)
+        
+        async with self._refresh_lock:
+            row = await self._load(db)
+            if self._current(row):
+                return DashboardStats.model_validate_json(row.payload)
+            
+            version = row.version
+            stats = await compute_dashboard_stats(db)
+            await db.exec(
+                update(DashboardStatsRow)
+                .where(DashboardStatsRow.id == STATS_ROW_ID)
+                .values(
+                    payload=stats.model_dump_json(),
+                    computed_version=version,
+                    refreshed_at=datetime.utcnow(),
+                )
+            )
+            await db.commit()
+            self.refreshes += 1
+            return stats
+
+
+# Singleton instance
+dashboard_stats = DashboardStatsCache(ttl_seconds=settings.DASHBOARD_STATS_TTL_SECONDS)
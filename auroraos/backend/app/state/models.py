@@ -11,6 +11,7 @@ from enum import Enum
 from datetime import datetime
 from typing import Optional, List
 
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 
 
@@ -63,6 +64,12 @@ class TransactionType(str, Enum):
     FEE = "FEE"
 
 
+class SnapshotPeriod(str, Enum):
+    """Treasury snapshot bucket."""
+    HOUR = "HOUR"
+    DAY = "DAY"
+
+
 class FlagType(str, Enum):
     """Content flag type."""
     SPAM = "SPAM"
@@ -83,6 +90,13 @@ class Citizen(SQLModel, table=True):
     Represents a user/member in the system.
     """
     __tablename__ = "citizens"
+    __table_args__ = (
+        # Dashboard counts / filtered list, newest first
+        Index("ix_citizens_status_joined", "status", "joined_at"),
+        Index("ix_citizens_joined", "joined_at"),
+        Index("ix_citizens_tier", "tier"),
+        Index("ix_citizens_online", "is_online"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     citizen_id: str = Field(unique=True, index=True)  # "CZ-12345"
@@ -126,6 +140,11 @@ class Citizen(SQLModel, table=True):
 class TreasuryTransaction(SQLModel, table=True):
     """A financial transaction in the treasury."""
     __tablename__ = "treasury_transactions"
+    __table_args__ = (
+        # Today's totals / history, newest first (all or one citizen)
+        Index("ix_treasury_transactions_created", "created_at"),
+        Index("ix_treasury_transactions_citizen_created", "citizen_id", "created_at"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     transaction_id: str = Field(unique=True, index=True)  # "TX-20231129-001"
@@ -156,21 +175,29 @@ class TreasuryTransaction(SQLModel, table=True):
 
 
 class TreasurySnapshot(SQLModel, table=True):
-    """Daily treasury snapshot for historical data."""
+    """
+    Hourly / daily treasury rollup for historical data.
+    Maintained by the treasury rollup job (state/rollup.py).
+    """
     __tablename__ = "treasury_snapshots"
+    __table_args__ = (
+        Index("ix_treasury_snapshots_period_date", "period", "date"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
-    date: datetime = Field(index=True)
+    period: Optional[SnapshotPeriod] = Field(default=SnapshotPeriod.DAY)
+    date: datetime = Field(index=True)  # Bucket start
     
     # Reserves
-    total_reserve: float
+    total_reserve: float  # At the end of the bucket
     liquid_reserve: float
     locked_reserve: float
+    reserve_delta: Optional[float] = Field(default=0.0)  # Net reserve change within the bucket
     
     # Metrics
-    gdp_24h: float  # Total transaction volume
-    gdp_growth: float  # Percentage change
-    inflation_rate: float
+    gdp_24h: float  # Total transaction volume of the bucket
+    gdp_growth: float  # Percentage change vs the previous bucket
+    inflation_rate: float  # Net reserve outflow to citizens, % of the opening reserve
     
     # Activity
     transaction_count: int
@@ -212,10 +239,19 @@ class AIOperation(SQLModel, table=True):
     # AI details
     model_used: Optional[str] = None
     tokens_used: Optional[int] = None
-    cost: Optional[float] = None
+    cost: Optional[float] = None  # USD, from LLM_PRICES
+    
+    # LLM usage ledger (filled by the gateway, see llm/ledger.py);
+    # databases older than these columns get them from migration 5
+    provider: Optional[str] = None  # "openai", "grok"
+    caller: Optional[str] = Field(default=None, index=True)  # "orchestrator_agent", "aurora_reply", ...
+    conversation_id: Optional[int] = Field(default=None, index=True)  # Orchestrator conversation
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    duration_ms: Optional[int] = None
     
     # Metadata
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     created_by: Optional[str] = None  # System or operator ID
 
 
@@ -226,6 +262,9 @@ class AIOperation(SQLModel, table=True):
 class ContentFlag(SQLModel, table=True):
     """Flagged content for moderation."""
     __tablename__ = "content_flags"
+    __table_args__ = (
+        Index("ix_content_flags_status_created", "status", "created_at"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     flag_id: str = Field(unique=True, index=True)  # "FL-20231129-001"
@@ -263,6 +302,10 @@ class ContentFlag(SQLModel, table=True):
 class ThreatLog(SQLModel, table=True):
     """Security threat logs."""
     __tablename__ = "threat_logs"
+    __table_args__ = (
+        Index("ix_threat_logs_status_created", "status", "created_at"),
+        Index("ix_threat_logs_created", "created_at"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     
@@ -281,3 +324,33 @@ class ThreatLog(SQLModel, table=True):
     
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+
+# ═══════════════════════════════════════════════════════════════════
+# DASHBOARD STATS — Materialized /state/dashboard response
+# ═══════════════════════════════════════════════════════════════════
+
+class DashboardStatsRow(SQLModel, table=True):
+    """
+    The dashboard, computed once and read by every poll (single row, id=1).
+    
+    `version` is bumped by the State routes that change citizen status /
+    tier or flags, in the same transaction (see state/dashboard.py); the
+    payload is current while `computed_version` matches it and it is
+    younger than DASHBOARD_STATS_TTL_SECONDS.
+    """
+    __tablename__ = "dashboard_stats"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    version: int = Field(default=0)
+    computed_version: int = Field(default=-1)
+    payload: Optional[str] = None  # DashboardStats JSON
+    refreshed_at: Optional[datetime] = None
+
+
+class TreasuryRollupState(SQLModel, table=True):
+    """Progress of the treasury rollup job (single row, id=1)."""
+    __tablename__ = "treasury_rollup_state"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    closed_through: Optional[datetime] = None  # Snapshots before this are final; None → history not folded yet
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,316 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║   AuroraOS State Module — Treasury Rollup                        ║
+║   Transactions → hourly + daily TreasurySnapshot rows            ║
+║                                                                  ║
+║   Baron Baba © SiyahKare, 2025                                   ║
+╚══════════════════════════════════════════════════════════════════╝
+"""
+
+import asyncio
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import distinct, literal_column, update
+from sqlmodel import Session, func, select
+
+from ..config import settings
+from ..db import IS_SQLITE, engine
+from ..metrics import metrics
+from .models import (
+    Citizen,
+    SnapshotPeriod,
+    TransactionType,
+    TreasuryRollupState,
+    TreasurySnapshot,
+    TreasuryTransaction,
+)
+
+
+treasury_rollup_rows = metrics.counter(
+    "aurora_treasury_rollup_rows_total",
+    "Source rows aggregated into treasury snapshots (open buckets are re-read every run)",
+    ["source"],  # transactions | citizens
+)
+
+STATE_ROW_ID = 1
+
+PERIODS = {
+    SnapshotPeriod.HOUR: timedelta(hours=1),
+    SnapshotPeriod.DAY: timedelta(days=1),
+}
+
+# Effect of a transaction on the treasury reserve
+RESERVE_SIGN = {
+    TransactionType.DEPOSIT: 1,       # Credits bought in
+    TransactionType.WITHDRAWAL: -1,   # Credits cashed out
+    TransactionType.TRANSFER: 0,      # Between accounts
+    TransactionType.REWARD: -1,       # Paid out to a citizen
+    TransactionType.PENALTY: 1,
+    TransactionType.FEE: 1,
+}
+
+
+def bucket_start(period: SnapshotPeriod, at: datetime) -> datetime:
+    hour = at.replace(minute=0, second=0, microsecond=0)
+    return hour.replace(hour=0) if period == SnapshotPeriod.DAY else hour
+
+
+def growth(volume: float, previous_volume: Optional[float]) -> float:
+    """Percentage change vs the previous bucket (0 when it had no volume)."""
+    if not previous_volume:
+        return 0.0
+    return round((volume - previous_volume) / previous_volume * 100, 2)
+
+
+def _truncate(column, period: SnapshotPeriod):
+    """SQL for the bucket start of `column` (literal arguments, so GROUP BY matches the SELECT)."""
+    if IS_SQLITE:
+        fmt = "%Y-%m-%d %H:00:00" if period == SnapshotPeriod.HOUR else "%Y-%m-%d 00:00:00"
+        return func.strftime(literal_column(f"'{fmt}'"), column)
+    return func.date_trunc(literal_column(f"'{period.value.lower()}'"), column)
+
+
+def _as_datetime(value) -> datetime:
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+@dataclass
+class _Bucket:
+    """One snapshot's figures, aggregated from the source tables."""
+    volume: float = 0.0
+    count: int = 0
+    reserve_delta: float = 0.0
+    active_citizens: int = 0
+    new_citizens: int = 0
+
+
+class TreasuryRollup:
+    """
+    Keeps hourly and daily TreasurySnapshot rows up to date.
+    
+    Buckets stay open until TREASURY_ROLLUP_SETTLE_SECONDS after their
+    day ends. Each run recomputes every open bucket from the source
+    tables (GROUP BY over the created_at / joined_at index ranges) and
+    overwrites its snapshot, so a transaction that completes later, or
+    becomes visible late (commit order isn't id order on Postgres), is
+    still counted as long as it settles within that window. Buckets
+    before treasury_rollup_state.closed_through are final and never
+    read again; a new database (or one upgraded from the id watermarks)
+    folds its history once, TREASURY_ROLLUP_BACKFILL_DAYS per run.
+    
+    Closing reserves chain from the last closed bucket; if a re-fold
+    changes the closing reserve of its range, the buckets after it are
+    shifted with one range UPDATE. A run is one transaction, and the
+    SQLite write lock (row lock elsewhere) keeps runs from several
+    processes apart.
+    """
+    
+    def __init__(
+        self,
+        enabled: bool,
+        interval: float,
+        settle_seconds: float,
+        backfill_days: int,
+        opening_reserve: float,
+    ):
+        self.enabled = enabled
+        self.interval = interval
+        self.settle = timedelta(seconds=settle_seconds)
+        self.backfill = timedelta(days=backfill_days)
+        self.opening_reserve = opening_reserve
+        self._task: Optional[asyncio.Task] = None
+    
+    # ─── Scheduler ───
+    
+    async def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._loop(), name="treasury-rollup")
+        print(f"[TreasuryRollup] Started (every {self.interval:g}s)")
+    
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+    
+    async def _loop(self) -> None:
+        while True:
+            try:
+                caught_up = await asyncio.to_thread(self.run_once)
+            except Exception as e:
+                print(f"[TreasuryRollup] Run failed: {e}")
+                caught_up = True
+            if caught_up:  # Otherwise keep backfilling right away
+                await asyncio.sleep(self.interval)
+    
+    # ─── One run ───
+    
+    def run_once(self) -> bool:
+        """Re-fold the open buckets (or the next stretch of history); True once caught up."""
+        now = datetime.utcnow()
+        open_from = bucket_start(SnapshotPeriod.DAY, now - self.settle)
+        
+        with Session(engine) as session:
+            if IS_SQLITE:
+                session.connection().exec_driver_sql("BEGIN IMMEDIATE")  # One run at a time, across processes
+            state = session.exec(
+                select(TreasuryRollupState)
+                .where(TreasuryRollupState.id == STATE_ROW_ID)
+                .with_for_update()
+            ).first()
+            if state is None:  # Seeded by migration 8
+                state = TreasuryRollupState(id=STATE_ROW_ID)
+            
+            start = min(state.closed_through or self._first_day(session) or open_from, open_from)
+            end = min(start + self.backfill, now)
+            
+            transactions = citizens = 0
+            for period in PERIODS:
+                buckets = self._fold(session, period, start, end)
+                if period == SnapshotPeriod.HOUR:
+                    transactions = sum(b.count for b in buckets.values())
+                    citizens = sum(b.new_citizens for b in buckets.values())
+            
+            state.closed_through = min(end, open_from)  # Buckets before this are final
+            state.updated_at = now
+            session.add(state)
+            session.commit()
+        
+        treasury_rollup_rows.inc(transactions, source="transactions")
+        treasury_rollup_rows.inc(citizens, source="citizens")
+        caught_up = end == now
+        if not caught_up:
+            print(f"[TreasuryRollup] Backfilled {start:%Y-%m-%d} → {end:%Y-%m-%d}")
+        return caught_up
+    
+    @staticmethod
+    def _first_day(session: Session) -> Optional[datetime]:
+        """Start of the day of the oldest transaction or citizen, if any."""
+        firsts = [
+            session.exec(select(func.min(TreasuryTransaction.created_at))).one(),
+            session.exec(select(func.min(Citizen.joined_at))).one(),
+        ]
+        firsts = [_as_datetime(at) for at in firsts if at is not None]
+        return bucket_start(SnapshotPeriod.DAY, min(firsts)) if firsts else None
+    
+    def _aggregate(
+        self,
+        session: Session,
+        period: SnapshotPeriod,
+        start: datetime,
+        end: datetime,
+    ) -> Dict[datetime, _Bucket]:
+        """Figures of every bucket in [start, end) that had any activity."""
+        buckets: Dict[datetime, _Bucket] = defaultdict(_Bucket)
+        
+        bucket = _truncate(TreasuryTransaction.created_at, period)
+        completed = (
+            TreasuryTransaction.created_at >= start,
+            TreasuryTransaction.created_at < end,
+            TreasuryTransaction.status == "COMPLETED",
+        )
+        for at, type_, count, volume in session.exec(
+            select(bucket, TreasuryTransaction.type, func.count(TreasuryTransaction.id), func.sum(TreasuryTransaction.amount))
+            .where(*completed)
+            .group_by(bucket, TreasuryTransaction.type)
+        ).all():
+            b = buckets[_as_datetime(at)]
+            b.count += count
+            b.volume += volume
+            b.reserve_delta += RESERVE_SIGN.get(type_, 0) * volume
+        for at, active in session.exec(
+            select(bucket, func.count(distinct(TreasuryTransaction.citizen_id)))
+            .where(*completed)
+            .group_by(bucket)
+        ).all():
+            buckets[_as_datetime(at)].active_citizens = active
+        
+        joined = _truncate(Citizen.joined_at, period)
+        for at, new in session.exec(
+            select(joined, func.count(Citizen.id))
+            .where(Citizen.joined_at >= start, Citizen.joined_at < end)
+            .group_by(joined)
+        ).all():
+            buckets[_as_datetime(at)].new_citizens = new
+        
+        return buckets
+    
+    def _fold(
+        self,
+        session: Session,
+        period: SnapshotPeriod,
+        start: datetime,
+        end: datetime,
+    ) -> Dict[datetime, _Bucket]:
+        """Overwrite the snapshots of [start, end) with fresh figures."""
+        step = PERIODS[period]
+        fresh = self._aggregate(session, period, start, end)
+        existing = {
+            snapshot.date: snapshot
+            for snapshot in session.exec(
+                select(TreasurySnapshot)
+                .where(TreasurySnapshot.period == period, TreasurySnapshot.date >= start, TreasurySnapshot.date < end)
+            ).all()
+        }
+        previous = session.exec(
+            select(TreasurySnapshot)
+            .where(TreasurySnapshot.period == period, TreasurySnapshot.date < start)
+            .order_by(TreasurySnapshot.date.desc())
+            .limit(1)
+        ).first()
+        
+        reserve = previous.total_reserve if previous else self.opening_reserve
+        old_close = existing[max(existing)].total_reserve if existing else reserve
+        volumes = {previous.date: previous.gdp_24h} if previous else {}
+        
+        for date in sorted(set(fresh) | set(existing)):
+            b = fresh.get(date, _Bucket())  # An existing bucket may have lost all its activity
+            opening = reserve
+            reserve += b.reserve_delta
+            snapshot = existing.get(date) or TreasurySnapshot(period=period, date=date, locked_reserve=0.0)
+            snapshot.gdp_24h = b.volume
+            snapshot.transaction_count = b.count
+            snapshot.active_citizens = b.active_citizens
+            snapshot.new_citizens = b.new_citizens
+            snapshot.reserve_delta = b.reserve_delta
+            snapshot.total_reserve = reserve
+            snapshot.liquid_reserve = reserve - snapshot.locked_reserve
+            snapshot.inflation_rate = round(-b.reserve_delta / opening * 100, 4) if opening else 0.0
+            snapshot.gdp_growth = growth(b.volume, volumes.get(date - step))
+            volumes[date] = b.volume
+            session.add(snapshot)
+        
+        if reserve != old_close:
+            # Buckets after the range close with the new reserve too (normally none)
+            session.exec(
+                update(TreasurySnapshot)
+                .where(TreasurySnapshot.period == period, TreasurySnapshot.date >= end)
+                .values(
+                    total_reserve=TreasurySnapshot.total_reserve + (reserve - old_close),
+                    liquid_reserve=TreasurySnapshot.liquid_reserve + (reserve - old_close),
+                )
+            )
+        
+        following = session.exec(
+            select(TreasurySnapshot).where(TreasurySnapshot.period == period, TreasurySnapshot.date == end)
+        ).first()
+        if following is not None:
+            following.gdp_growth = growth(following.gdp_24h, volumes.get(end - step))
+            session.add(following)
+        
+        return fresh
+
+
+# Singleton instance
+treasury_rollup = TreasuryRollup(
+    enabled=settings.TREASURY_ROLLUP_ENABLED,
+    interval=settings.TREASURY_ROLLUP_INTERVAL_SECONDS,
+    settle_seconds=settings.TREASURY_ROLLUP_SETTLE_SECONDS,
+    backfill_days=settings.TREASURY_ROLLUP_BACKFILL_DAYS,
+    opening_reserve=settings.TREASURY_OPENING_RESERVE,
+)
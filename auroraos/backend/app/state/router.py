@@ -8,6 +8,7 @@
 ║   - CRUD /citizens          → Citizen management                 ║
 ║   - CRUD /treasury          → Economic transactions              ║
 ║   - CRUD /ai-operations     → AI activity logs                   ║
+║   - GET  /ai-operations/costs → LLM cost per conversation/model  ║
 ║   - CRUD /flags             → Content moderation                 ║
 ║                                                                  ║
 ║   Baron Baba © SiyahKare, 2025                                   ║
@@ -20,28 +21,29 @@ import uuid
 import random
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlmodel import Session, select, func
+from sqlalchemy import case
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..deps import get_db
+from ..deps import get_async_db
+from .dashboard import dashboard_stats, invalidate_dashboard_stats
 from .models import (
     Citizen,
     CitizenStatus,
     CitizenTier,
     TreasuryTransaction,
     TreasurySnapshot,
+    SnapshotPeriod,
     TransactionType,
     AIOperation,
     AIOperationType,
     AIOperationStatus,
     ContentFlag,
     FlagType,
-    ThreatLog,
 )
 from .schemas import (
     DashboardStats,
-    CitizenStats,
-    TreasuryStats,
-    ThreatStatus,
+    AICostRow,
     CitizenCreate,
     CitizenUpdate,
     CitizenOut,
@@ -73,165 +75,19 @@ def generate_id(prefix: str) -> str:
     return f"{prefix}-{date_part}-{random_part}"
 
 
-def format_number(n: float) -> str:
-    """Format number with commas."""
-    return f"{n:,.0f}"
-
-
-def format_percentage(n: float) -> str:
-    """Format as percentage with sign."""
-    return f"{'+' if n >= 0 else ''}{n:.1f}%"
-
-
 # ═══════════════════════════════════════════════════════════════════
 # DASHBOARD — Main stats endpoint
 # ═══════════════════════════════════════════════════════════════════
 
 @router.get("/dashboard", response_model=DashboardStats)
-def get_dashboard_stats(db: Session = Depends(get_db)):
+async def get_dashboard_stats(db: AsyncSession = Depends(get_async_db)):
     """
     📊 Get complete dashboard statistics.
     
-    Returns citizen, treasury, threat, and AI operation stats.
+    Returns citizen, treasury, threat, and AI operation stats, served
+    from the materialized dashboard_stats row (see state/dashboard.py).
     """
-    # Citizen stats
-    total_citizens = db.exec(select(func.count(Citizen.id))).one() or 0
-    verified = db.exec(
-        select(func.count(Citizen.id))
-        .where(Citizen.status == CitizenStatus.VERIFIED)
-    ).one() or 0
-    pending = db.exec(
-        select(func.count(Citizen.id))
-        .where(Citizen.status == CitizenStatus.PENDING)
-    ).one() or 0
-    online = db.exec(
-        select(func.count(Citizen.id))
-        .where(Citizen.is_online == True)
-    ).one() or 0
-    banned = db.exec(
-        select(func.count(Citizen.id))
-        .where(Citizen.status == CitizenStatus.BANNED)
-    ).one() or 0
-    
-    # New today
-    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    new_today = db.exec(
-        select(func.count(Citizen.id))
-        .where(Citizen.joined_at >= today_start)
-    ).one() or 0
-    
-    # By tier
-    tier_counts = {}
-    for tier in CitizenTier:
-        count = db.exec(
-            select(func.count(Citizen.id))
-            .where(Citizen.tier == tier)
-        ).one() or 0
-        tier_counts[tier.value] = count
-    
-    citizen_stats = CitizenStats(
-        total=total_citizens,
-        verified=verified,
-        pending=pending,
-        online=online,
-        banned=banned,
-        new_today=new_today,
-        basic_count=tier_counts.get("BASIC", 0),
-        silver_count=tier_counts.get("SILVER", 0),
-        gold_count=tier_counts.get("GOLD", 0),
-        platinum_count=tier_counts.get("PLATINUM", 0),
-        founder_count=tier_counts.get("FOUNDER", 0),
-    )
-    
-    # Treasury stats - get latest snapshot or calculate
-    snapshot = db.exec(
-        select(TreasurySnapshot)
-        .order_by(TreasurySnapshot.date.desc())
-        .limit(1)
-    ).first()
-    
-    if snapshot:
-        reserve_raw = snapshot.total_reserve
-        gdp_raw = snapshot.gdp_growth
-        inflation_raw = snapshot.inflation_rate
-        transactions_24h = snapshot.transaction_count
-    else:
-        # Calculate from transactions if no snapshot
-        reserve_raw = 4500000.0  # Default
-        gdp_raw = 12.0
-        inflation_raw = -2.4
-        transactions_24h = db.exec(
-            select(func.count(TreasuryTransaction.id))
-            .where(TreasuryTransaction.created_at >= today_start)
-        ).one() or 0
-    
-    # Volume 24h
-    volume_result = db.exec(
-        select(func.sum(TreasuryTransaction.amount))
-        .where(TreasuryTransaction.created_at >= today_start)
-    ).one()
-    volume_24h = volume_result or 0.0
-    
-    treasury_stats = TreasuryStats(
-        reserve=f"{format_number(reserve_raw)} NCR",
-        reserve_raw=reserve_raw,
-        gdp_24h=format_percentage(gdp_raw),
-        gdp_raw=gdp_raw,
-        inflation=format_percentage(inflation_raw),
-        inflation_raw=inflation_raw,
-        liquidity="High" if reserve_raw > 1000000 else "Medium" if reserve_raw > 100000 else "Low",
-        transactions_24h=transactions_24h,
-        volume_24h=volume_24h,
-        avg_transaction=volume_24h / transactions_24h if transactions_24h > 0 else 0,
-    )
-    
-    # Threat status
-    active_threats = db.exec(
-        select(func.count(ThreatLog.id))
-        .where(ThreatLog.status == "ACTIVE")
-    ).one() or 0
-    
-    mitigated_24h = db.exec(
-        select(func.count(ThreatLog.id))
-        .where(
-            ThreatLog.status == "MITIGATED",
-            ThreatLog.mitigated_at >= today_start - timedelta(days=1),
-        )
-    ).one() or 0
-    
-    last_threat = db.exec(
-        select(ThreatLog)
-        .order_by(ThreatLog.created_at.desc())
-        .limit(1)
-    ).first()
-    
-    threat_status = ThreatStatus(
-        level="LOW" if active_threats == 0 else "MEDIUM" if active_threats < 3 else "HIGH",
-        active_threats=active_threats,
-        mitigated_24h=mitigated_24h,
-        last_incident=last_threat.created_at if last_threat else None,
-        details=f"{active_threats} Cyber-Attacks detected" if active_threats > 0 else "0 Cyber-Attacks detected",
-    )
-    
-    # AI operations 24h
-    ai_ops_24h = db.exec(
-        select(func.count(AIOperation.id))
-        .where(AIOperation.created_at >= today_start)
-    ).one() or 0
-    
-    # Flagged content
-    flagged = db.exec(
-        select(func.count(ContentFlag.id))
-        .where(ContentFlag.status == "PENDING")
-    ).one() or 0
-    
-    return DashboardStats(
-        citizens=citizen_stats,
-        treasury=treasury_stats,
-        threat=threat_status,
-        ai_operations_24h=ai_ops_24h,
-        flagged_content=flagged,
-    )
+    return await dashboard_stats.get(db)
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -239,14 +95,14 @@ def get_dashboard_stats(db: Session = Depends(get_db)):
 # ═══════════════════════════════════════════════════════════════════
 
 @router.get("/citizens", response_model=List[CitizenListItem])
-def list_citizens(
+async def list_citizens(
     status: Optional[CitizenStatus] = None,
     tier: Optional[CitizenTier] = None,
     online_only: bool = False,
     search: Optional[str] = None,
     limit: int = Query(default=50, le=200),
     offset: int = 0,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """📋 List citizens with filters."""
     stmt = select(Citizen)
@@ -266,13 +122,13 @@ def list_citizens(
     
     stmt = stmt.order_by(Citizen.joined_at.desc()).offset(offset).limit(limit)
     
-    return db.exec(stmt).all()
+    return (await db.exec(stmt)).all()
 
 
 @router.post("/citizens", response_model=CitizenOut)
-def create_citizen(
+async def create_citizen(
     payload: CitizenCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """➕ Create a new citizen."""
     citizen = Citizen(
@@ -286,23 +142,24 @@ def create_citizen(
     )
     
     db.add(citizen)
-    db.commit()
-    db.refresh(citizen)
+    await invalidate_dashboard_stats(db)
+    await db.commit()
+    await db.refresh(citizen)
     
     return citizen
 
 
 @router.get("/citizens/{citizen_id}", response_model=CitizenOut)
-def get_citizen(
+async def get_citizen(
     citizen_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """👤 Get citizen by ID."""
     stmt = select(Citizen).where(
         (Citizen.citizen_id == citizen_id) |
         (Citizen.id == int(citizen_id) if citizen_id.isdigit() else False)
     )
-    citizen = db.exec(stmt).first()
+    citizen = (await db.exec(stmt)).first()
     
     if not citizen:
         raise HTTPException(status_code=404, detail="Citizen not found")
@@ -311,15 +168,15 @@ def get_citizen(
 
 
 @router.patch("/citizens/{citizen_id}", response_model=CitizenOut)
-def update_citizen(
+async def update_citizen(
     citizen_id: str,
     payload: CitizenUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """✏️ Update citizen details."""
-    citizen = db.exec(
+    citizen = (await db.exec(
         select(Citizen).where(Citizen.citizen_id == citizen_id)
-    ).first()
+    )).first()
     
     if not citizen:
         raise HTTPException(status_code=404, detail="Citizen not found")
@@ -338,21 +195,23 @@ def update_citizen(
             citizen.verified_at = datetime.utcnow()
     
     db.add(citizen)
-    db.commit()
-    db.refresh(citizen)
+    if payload.tier is not None or payload.status is not None:
+        await invalidate_dashboard_stats(db)
+    await db.commit()
+    await db.refresh(citizen)
     
     return citizen
 
 
 @router.post("/citizens/{citizen_id}/verify", response_model=CitizenOut)
-def verify_citizen(
+async def verify_citizen(
     citizen_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """✅ Verify a citizen."""
-    citizen = db.exec(
+    citizen = (await db.exec(
         select(Citizen).where(Citizen.citizen_id == citizen_id)
-    ).first()
+    )).first()
     
     if not citizen:
         raise HTTPException(status_code=404, detail="Citizen not found")
@@ -361,22 +220,23 @@ def verify_citizen(
     citizen.verified_at = datetime.utcnow()
     
     db.add(citizen)
-    db.commit()
-    db.refresh(citizen)
+    await invalidate_dashboard_stats(db)
+    await db.commit()
+    await db.refresh(citizen)
     
     return citizen
 
 
 @router.post("/citizens/{citizen_id}/ban")
-def ban_citizen(
+async def ban_citizen(
     citizen_id: str,
     payload: CitizenBanRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """🚫 Ban a citizen."""
-    citizen = db.exec(
+    citizen = (await db.exec(
         select(Citizen).where(Citizen.citizen_id == citizen_id)
-    ).first()
+    )).first()
     
     if not citizen:
         raise HTTPException(status_code=404, detail="Citizen not found")
@@ -386,7 +246,8 @@ def ban_citizen(
     citizen.ban_reason = payload.reason
     
     db.add(citizen)
-    db.commit()
+    await invalidate_dashboard_stats(db)
+    await db.commit()
     
     return {"success": True, "citizen_id": citizen_id, "reason": payload.reason}
 
@@ -396,12 +257,12 @@ def ban_citizen(
 # ═══════════════════════════════════════════════════════════════════
 
 @router.get("/treasury/transactions", response_model=List[TransactionOut])
-def list_transactions(
+async def list_transactions(
     type: Optional[TransactionType] = None,
     citizen_id: Optional[int] = None,
     limit: int = Query(default=50, le=200),
     offset: int = 0,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """📋 List treasury transactions."""
     stmt = select(TreasuryTransaction)
@@ -413,13 +274,13 @@ def list_transactions(
     
     stmt = stmt.order_by(TreasuryTransaction.created_at.desc()).offset(offset).limit(limit)
     
-    return db.exec(stmt).all()
+    return (await db.exec(stmt)).all()
 
 
 @router.post("/treasury/transactions", response_model=TransactionOut)
-def create_transaction(
+async def create_transaction(
     payload: TransactionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """💰 Create a treasury transaction."""
     transaction = TreasuryTransaction(
@@ -438,7 +299,7 @@ def create_transaction(
     
     # Update citizen balance if applicable
     if payload.citizen_id:
-        citizen = db.get(Citizen, payload.citizen_id)
+        citizen = await db.get(Citizen, payload.citizen_id)
         if citizen:
             if payload.type in (TransactionType.DEPOSIT, TransactionType.REWARD):
                 citizen.balance += payload.amount
@@ -448,25 +309,26 @@ def create_transaction(
                 citizen.total_spent += payload.amount
             db.add(citizen)
     
-    db.commit()
-    db.refresh(transaction)
+    await db.commit()
+    await db.refresh(transaction)
     
     return transaction
 
 
 @router.get("/treasury/history", response_model=List[TreasuryHistory])
-def get_treasury_history(
+async def get_treasury_history(
     days: int = Query(default=7, le=90),
-    db: Session = Depends(get_db),
+    period: SnapshotPeriod = SnapshotPeriod.DAY,
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """📈 Get treasury history."""
+    """📈 Get treasury history (hourly or daily rollups)."""
     since = datetime.utcnow() - timedelta(days=days)
     
-    snapshots = db.exec(
+    snapshots = (await db.exec(
         select(TreasurySnapshot)
-        .where(TreasurySnapshot.date >= since)
+        .where(TreasurySnapshot.period == period, TreasurySnapshot.date >= since)
         .order_by(TreasurySnapshot.date.asc())
-    ).all()
+    )).all()
     
     return [
         TreasuryHistory(
@@ -476,6 +338,8 @@ def get_treasury_history(
             gdp_growth=s.gdp_growth,
             transaction_count=s.transaction_count,
             active_citizens=s.active_citizens,
+            new_citizens=s.new_citizens,
+            reserve_delta=s.reserve_delta or 0.0,
         )
         for s in snapshots
     ]
@@ -486,12 +350,12 @@ def get_treasury_history(
 # ═══════════════════════════════════════════════════════════════════
 
 @router.get("/ai-operations", response_model=List[AIOperationOut])
-def list_ai_operations(
+async def list_ai_operations(
     type: Optional[AIOperationType] = None,
     status: Optional[AIOperationStatus] = None,
     limit: int = Query(default=50, le=200),
     offset: int = 0,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """📋 List AI operations."""
     stmt = select(AIOperation)
@@ -503,13 +367,69 @@ def list_ai_operations(
     
     stmt = stmt.order_by(AIOperation.created_at.desc()).offset(offset).limit(limit)
     
-    return db.exec(stmt).all()
+    return (await db.exec(stmt)).all()
+
+
+@router.get("/ai-operations/costs", response_model=List[AICostRow])
+async def ai_operation_costs(
+    group_by: str = Query(default="conversation", pattern="^(conversation|caller|model)$"),
+    hours: int = Query(default=24, ge=1, le=24 * 90),
+    conversation_id: Optional[int] = None,
+    limit: int = Query(default=50, le=500),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    💸 LLM cost from the usage ledger, most expensive first.
+    
+    - group_by=conversation: cost per orchestrator conversation
+    - group_by=caller: per feature (orchestrator_agent, aurora_reply, ...)
+    - group_by=model: per model
+    """
+    column = {
+        "conversation": AIOperation.conversation_id,
+        "caller": AIOperation.caller,
+        "model": AIOperation.model_used,
+    }[group_by]
+    
+    stmt = (
+        select(
+            column,
+            func.count(AIOperation.id),
+            func.coalesce(func.sum(case((AIOperation.status == AIOperationStatus.FAILED, 1), else_=0)), 0),
+            func.coalesce(func.sum(AIOperation.prompt_tokens), 0),
+            func.coalesce(func.sum(AIOperation.completion_tokens), 0),
+            func.coalesce(func.sum(AIOperation.cost), 0.0),
+            func.max(AIOperation.created_at),
+        )
+        .where(
+            AIOperation.created_at >= datetime.utcnow() - timedelta(hours=hours),
+            column.is_not(None),
+        )
+        .group_by(column)
+        .order_by(func.coalesce(func.sum(AIOperation.cost), 0.0).desc())
+        .limit(limit)
+    )
+    if conversation_id is not None:
+        stmt = stmt.where(AIOperation.conversation_id == conversation_id)
+    
+    return [
+        AICostRow(
+            key=str(key),
+            operations=ops,
+            failed=failed,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cost=round(cost, 6),
+            last_at=last_at,
+        )
+        for key, ops, failed, prompt_tokens, completion_tokens, cost, last_at in (await db.exec(stmt)).all()
+    ]
 
 
 @router.post("/ai-operations", response_model=AIOperationOut)
-def create_ai_operation(
+async def create_ai_operation(
     payload: AIOperationCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """🤖 Create a new AI operation."""
     operation = AIOperation(
@@ -522,22 +442,22 @@ def create_ai_operation(
     )
     
     db.add(operation)
-    db.commit()
-    db.refresh(operation)
+    await db.commit()
+    await db.refresh(operation)
     
     return operation
 
 
 @router.patch("/ai-operations/{operation_id}", response_model=AIOperationOut)
-def update_ai_operation(
+async def update_ai_operation(
     operation_id: str,
     payload: AIOperationUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """🔄 Update AI operation status."""
-    operation = db.exec(
+    operation = (await db.exec(
         select(AIOperation).where(AIOperation.operation_id == operation_id)
-    ).first()
+    )).first()
     
     if not operation:
         raise HTTPException(status_code=404, detail="Operation not found")
@@ -558,8 +478,8 @@ def update_ai_operation(
             )
     
     db.add(operation)
-    db.commit()
-    db.refresh(operation)
+    await db.commit()
+    await db.refresh(operation)
     
     return operation
 
@@ -569,12 +489,12 @@ def update_ai_operation(
 # ═══════════════════════════════════════════════════════════════════
 
 @router.get("/flags", response_model=List[ContentFlagOut])
-def list_flags(
+async def list_flags(
     status: Optional[str] = "PENDING",
     type: Optional[FlagType] = None,
     limit: int = Query(default=50, le=200),
     offset: int = 0,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """📋 List content flags."""
     stmt = select(ContentFlag)
@@ -586,13 +506,13 @@ def list_flags(
     
     stmt = stmt.order_by(ContentFlag.created_at.desc()).offset(offset).limit(limit)
     
-    return db.exec(stmt).all()
+    return (await db.exec(stmt)).all()
 
 
 @router.post("/flags", response_model=ContentFlagOut)
-def create_flag(
+async def create_flag(
     payload: ContentFlagCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """🚩 Flag content for moderation."""
     flag = ContentFlag(
@@ -607,22 +527,23 @@ def create_flag(
     )
     
     db.add(flag)
-    db.commit()
-    db.refresh(flag)
+    await invalidate_dashboard_stats(db)
+    await db.commit()
+    await db.refresh(flag)
     
     return flag
 
 
 @router.post("/flags/{flag_id}/resolve", response_model=ContentFlagOut)
-def resolve_flag(
+async def resolve_flag(
     flag_id: str,
     payload: ContentFlagResolve,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """✅ Resolve a content flag."""
-    flag = db.exec(
+    flag = (await db.exec(
         select(ContentFlag).where(ContentFlag.flag_id == flag_id)
-    ).first()
+    )).first()
     
     if not flag:
         raise HTTPException(status_code=404, detail="Flag not found")
@@ -633,8 +554,9 @@ def resolve_flag(
     flag.resolved_by = "operator"  # TODO: Get from auth
     
     db.add(flag)
-    db.commit()
-    db.refresh(flag)
+    await invalidate_dashboard_stats(db)
+    await db.commit()
+    await db.refresh(flag)
     
     return flag
 
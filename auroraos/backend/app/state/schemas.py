@@ -67,12 +67,32 @@ class ThreatStatus(BaseModel):
     details: str
 
 
+class AICallerCost(BaseModel):
+    """LLM usage of one caller (feature) today."""
+    caller: str
+    operations: int
+    tokens: int
+    cost: float
+
+
+class AIOpsStats(BaseModel):
+    """LLM usage today, from the ai_operations ledger."""
+    operations: int
+    failed: int
+    tokens: int
+    cost: float  # USD
+    cost_formatted: str  # "$12.34"
+    avg_duration_ms: Optional[int]
+    by_caller: List[AICallerCost]
+
+
 class DashboardStats(BaseModel):
     """Complete dashboard statistics."""
     citizens: CitizenStats
     treasury: TreasuryStats
     threat: ThreatStatus
     ai_operations_24h: int
+    ai_ops: AIOpsStats
     flagged_content: int
 
 
@@ -179,6 +199,8 @@ class TreasuryHistory(BaseModel):
     gdp_growth: float
     transaction_count: int
     active_citizens: int
+    new_citizens: int = 0
+    reserve_delta: float = 0.0
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -207,6 +229,12 @@ class AIOperationOut(BaseModel):
     sentiment: Optional[str]
     confidence: Optional[float]
     model_used: Optional[str]
+    tokens_used: Optional[int] = None
+    cost: Optional[float] = None
+    provider: Optional[str] = None
+    caller: Optional[str] = None
+    conversation_id: Optional[int] = None
+    duration_ms: Optional[int] = None
     created_at: datetime
     
     class Config:
@@ -221,6 +249,17 @@ class AIOperationUpdate(BaseModel):
     confidence: Optional[float] = None
 
 
+class AICostRow(BaseModel):
+    """LLM usage grouped by conversation, caller or model."""
+    key: str
+    operations: int
+    failed: int
+    prompt_tokens: int
+    completion_tokens: int
+    cost: float  # USD
+    last_at: Optional[datetime]
+
+
 # ═══════════════════════════════════════════════════════════════════
 # MODERATION API
 # ═══════════════════════════════════════════════════════════════════
@@ -0,0 +1,216 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║   AuroraOS Telegram Worker — Outbound Sender                     ║
+║   Concurrent, rate-limited, ordered per chat, FloodWait-aware    ║
+║                                                                  ║
+║   Baron Baba © SiyahKare, 2025                                   ║
+╚══════════════════════════════════════════════════════════════════╝
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Dict, Optional, Set, Tuple
+
+# FloodWaitError ships with Telethon; without it no error is a flood wait
+try:
+    from telethon.errors import FloodWaitError
+except ImportError:
+    class FloodWaitError(Exception):
+        seconds = 0
+
+
+# ═══════════════════════════════════════════════════════════════════
+# Token Bucket
+# ═══════════════════════════════════════════════════════════════════
+
+class AsyncTokenBucket:
+    """`rate` sends per second, bursts of up to `burst`."""
+    
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.capacity = max(1.0, burst)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+    
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    async def acquire(self) -> None:
+        while True:
+            self._refill()
+            if self.level >= 1:
+                self.level -= 1
+                return
+            await asyncio.sleep((1 - self.level) / self.rate)
+    
+    @property
+    def idle(self) -> bool:
+        """Full again, i.e. safe to forget (per-chat buckets)."""
+        self._refill()
+        return self.level >= self.capacity
+
+
+# ═══════════════════════════════════════════════════════════════════
+# Sender
+# ═══════════════════════════════════════════════════════════════════
+
+@dataclass
+class OutboundItem:
+    chat_id: int
+    external_user_id: str
+    message_id: Optional[int]
+    text: str
+
+
+SendFn = Callable[[int, str], Awaitable[object]]
+AckFn = Callable[[str, int], None]
+
+
+class OutboundSender:
+    """
+    Sends outbound replies to Telegram concurrently.
+    
+    - One drain task per chat with queued messages, so a chat's replies
+      go out in the order they were submitted while different chats
+      send in parallel.
+    - At most `concurrency` send_message calls in flight overall.
+    - A global token bucket keeps the account under Telegram's flood
+      limits; a per-chat bucket spaces messages inside one chat.
+    - FloodWaitError pauses only the chat that hit it, for the seconds
+      Telegram asked, then retries the same message.
+    - A failed send (or a flood wait longer than `max_flood_wait`)
+      drops the rest of that chat's queue rather than sending past the
+      gap; those messages stay unacked and the backend leases them
+      again, still in order.
+    
+    Successful sends are reported through `on_sent(external_user_id,
+    message_id)`; acking is the caller's business (batched there).
+    Messages already queued or in flight are not queued twice, so a
+    re-lease of a slow chat's backlog doesn't double-send.
+    """
+    
+    def __init__(
+        self,
+        send: SendFn,
+        on_sent: AckFn,
+        concurrency: int,
+        global_rate: float,
+        global_burst: float,
+        chat_rate: float,
+        chat_burst: float,
+        max_flood_wait: float,
+        max_pending: int,
+    ):
+        self._send = send
+        self._on_sent = on_sent
+        self._slots = asyncio.Semaphore(concurrency)
+        self._global = AsyncTokenBucket(global_rate, global_burst)
+        self._chat_rate = chat_rate
+        self._chat_burst = chat_burst
+        self.max_flood_wait = max_flood_wait
+        self.max_pending = max_pending
+        
+        self._queues: Dict[int, Deque[OutboundItem]] = {}
+        self._buckets: Dict[int, AsyncTokenBucket] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._queued: Set[Tuple[str, int]] = set()
+        self._room = asyncio.Event()
+        self._room.set()
+        self.pending = 0
+        self.sent = 0
+        self.failed = 0
+        self.flood_waits = 0
+    
+    # ─── Intake ───
+    
+    async def submit(self, item: OutboundItem) -> None:
+        """Queue one message; waits while `max_pending` messages are queued."""
+        key = (item.external_user_id, item.message_id)
+        if item.message_id is not None and key in self._queued:
+            return
+        while self.pending >= self.max_pending:
+            self._room.clear()
+            await self._room.wait()
+        
+        if item.message_id is not None:
+            self._queued.add(key)
+        self.pending += 1
+        self._queues.setdefault(item.chat_id, deque()).append(item)
+        if item.chat_id not in self._tasks:
+            self._tasks[item.chat_id] = asyncio.create_task(self._drain(item.chat_id))
+    
+    @property
+    def free(self) -> int:
+        """How many more messages can be queued without blocking."""
+        return max(0, self.max_pending - self.pending)
+    
+    # ─── Per-chat drain ───
+    
+    async def _drain(self, chat_id: int) -> None:
+        queue = self._queues[chat_id]
+        bucket = self._buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._buckets[chat_id] = AsyncTokenBucket(self._chat_rate, self._chat_burst)
+        try:
+            while queue:
+                item = queue[0]
+                if not await self._send_one(chat_id, item, bucket):
+                    # Leave the rest for the next lease, in order
+                    while queue:
+                        self._done(queue.popleft())
+                    break
+                self._done(queue.popleft())
+        finally:
+            del self._tasks[chat_id]
+            if not queue:
+                del self._queues[chat_id]
+            # Drop idle per-chat buckets so memory follows active chats
+            for cid in [c for c, b in self._buckets.items() if c not in self._tasks and b.idle]:
+                del self._buckets[cid]
+    
+    async def _send_one(self, chat_id: int, item: OutboundItem, bucket: AsyncTokenBucket) -> bool:
+        """Send, retrying flood waits. False = stop this chat's queue."""
+        while True:
+            await bucket.acquire()
+            try:
+                async with self._slots:
+                    await self._global.acquire()
+                    await self._send(chat_id, item.text)
+            except FloodWaitError as e:
+                self.flood_waits += 1
+                if e.seconds > self.max_flood_wait:
+                    print(f"⏳ FloodWait {e.seconds}s for {item.external_user_id}, leaving its queue for later")
+                    return False
+                print(f"⏳ FloodWait {e.seconds}s for {item.external_user_id}, pausing this chat")
+                await asyncio.sleep(e.seconds)
+                continue
+            except Exception as e:
+                self.failed += 1
+                print(f"❌ Error sending to Telegram: {e}")
+                return False
+            
+            self.sent += 1
+            print(f"📤 Sent to {item.external_user_id}: {item.text[:50]}...")
+            if item.message_id is not None:
+                self._on_sent(item.external_user_id, item.message_id)
+            return True
+    
+    def _done(self, item: OutboundItem) -> None:
+        self._queued.discard((item.external_user_id, item.message_id))
+        self.pending -= 1
+        self._room.set()
+    
+    # ─── Shutdown ───
+    
+    async def close(self, timeout: float = 10.0) -> None:
+        """Give queued sends `timeout` seconds to finish, then cancel them."""
+        tasks = list(self._tasks.values())
+        if not tasks:
+            return
+        _, late = await asyncio.wait(tasks, timeout=timeout)
+        for task in late:
+            task.cancel()
@@ -0,0 +1,125 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║   AuroraOS Telegram Worker — Inbound Spool                       ║
+║   Durable local queue (SQLite) between Telethon and the backend  ║
+║                                                                  ║
+║   Baron Baba © SiyahKare, 2025                                   ║
+╚══════════════════════════════════════════════════════════════════╝
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS inbound_spool (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_inbound_spool_user_key ON inbound_spool (user_key, next_attempt_at);
+"""
+
+
+class InboundSpool:
+    """
+    Inbound DMs, written to disk before anything else happens.
+    
+    put() commits with synchronous=FULL, so an event the Telethon
+    handler has spooled survives a crash or a backend outage. The
+    drain side takes due rows, forwards them, then ack()s (deletes) or
+    retry()s them with a backoff. Rows are never dropped.
+    
+    take() never hands out a user's newer rows while an older one is
+    backing off, so a user's messages reach the backend in order.
+    
+    All methods block; the worker calls them via asyncio.to_thread.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript(SCHEMA)
+    
+    def put(self, user_key: str, payload: dict) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO inbound_spool (user_key, payload, created_at) VALUES (?, ?, ?)",
+                (user_key, json.dumps(payload, ensure_ascii=False), time.time()),
+            )
+            return cursor.lastrowid
+    
+    def take(self, limit: int) -> List[Tuple[int, str, dict]]:
+        """Due rows, oldest first: (id, user_key, payload)."""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT id, user_key, payload FROM inbound_spool
+                WHERE user_key NOT IN (
+                    SELECT user_key FROM inbound_spool WHERE next_attempt_at > :now
+                )
+                ORDER BY id
+                LIMIT :limit
+                """,
+                {"now": time.time(), "limit": limit},
+            ).fetchall()
+        return [(row_id, user_key, json.loads(payload)) for row_id, user_key, payload in rows]
+    
+    def _executemany(self, sql: str, params: list) -> None:
+        """One transaction (one fsync) for the whole batch."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(sql, params)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+    
+    def ack(self, ids: List[int]) -> None:
+        if ids:
+            self._executemany("DELETE FROM inbound_spool WHERE id = ?", [(i,) for i in ids])
+    
+    def retry(self, ids: List[int], base_delay: float, max_delay: float, error: str) -> None:
+        """Back off exponentially per row: base_delay * 2^attempts, capped."""
+        if not ids:
+            return
+        now = time.time()
+        self._executemany(
+            """
+            UPDATE inbound_spool
+            SET attempts = attempts + 1,
+                next_attempt_at = :now + min(:max_delay, :base_delay * (1 << min(attempts, 20))),
+                last_error = :error
+            WHERE id = :id
+            """,
+            [
+                {"id": i, "now": now, "base_delay": base_delay, "max_delay": max_delay, "error": error[:200]}
+                for i in ids
+            ],
+        )
+    
+    def next_due_in(self) -> Optional[float]:
+        """Seconds until the earliest row is due (0 = now, None = spool empty)."""
+        with self._lock:
+            (due,) = self._conn.execute("SELECT MIN(next_attempt_at) FROM inbound_spool").fetchone()
+        return None if due is None else max(0.0, due - time.time())
+    
+    def depth(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM inbound_spool").fetchone()
+        return count
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
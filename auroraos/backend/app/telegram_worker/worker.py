@@ -6,8 +6,8 @@
 ║   This worker:                                                   ║
 ║   1. Connects to Betül's real Telegram account (Telethon)        ║
 ║   2. Listens for incoming DMs                                    ║
-║   3. Forwards to AuroraOS /orchestrator/telegram/inbound         ║
-║   4. Polls /orchestrator/telegram/outbound for replies           ║
+║   3. Spools them locally, drains to /telegram/inbound:batch      ║
+║   4. Long-polls /orchestrator/telegram/outbound for replies      ║
 ║   5. Sends AI replies back to Telegram users                     ║
 ║                                                                  ║
 ║   Baron Baba © SiyahKare, 2025                                   ║
@@ -18,17 +18,23 @@ Usage:
     export TELEGRAM_API_HASH=your_api_hash
     export TELEGRAM_SESSION=betul_session
     export AURORA_API_BASE=http://localhost:8001/v1
+    export OUTBOUND_MODE=longpoll   # or: stream, poll
+    export AURORA_HTTP2=true        # optional, needs: pip install httpx[http2]
     
     python -m app.telegram_worker.worker
 """
 
 import os
+import json
 import asyncio
 from datetime import datetime
 from typing import Optional
 
 import httpx
 
+from .sender import OutboundItem, OutboundSender
+from .spool import InboundSpool
+
 # Telethon import (install with: pip install telethon)
 try:
     from telethon import TelegramClient, events
@@ -38,6 +44,13 @@ except ImportError:
     TELETHON_AVAILABLE = False
     print("⚠️ Telethon not installed. Run: pip install telethon")
 
+# HTTP/2 to the Aurora API is optional (install with: pip install httpx[http2])
+try:
+    import h2  # noqa: F401
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
 
 # ═══════════════════════════════════════════════════════════════════
 # Configuration
@@ -48,19 +61,70 @@ TELEGRAM_API_HASH = os.getenv("TELEGRAM_API_HASH")
 TELEGRAM_SESSION = os.getenv("TELEGRAM_SESSION", "betul_session")
 AURORA_API_BASE = os.getenv("AURORA_API_BASE", "http://localhost:8001/v1")
 
-# Polling interval for outbound messages
+# Outbound delivery: "longpoll" (default), "stream" (SSE) or "poll"
+OUTBOUND_MODE = os.getenv("OUTBOUND_MODE", "longpoll")
+OUTBOUND_LONG_POLL_WAIT = float(os.getenv("OUTBOUND_LONG_POLL_WAIT", "25"))  # seconds
+
+# Polling interval for outbound messages ("poll" mode, and retry delay on errors)
 OUTBOUND_POLL_INTERVAL = 2  # seconds
 
+# Connection pool to the Aurora API (one client for the worker's lifetime)
+AURORA_MAX_CONNECTIONS = int(os.getenv("AURORA_MAX_CONNECTIONS", "10"))
+AURORA_KEEPALIVE_EXPIRY = float(os.getenv("AURORA_KEEPALIVE_EXPIRY", "60"))  # seconds
+AURORA_HTTP2 = os.getenv("AURORA_HTTP2", "false").lower() in ("1", "true", "yes")
+
+# Outbound sender: concurrency and Telegram flood limits
+SEND_CONCURRENCY = int(os.getenv("SEND_CONCURRENCY", "8"))       # send_message calls in flight
+SEND_GLOBAL_RATE = float(os.getenv("SEND_GLOBAL_RATE", "20"))    # messages/second, whole account
+SEND_GLOBAL_BURST = float(os.getenv("SEND_GLOBAL_BURST", "20"))
+SEND_CHAT_RATE = float(os.getenv("SEND_CHAT_RATE", "1"))         # messages/second, one chat
+SEND_CHAT_BURST = float(os.getenv("SEND_CHAT_BURST", "3"))
+SEND_MAX_FLOOD_WAIT = float(os.getenv("SEND_MAX_FLOOD_WAIT", "60"))  # seconds; longer → redeliver later
+SEND_MAX_PENDING = int(os.getenv("SEND_MAX_PENDING", "200"))     # queued messages before polling pauses
+ACK_FLUSH_INTERVAL = 1.0  # seconds between batched delivery acks
+
+# Inbound spool: DMs are written here first, then drained to the backend
+INBOUND_SPOOL_PATH = os.getenv("INBOUND_SPOOL_PATH", "telegram_spool.db")
+SPOOL_BATCH_SIZE = int(os.getenv("SPOOL_BATCH_SIZE", "50"))          # messages per backend request
+SPOOL_CONCURRENCY = int(os.getenv("SPOOL_CONCURRENCY", "4"))         # batch requests in flight
+SPOOL_RETRY_BASE = float(os.getenv("SPOOL_RETRY_BASE", "1"))         # seconds, doubled per attempt
+SPOOL_RETRY_MAX = float(os.getenv("SPOOL_RETRY_MAX", "300"))         # backoff cap, seconds
+SPOOL_IDLE_INTERVAL = 5.0  # seconds between spool checks when nothing is due
+
 
 # ═══════════════════════════════════════════════════════════════════
 # Aurora API Client
 # ═══════════════════════════════════════════════════════════════════
 
 class AuroraClient:
-    """HTTP client for Aurora orchestrator API."""
+    """
+    HTTP client for Aurora orchestrator API.
+    
+    One pooled httpx.AsyncClient for the worker's lifetime: keep-alive
+    connections are reused across inbound posts, polls and acks instead
+    of a TCP (and TLS) handshake per call. HTTP/2 is used when
+    AURORA_HTTP2 is set and the h2 package is installed.
+    """
     
     def __init__(self, base_url: str):
         self.base_url = base_url.rstrip("/")
+        http2 = AURORA_HTTP2 and H2_AVAILABLE
+        if AURORA_HTTP2 and not H2_AVAILABLE:
+            print("⚠️ AURORA_HTTP2 set but h2 is not installed, using HTTP/1.1. Run: pip install httpx[http2]")
+        self._http = httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=http2,
+            timeout=10.0,
+            limits=httpx.Limits(
+                max_connections=AURORA_MAX_CONNECTIONS,
+                max_keepalive_connections=AURORA_MAX_CONNECTIONS,
+                keepalive_expiry=AURORA_KEEPALIVE_EXPIRY,
+            ),
+        )
+    
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        await self._http.aclose()
     
     async def send_inbound(
         self,
@@ -71,34 +135,60 @@ class AuroraClient:
         message_id: Optional[int] = None,
     ) -> dict:
         """Send inbound message to Aurora."""
-        async with httpx.AsyncClient() as http:
-            payload = {
-                "telegram_user_id": telegram_user_id,
-                "username": username,
-                "first_name": first_name,
-                "message": message,
-                "message_id": message_id,
-            }
-            
-            response = await http.post(
-                f"{self.base_url}/orchestrator/telegram/inbound",
-                json=payload,
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            return response.json()
+        payload = {
+            "telegram_user_id": telegram_user_id,
+            "username": username,
+            "first_name": first_name,
+            "message": message,
+            "message_id": message_id,
+        }
+        
+        response = await self._http.post(
+            "/orchestrator/telegram/inbound",
+            json=payload,
+            timeout=30.0,
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    async def send_inbound_batch(self, messages: list[dict]) -> list[dict]:
+        """Send spooled inbound messages in one request; per-message results in order."""
+        response = await self._http.post(
+            "/orchestrator/telegram/inbound:batch",
+            json={"messages": messages},
+            timeout=30.0,
+        )
+        response.raise_for_status()
+        return response.json()["results"]
     
-    async def poll_outbound(self, limit: int = 10) -> list:
-        """Poll for outbound messages to send."""
-        async with httpx.AsyncClient() as http:
-            response = await http.get(
-                f"{self.base_url}/orchestrator/telegram/outbound",
-                params={"limit": limit},
-                timeout=10.0,
-            )
+    async def poll_outbound(self, limit: int = 10, wait: float = 0) -> list:
+        """
+        Poll for outbound messages to send.
+        
+        With `wait` > 0 the backend holds the request open until a reply
+        is enqueued (long-poll), so the read timeout must exceed it.
+        """
+        response = await self._http.get(
+            "/orchestrator/telegram/outbound",
+            params={"limit": limit, "wait": wait},
+            timeout=10.0 + wait,
+        )
+        response.raise_for_status()
+        data = response.json()
+        return data.get("messages", [])
+    
+    async def stream_outbound(self, limit: int = 10):
+        """Subscribe to the SSE outbound stream; yields message dicts."""
+        async with self._http.stream(
+            "GET",
+            "/orchestrator/telegram/outbound/stream",
+            params={"limit": limit},
+            timeout=httpx.Timeout(10.0, read=None),
+        ) as response:
             response.raise_for_status()
-            data = response.json()
-            return data.get("messages", [])
+            async for line in response.aiter_lines():
+                if line.startswith("data:"):
+                    yield json.loads(line[5:].strip())
     
     async def confirm_delivered(
         self,
@@ -106,16 +196,28 @@ class AuroraClient:
         message_id: int,
     ) -> bool:
         """Confirm message was delivered."""
-        async with httpx.AsyncClient() as http:
-            response = await http.post(
-                f"{self.base_url}/orchestrator/telegram/delivered",
-                params={
-                    "external_user_id": external_user_id,
-                    "message_id": message_id,
-                },
-                timeout=10.0,
-            )
-            return response.status_code == 200
+        response = await self._http.post(
+            "/orchestrator/telegram/delivered",
+            params={
+                "external_user_id": external_user_id,
+                "message_id": message_id,
+            },
+        )
+        return response.status_code == 200
+    
+    async def confirm_delivered_batch(self, acks: list[tuple[str, int]]) -> int:
+        """Confirm many (external_user_id, message_id) deliveries in one request."""
+        if not acks:
+            return 0
+        response = await self._http.post(
+            "/orchestrator/telegram/delivered:batch",
+            json={"acks": [
+                {"external_user_id": external_user_id, "message_id": message_id}
+                for external_user_id, message_id in acks
+            ]},
+        )
+        response.raise_for_status()
+        return response.json().get("confirmed", 0)
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -141,8 +243,25 @@ class TelegramWorker:
         )
         
         self.aurora = AuroraClient(AURORA_API_BASE)
+        self.spool = InboundSpool(INBOUND_SPOOL_PATH)
+        self._spooled = asyncio.Event()
         self._running = False
         
+        # Sends run concurrently; acks collect here and go out in batches
+        self._acks: list[tuple[str, int]] = []
+        self._acks_ready = asyncio.Event()
+        self.sender = OutboundSender(
+            send=self.client.send_message,
+            on_sent=self._ack,
+            concurrency=SEND_CONCURRENCY,
+            global_rate=SEND_GLOBAL_RATE,
+            global_burst=SEND_GLOBAL_BURST,
+            chat_rate=SEND_CHAT_RATE,
+            chat_burst=SEND_CHAT_BURST,
+            max_flood_wait=SEND_MAX_FLOOD_WAIT,
+            max_pending=SEND_MAX_PENDING,
+        )
+        
         # Track users we've sent to (for outbound mapping)
         self._user_cache: dict[int, User] = {}
     
@@ -165,9 +284,12 @@ class TelegramWorker:
         # Register event handlers
         self._register_handlers()
         
-        # Start outbound polling task
+        # Start inbound drain, outbound polling and ack tasks
         self._running = True
+        print(f"📦 Inbound spool: {INBOUND_SPOOL_PATH} ({self.spool.depth()} waiting)")
+        asyncio.create_task(self._inbound_drain_loop())
         asyncio.create_task(self._outbound_poll_loop())
+        asyncio.create_task(self._ack_loop())
         
         print("🚀 Worker running. Press Ctrl+C to stop.")
         await self.client.run_until_disconnected()
@@ -199,70 +321,147 @@ class TelegramWorker:
             
             print(f"📥 Incoming from @{sender.username or sender.id}: {text[:50]}...")
             
+            # Spool to disk and return; the drain task forwards it to Aurora
+            await asyncio.to_thread(self.spool.put, f"tg_{sender.id}", {
+                "telegram_user_id": sender.id,
+                "username": sender.username,
+                "first_name": sender.first_name,
+                "message": text,
+                "message_id": event.message.id,
+            })
+            self._spooled.set()
+    
+    async def _inbound_drain_loop(self):
+        """Forward spooled DMs to Aurora in batches, one ordered lane per user group."""
+        while self._running:
+            self._spooled.clear()
             try:
-                result = await self.aurora.send_inbound(
-                    telegram_user_id=sender.id,
-                    username=sender.username,
-                    first_name=sender.first_name,
-                    message=text,
-                    message_id=event.message.id,
-                )
-                
-                routing_mode = result.get("routing_mode", "AI_ONLY")
-                print(f"   → Routing: {routing_mode}")
-                
-                # If AI reply was generated and queued, it will be sent via outbound poll
-                if result.get("ai_reply"):
-                    print(f"   → AI reply queued")
-                
+                rows = await asyncio.to_thread(self.spool.take, SPOOL_BATCH_SIZE * SPOOL_CONCURRENCY)
+            except Exception as e:
+                print(f"⚠️ Spool read error: {e}")
+                rows = []
+            
+            if not rows:
+                due = await asyncio.to_thread(self.spool.next_due_in)
+                timeout = SPOOL_IDLE_INTERVAL if due is None else min(due, SPOOL_IDLE_INTERVAL)
+                try:
+                    await asyncio.wait_for(self._spooled.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            # A user's messages always land in the same lane, in spool order
+            lanes = [[] for _ in range(SPOOL_CONCURRENCY)]
+            for row in rows:
+                lanes[hash(row[1]) % SPOOL_CONCURRENCY].append(row)
+            await asyncio.gather(*(self._forward_lane(lane) for lane in lanes if lane))
+    
+    async def _forward_lane(self, rows: list):
+        """Send one lane's rows batch by batch; stop at the first failed request."""
+        held = set()  # Users with a failed message: their later ones wait for it
+        for start in range(0, len(rows), SPOOL_BATCH_SIZE):
+            batch = [row for row in rows[start:start + SPOOL_BATCH_SIZE] if row[1] not in held]
+            if not batch:
+                continue
+            try:
+                results = await self.aurora.send_inbound_batch([payload for _, _, payload in batch])
             except Exception as e:
-                print(f"❌ Error sending to Aurora: {e}")
+                print(f"⚠️ Aurora unavailable, {len(rows) - start} spooled message(s) backing off: {e}")
+                rest = [row[0] for row in rows[start:] if row[1] not in held]
+                await asyncio.to_thread(self.spool.retry, rest, SPOOL_RETRY_BASE, SPOOL_RETRY_MAX, str(e))
+                return
+            
+            done = [row[0] for row, r in zip(batch, results) if r.get("success")]
+            failed = [row for row, r in zip(batch, results) if not r.get("success")]
+            await asyncio.to_thread(self.spool.ack, done)
+            if failed:
+                held.update(row[1] for row in failed)
+                error = next((r.get("error") for r in results if not r.get("success")), None) or "rejected"
+                await asyncio.to_thread(
+                    self.spool.retry, [row[0] for row in failed], SPOOL_RETRY_BASE, SPOOL_RETRY_MAX, error,
+                )
+            print(f"📨 Forwarded {len(done)} spooled message(s) to Aurora" + (f", {len(failed)} to retry" if failed else ""))
     
     async def _outbound_poll_loop(self):
-        """Poll for outbound messages and send them."""
+        """Fetch outbound messages (long-poll, SSE or plain poll) and hand them to the sender."""
         while self._running:
             try:
-                messages = await self.aurora.poll_outbound()
+                if OUTBOUND_MODE == "stream":
+                    async for msg in self.aurora.stream_outbound():
+                        await self._submit(msg)
+                        if not self._running:
+                            return
+                    continue
+                
+                # Don't lease more than the sender can queue
+                if not self.sender.free:
+                    await asyncio.sleep(OUTBOUND_POLL_INTERVAL)
+                    continue
+                
+                wait = OUTBOUND_LONG_POLL_WAIT if OUTBOUND_MODE == "longpoll" else 0
+                messages = await self.aurora.poll_outbound(limit=min(50, self.sender.free), wait=wait)
                 
                 for msg in messages:
-                    external_user_id = msg.get("external_user_id", "")
-                    text = msg.get("text", "")
-                    message_id = msg.get("message_id")
-                    
-                    # Extract Telegram user ID from external_user_id
-                    # Format: "tg_123456789"
-                    if external_user_id.startswith("tg_"):
-                        try:
-                            tg_user_id = int(external_user_id[3:])
-                        except ValueError:
-                            continue
-                    else:
-                        continue
-                    
-                    # Send the message
-                    try:
-                        await self.client.send_message(tg_user_id, text)
-                        print(f"📤 Sent to {external_user_id}: {text[:50]}...")
-                        
-                        # Confirm delivery
-                        if message_id:
-                            await self.aurora.confirm_delivered(
-                                external_user_id=external_user_id,
-                                message_id=message_id,
-                            )
-                            
-                    except Exception as e:
-                        print(f"❌ Error sending to Telegram: {e}")
+                    await self._submit(msg)
                 
+                if OUTBOUND_MODE == "longpoll":
+                    continue  # Backend already waited for us
+            
             except Exception as e:
                 print(f"⚠️ Outbound poll error: {e}")
             
             await asyncio.sleep(OUTBOUND_POLL_INTERVAL)
     
+    async def _submit(self, msg: dict):
+        """Queue one outbound message on its chat."""
+        external_user_id = msg.get("external_user_id", "")
+        
+        # Extract Telegram user ID from external_user_id
+        # Format: "tg_123456789"
+        if not external_user_id.startswith("tg_"):
+            return
+        try:
+            tg_user_id = int(external_user_id[3:])
+        except ValueError:
+            return
+        
+        await self.sender.submit(OutboundItem(
+            chat_id=tg_user_id,
+            external_user_id=external_user_id,
+            message_id=msg.get("message_id"),
+            text=msg.get("text", ""),
+        ))
+    
+    def _ack(self, external_user_id: str, message_id: int):
+        self._acks.append((external_user_id, message_id))
+        self._acks_ready.set()
+    
+    async def _ack_loop(self):
+        """Confirm sent messages in batches, at most once per ACK_FLUSH_INTERVAL."""
+        while self._running or self._acks:
+            await self._acks_ready.wait()
+            self._acks_ready.clear()
+            await self._flush_acks()
+            await asyncio.sleep(ACK_FLUSH_INTERVAL)
+    
+    async def _flush_acks(self):
+        acks, self._acks = self._acks, []
+        try:
+            await self.aurora.confirm_delivered_batch(acks)
+        except Exception as e:
+            # Keep them for the next flush (before their lease runs out, ideally)
+            print(f"⚠️ Delivery ack error: {e}")
+            self._acks[:0] = acks
+            self._acks_ready.set()
+    
     async def stop(self):
         """Stop the worker."""
         self._running = False
+        await self.sender.close()
+        await self._flush_acks()
         await self.client.disconnect()
+        await self.aurora.aclose()
+        self.spool.close()  # Undrained DMs stay on disk for the next start
         print("👋 Worker stopped")
 
 
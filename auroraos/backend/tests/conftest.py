@@ -0,0 +1,17 @@
+"""
+Test settings: a throwaway SQLite file, no LLM keys (agents answer with
+their canned reply) and the query plan audit in raise mode. Set before
+`app` is imported, since settings are read at import time.
+"""
+
+import os
+import tempfile
+
+_db_dir = tempfile.mkdtemp(prefix="aurora-test-")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_dir}/aurora.db"
+os.environ["QUERY_PLAN_CHECK"] = "raise"
+os.environ["OPENAI_API_KEY"] = ""
+os.environ["XAI_API_KEY"] = ""
+os.environ["AGENT_COALESCE_WINDOW_SECONDS"] = "0"
+os.environ["TREASURY_ROLLUP_ENABLED"] = "false"  # The test runs it in line
@@ -0,0 +1,121 @@
+"""
+Every query the orchestrator and state routers run must hit an index.
+
+The app runs against a freshly migrated database with
+QUERY_PLAN_CHECK=raise (see conftest.py), so a full table scan fails
+the request with a 500 and is left in query_plan_audit.report().
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.query_plans import query_plan_audit
+from app.state.rollup import treasury_rollup
+
+O = "/v1/orchestrator"
+S = "/v1/state"
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as c:
+        yield c
+
+
+def ok(response):
+    assert response.status_code < 400, f"{response.request.method} {response.request.url}: {response.text}"
+    return response.json()
+
+
+def test_orchestrator_queries_use_indexes(client):
+    slot = ok(client.post(O + "/performer-slots", json={"label": "Betelle", "agent_id": "betelle_fox_v1"}))
+    operator = ok(client.post(O + "/operators", json={"name": "Betül", "external_id": "op_1"}))
+    ok(client.patch(O + f"/operators/{operator['id']}/status", json={"is_online": True}))
+    
+    first = ok(client.post(O + "/incoming-message", json={
+        "origin": "FLIRTMARKET", "external_user_id": "fm_1", "performer_slot_id": slot["id"], "text": "selam",
+        "meta": {"coins_spent_total": 50, "vip_tier": "gold"},
+    }))
+    ok(client.post(O + "/incoming-message", json={
+        "origin": "FLIRTMARKET", "external_user_id": "fm_1", "performer_slot_id": slot["id"], "text": "naber",
+    }))
+    ok(client.post(O + "/incoming-messages:batch", json={"messages": [
+        {"origin": "WEB", "external_user_id": f"web_{i}", "performer_slot_id": slot["id"], "text": "hi"}
+        for i in range(3)
+    ]}))
+    conversation_id = first["conversation_id"]
+    
+    page = client.get(O + "/conversations", params={"limit": 2})
+    ok(page)
+    ok(client.get(O + "/conversations", params={"limit": 2, "cursor": page.headers.get("X-Next-Cursor")}))
+    ok(client.get(O + "/conversations", params={"origin": "WEB", "mode": "AI_ONLY"}))
+    ok(client.get(O + "/conversations", params={"operator_id": operator["id"]}))
+    ok(client.get(O + f"/conversations/{conversation_id}"))
+    ok(client.patch(O + f"/conversations/{conversation_id}/mode", json={"mode": "HYBRID_GHOST"}))
+    ok(client.post(O + f"/conversations/{conversation_id}/reply", json={"text": "buradayım"}))
+    ok(client.get(O + "/performer-slots"))
+    ok(client.get(O + "/operators"))
+    
+    polled = ok(client.get(O + "/outbound/poll", params={"origin": "FLIRTMARKET"}))
+    for message in polled["messages"]:
+        ok(client.post(O + "/outbound/confirm", params={
+            "origin": "FLIRTMARKET", "external_user_id": message["external_user_id"], "message_id": message["message_id"],
+        }))
+    ok(client.get(O + "/outbound/dead-letters", params={"origin": "FLIRTMARKET"}))
+    
+    ok(client.post(O + "/telegram/inbound", json={"telegram_user_id": 5, "first_name": "Ali", "message": "hi"}))
+    ok(client.post(O + "/telegram/inbound:batch", json={"messages": [
+        {"telegram_user_id": 6, "message": "hey"}, {"telegram_user_id": 5, "message": "again"},
+    ]}))
+    outbound = ok(client.get(O + "/telegram/outbound"))
+    acks = [{"external_user_id": m["external_user_id"], "message_id": m["message_id"]} for m in outbound["messages"]]
+    if acks:
+        ok(client.post(O + "/telegram/delivered", params=acks[0]))
+        ok(client.post(O + "/telegram/delivered:batch", json={"acks": acks[1:]}))
+    
+    assert query_plan_audit.report() == {}
+
+
+def test_state_queries_use_indexes(client):
+    citizens = [
+        ok(client.post(S + "/citizens", json={"display_name": f"Citizen {i}", "tier": tier}))
+        for i, tier in enumerate(["BASIC", "GOLD", "GOLD"])
+    ]
+    citizen = citizens[0]
+    ok(client.get(S + f"/citizens/{citizen['citizen_id']}"))
+    ok(client.get(S + f"/citizens/{citizen['id']}"))
+    ok(client.patch(S + f"/citizens/{citizen['citizen_id']}", json={"display_name": "Renamed"}))
+    ok(client.post(S + f"/citizens/{citizen['citizen_id']}/verify"))
+    ok(client.post(S + f"/citizens/{citizens[2]['citizen_id']}/ban", json={"reason": "spam"}))
+    ok(client.get(S + "/citizens"))
+    ok(client.get(S + "/citizens", params={"status": "VERIFIED"}))
+    ok(client.get(S + "/citizens", params={"tier": "GOLD"}))
+    ok(client.get(S + "/citizens", params={"online_only": True}))
+    
+    for kind, amount in (("DEPOSIT", 100.0), ("REWARD", 10.0), ("FEE", 1.5)):
+        ok(client.post(S + "/treasury/transactions", json={
+            "type": kind, "amount": amount, "citizen_id": citizen["id"], "description": kind.lower(),
+        }))
+    ok(client.get(S + "/treasury/transactions"))
+    ok(client.get(S + "/treasury/transactions", params={"citizen_id": citizen["id"]}))
+    treasury_rollup.run_once()
+    ok(client.get(S + "/treasury/history"))
+    ok(client.get(S + "/treasury/history", params={"period": "HOUR", "days": 1}))
+    
+    operation = ok(client.post(S + "/ai-operations", json={"type": "JUDGE", "target": "tg_5"}))
+    ok(client.patch(S + f"/ai-operations/{operation['operation_id']}", json={"status": "COMPLETED", "result": "ok"}))
+    ok(client.get(S + "/ai-operations"))
+    ok(client.get(S + "/ai-operations", params={"status": "COMPLETED"}))
+    for group_by in ("conversation", "caller", "model"):
+        ok(client.get(S + "/ai-operations/costs", params={"group_by": group_by}))
+    
+    flag = ok(client.post(S + "/flags", json={
+        "type": "SPAM", "content_type": "message", "content_id": "m1", "citizen_id": citizen["id"],
+    }))
+    ok(client.get(S + "/flags"))
+    ok(client.post(S + f"/flags/{flag['flag_id']}/resolve", json={"status": "DISMISSED", "resolution": "ok"}))
+    
+    ok(client.get(S + "/dashboard"))
+    
+    assert query_plan_audit.report() == {}
@@ -65,6 +65,7 @@ const DEFAULT_STATS: DashboardStats = {
   treasury: { reserve: '0 NCR', reserve_raw: 0, gdp_24h: '0%', gdp_raw: 0, inflation: '0%', inflation_raw: 0, liquidity: 'Low', transactions_24h: 0, volume_24h: 0, avg_transaction: 0 },
   threat: { level: 'LOW', active_threats: 0, mitigated_24h: 0, last_incident: null, details: '0 Cyber-Attacks detected' },
   ai_operations_24h: 0,
+  ai_ops: { operations: 0, failed: 0, tokens: 0, cost: 0, cost_formatted: '$0.00', avg_duration_ms: null, by_caller: [] },
   flagged_content: 0,
 };
 
@@ -394,7 +395,7 @@ export const StateDashboard: React.FC = () => {
                 >
                   <Activity /> AI OPERATOR FEED
                 </span>
-                <span style={{ fontSize: 10, color: '#64748b' }}>LIVE</span>
+                <span style={{ fontSize: 10, color: '#64748b' }}>LIVE · {stats.ai_ops.cost_formatted} today</span>
               </div>
               <div style={{ display: 'flex', flexDirection: 'column', gap: 12 }}>
                 {aiOps.length === 0 ? (
@@ -426,7 +427,9 @@ export const StateDashboard: React.FC = () => {
                       </div>
                       <div style={{ color: 'white', marginTop: 4 }}>{op.target}</div>
                       <div style={{ fontSize: 10, color: '#475569', marginTop: 4 }}>
-                        {op.duration_seconds ? `${op.duration_seconds}s` : op.sentiment || 'Pending...'}
+                        {op.duration_ms != null
+                          ? `${op.caller ?? op.model_used} · ${op.duration_ms}ms${op.cost != null ? ` · $${op.cost.toFixed(4)}` : ''}`
+                          : op.duration_seconds ? `${op.duration_seconds}s` : op.sentiment || 'Pending...'}
                       </div>
                     </div>
                   ))
@@ -63,11 +63,29 @@ export interface ThreatStatus {
   details: string;
 }
 
+export interface AICallerCost {
+  caller: string;
+  operations: number;
+  tokens: number;
+  cost: number;
+}
+
+export interface AIOpsStats {
+  operations: number;
+  failed: number;
+  tokens: number;
+  cost: number;
+  cost_formatted: string;
+  avg_duration_ms: number | null;
+  by_caller: AICallerCost[];
+}
+
 export interface DashboardStats {
   citizens: CitizenStats;
   treasury: TreasuryStats;
   threat: ThreatStatus;
   ai_operations_24h: number;
+  ai_ops: AIOpsStats;
   flagged_content: number;
 }
 
@@ -114,6 +132,12 @@ export interface AIOperation {
   sentiment: string | null;
   confidence: number | null;
   model_used: string | null;
+  tokens_used: number | null;
+  cost: number | null;
+  provider: string | null;
+  caller: string | null;
+  conversation_id: number | null;
+  duration_ms: number | null;
   created_at: string;
 }
 
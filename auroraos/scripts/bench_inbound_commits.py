@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║   Inbound Commit Benchmark                                       ║
+║   Commits / queries per message and throughput on the hot path   ║
+║   (single-message endpoint and the batch endpoint)               ║
+║                                                                  ║
+║   Usage: python scripts/bench_inbound_commits.py [-n 500]        ║
+║                                                                  ║
+║   Baron Baba © SiyahKare, 2025                                   ║
+╚══════════════════════════════════════════════════════════════════╝
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Throwaway SQLite file (file-backed so every commit pays its fsync)
+_tmpdir = tempfile.mkdtemp(prefix="aurora_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/bench.db"
+os.environ.setdefault("OPENAI_API_KEY", "")  # Agent falls back to its canned reply
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from sqlalchemy import event
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.db import engine
+from app.config import settings
+
+
+class Counter:
+    """Counts COMMITs and statements issued by the engine."""
+    
+    def __init__(self):
+        self.commits = 0
+        self.queries = 0
+        event.listen(engine, "commit", self._on_commit)
+        event.listen(engine, "before_cursor_execute", self._on_query)
+    
+    def _on_commit(self, conn):
+        self.commits += 1
+    
+    def _on_query(self, conn, cursor, statement, params, context, executemany):
+        self.queries += 1
+    
+    def reset(self):
+        self.commits = 0
+        self.queries = 0
+
+
+def run(client: TestClient, counter: Counter, label: str, n: int, users: int) -> dict:
+    """Send n messages one request each, spread over `users` external users."""
+    counter.reset()
+    start = time.perf_counter()
+    for i in range(n):
+        r = client.post("/v1/orchestrator/incoming-message", json={
+            "origin": "FLIRTMARKET",
+            "external_user_id": f"bench_{label}_{i % users}",
+            "performer_slot_id": 1,
+            "text": f"bench message {i}",
+            "meta": {"coins_spent_total": 20, "vip_tier": "none"},
+        })
+        r.raise_for_status()
+    elapsed = time.perf_counter() - start
+    
+    return {
+        "commits": counter.commits / n,
+        "queries": counter.queries / n,
+        "rate": n / elapsed,
+        "e2e_rate": n / elapsed,  # Replies are synchronous
+    }
+
+
+def run_batch(client: TestClient, counter: Counter, label: str, n: int, users: int, size: int) -> dict:
+    """Same traffic through /incoming-messages:batch, timed until every reply exists."""
+    counter.reset()
+    start = time.perf_counter()
+    tracking_ids = []
+    for first in range(0, n, size):
+        r = client.post("/v1/orchestrator/incoming-messages:batch", json={"messages": [
+            {
+                "origin": "FLIRTMARKET",
+                "external_user_id": f"bench_{label}_{i % users}",
+                "performer_slot_id": 1,
+                "text": f"bench message {i}",
+                "meta": {"coins_spent_total": 20, "vip_tier": "none"},
+            }
+            for i in range(first, min(first + size, n))
+        ]})
+        r.raise_for_status()
+        tracking_ids += [item["tracking_id"] for item in r.json()["results"] if item["tracking_id"]]
+    ingested = time.perf_counter() - start
+    
+    # Replies are generated by the worker pool — wait for all of them
+    for tracking_id in tracking_ids:
+        while client.get(f"/v1/orchestrator/jobs/{tracking_id}").json()["status"] in ("queued", "running"):
+            time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    
+    return {
+        "commits": counter.commits / n,
+        "queries": counter.queries / n,
+        "rate": n / ingested,
+        "e2e_rate": n / elapsed,
+    }
+
+
+def main(n: int, users: int, batch_size: int):
+    print("╔══════════════════════════════════════════╗")
+    print("║   Inbound Commit Benchmark               ║")
+    print("╚══════════════════════════════════════════╝")
+    print(f"  {n} messages, {users} users, DB: {os.environ['DATABASE_URL']}")
+    print()
+    
+    with TestClient(app) as client:
+        client.post("/v1/orchestrator/performer-slots", json={
+            "label": "Bench Slot", "agent_id": "betelle_fox_v1",
+        })
+        counter = Counter()
+        
+        results = {}
+        for label, defer in (("deferred_reply", True), ("single_transaction", False)):
+            settings.INBOUND_DEFER_REPLY = defer
+            # Silence per-message logging while measuring
+            stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+            try:
+                results[label] = run(client, counter, label, n, users)
+            finally:
+                sys.stdout.close()
+                sys.stdout = stdout
+        
+        settings.INBOUND_DEFER_REPLY = True
+        label = f"batch_{batch_size}"
+        stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+        try:
+            results[label] = run_batch(client, counter, label, n, users, batch_size)
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+    
+    for label, r in results.items():
+        print(
+            f"  {label:<20} {r['commits']:>6.2f} commits/msg"
+            f"  {r['queries']:>6.1f} queries/msg"
+            f"  {r['rate']:>8.1f} msg/s ingest"
+            f"  {r['e2e_rate']:>8.1f} msg/s with replies"
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Benchmark commits per inbound message")
+    parser.add_argument("-n", type=int, default=500, help="Messages to send")
+    parser.add_argument("--users", type=int, default=50, help="Distinct external users")
+    parser.add_argument("--batch-size", type=int, default=100, help="Messages per batch request")
+    args = parser.parse_args()
+    
+    main(args.n, args.users, args.batch_size)